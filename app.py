@@ -1,15 +1,22 @@
 import streamlit as st
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
 import pandas as pd
-import json
-import base64
-from urllib.parse import urljoin
-import re
-import time
-from collections import Counter
+import os
+from http_cache import get_response_cache
+from scrape_core import get_fetcher, smart_scrape
+from dedupe import DedupeIndex, get_dedupe_index
+from results_store import KINDS as STORE_KINDS, get_results_store
+from change_tracker import get_change_tracker
+from resilience import get_resilience
+from templates import get_template_store
+from pipeline import DEFAULT_PARSE_WORKERS, DEFAULT_WORKERS, get_parse_pool
+import datetime
+from streaming import stream_listing_records, stream_table_rows
+from export import FORMATS as EXPORT_FORMATS, RECORD_FORMATS, export_records, export_to_temp_file, table_row_record
+from records import RecordColumns, compact_result
+import tempfile
+from batch import read_url_list, scrape_batch
+from functools import partial
+import metrics
 
 st.set_page_config(page_title="Web Scraper", layout="wide")
 
@@ -59,434 +66,107 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-def setup_selenium_driver():
-    """Set up and return a Selenium WebDriver with Chrome."""
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.81 Safari/537.36")
-    service = Service(r'C:\Users\user\Desktop\Python\chromedriver.exe')
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    return driver
+def keep_result(name, value):
+    """Keep a scrape result in session state, dropping what was derived from the previous one."""
+    st.session_state[name] = value
+    st.session_state["result_frames"] = {}
+    st.session_state["result_views"] = {}
+    st.session_state["downloads"] = {}
 
-def get_html_content(url, driver):
-    """Get HTML content of a webpage using Selenium."""
-    try:
-        driver.get(url)
-        # Wait for dynamic content to load
-        time.sleep(3)
-        return driver.page_source
-    except Exception as e:
-        st.error(f"Error accessing the URL: {e}")
-        return None
-
-def detect_content_type(soup):
-    """Detect the primary content type of the page."""
-    # Count different element types to determine the main content type
-    type_counts = {
-        "job_listing": len(soup.find_all("div", class_=lambda x: x and any(job_term in x.lower() for job_term in ["job", "career", "position", "listing", "vacancy"]))),
-        "product": len(soup.find_all("div", class_=lambda x: x and any(prod_term in x.lower() for prod_term in ["product", "item", "goods", "merchandise"]))),
-        "article": len(soup.find_all(["article", "div"], class_=lambda x: x and any(art_term in x.lower() for art_term in ["article", "post", "blog", "news"]))),
-        "table_data": len(soup.find_all("table")),
-        "image_gallery": len(soup.find_all("img")) > 10,
-    }
-    
-    # Check for tables with multiple rows
-    for table in soup.find_all("table"):
-        if len(table.find_all("tr")) > 3:
-            type_counts["table_data"] += 5  # Give more weight to data tables
-    
-    # Check for forms
-    if len(soup.find_all("form")) > 0:
-        type_counts["form"] = len(soup.find_all("form")) * 3
-    
-    # Count links to determine if it's a directory or navigation page
-    link_count = len(soup.find_all("a", href=True))
-    if link_count > 30:
-        type_counts["directory"] = link_count
+def show_download_button(data, file_format, key=None):
+    """Offer the scraped data as a file download in the chosen format.
     
-    # Return the type with the highest count
-    if not type_counts:
-        return "general"
-    
-    main_type = max(type_counts.items(), key=lambda x: x[1])
-    return main_type[0] if main_type[1] > 0 else "general"
-
-def extract_schema_data(soup):
-    """Extract structured data from schema.org markup if available."""
-    schema_data = []
-    
-    for script in soup.find_all("script", {"type": "application/ld+json"}):
+    Each format is exported once per kept result, so reruns from paging,
+    filtering or switching formats back do not export it again.
+    """
+    extension, mime = EXPORT_FORMATS[file_format]
+    downloads = st.session_state.setdefault("downloads", {})
+    if (key, file_format) not in downloads:
+        path = export_to_temp_file(data, file_format)
         try:
-            data = json.loads(script.string)
-            if data:
-                schema_data.append(data)
-        except:
-            pass
-    
-    return schema_data if schema_data else None
-
-def clean_text(text):
-    """Clean text by removing extra whitespace and special characters."""
-    if not text:
-        return ""
-    # Replace multiple spaces with a single space
-    text = re.sub(r'\s+', ' ', text)
-    # Remove leading/trailing whitespace
-    return text.strip()
-
-def extract_job_listings(soup, base_url):
-    """Extract job listings from the page."""
-    jobs = []
-    # Common job container classes
-    job_containers = soup.find_all("div", class_=lambda x: x and any(job_term in x.lower() for job_term in ["job", "career", "position", "listing", "vacancy"]))
-    
-    # If no specific job containers found, look for generic listings
-    if not job_containers:
-        job_containers = soup.find_all(["div", "li"], class_=lambda x: x and any(list_term in x.lower() for list_term in ["item", "result", "card", "listing", "post"]))
-    
-    for container in job_containers:
-        # Try to find the job title, company, location
-        title_elem = container.find(["h1", "h2", "h3", "h4", "a"], class_=lambda x: x and any(title_term in x.lower() for title_term in ["title", "name", "position"]) if x else False) or container.find(["h1", "h2", "h3", "h4", "a"])
-        company_elem = container.find(["span", "div", "p"], class_=lambda x: x and any(comp_term in x.lower() for comp_term in ["company", "employer", "organization"]) if x else False)
-        location_elem = container.find(["span", "div", "p"], class_=lambda x: x and any(loc_term in x.lower() for loc_term in ["location", "place", "address", "city"]) if x else False)
-        description_elem = container.find(["p", "div"], class_=lambda x: x and any(desc_term in x.lower() for desc_term in ["description", "summary", "detail"]) if x else False)
-        link_elem = container.find("a", href=True)
-        
-        title = clean_text(title_elem.get_text()) if title_elem else ""
-        company = clean_text(company_elem.get_text()) if company_elem else ""
-        location = clean_text(location_elem.get_text()) if location_elem else ""
-        description = clean_text(description_elem.get_text()) if description_elem else ""
-        
-        # If we found a title or link, consider it a valid job listing
-        if title or (link_elem and link_elem.get("href")):
-            link = urljoin(base_url, link_elem.get("href")) if link_elem else ""
-            jobs.append({
-                "title": title,
-                "company": company,
-                "location": location,
-                "description": description,
-                "link": link
-            })
-    
-    return jobs
+            with open(path, "rb") as f:
+                downloads[(key, file_format)] = f.read()
+        finally:
+            os.remove(path)
+    st.download_button(f"Download {file_format} File", downloads[(key, file_format)],
+                       file_name=f"scraped_data{extension}", mime=mime, key=key)
 
-def extract_products(soup, base_url):
-    """Extract product information from the page."""
-    products = []
-    # Common product container classes
-    product_containers = soup.find_all("div", class_=lambda x: x and any(prod_term in x.lower() for prod_term in ["product", "item", "goods", "merchandise"]))
-    
-    # If no specific product containers found, look for generic listings
-    if not product_containers:
-        product_containers = soup.find_all(["div", "li"], class_=lambda x: x and any(list_term in x.lower() for list_term in ["item", "card", "listing", "post"]))
-    
-    for container in product_containers:
-        # Try to find the product name, price, image
-        name_elem = container.find(["h1", "h2", "h3", "h4", "a"], class_=lambda x: x and any(name_term in x.lower() for name_term in ["name", "title", "product"]) if x else False) or container.find(["h1", "h2", "h3", "h4", "a"])
-        price_elem = container.find(["span", "div", "p"], class_=lambda x: x and any(price_term in x.lower() for price_term in ["price", "cost", "amount"]) if x else False)
-        image_elem = container.find("img")
-        link_elem = container.find("a", href=True)
-        
-        name = clean_text(name_elem.get_text()) if name_elem else ""
-        price = clean_text(price_elem.get_text()) if price_elem else ""
-        image = image_elem.get("src") if image_elem else ""
-        
-        # If we found a name or image, consider it a valid product
-        if name or image:
-            link = urljoin(base_url, link_elem.get("href")) if link_elem else ""
-            product = {
-                "name": name,
-                "price": price,
-                "link": link
-            }
-            # Add image URL only if it exists and is not a data URI
-            if image and not image.startswith("data:"):
-                product["image_url"] = urljoin(base_url, image)
-            
-            products.append(product)
-    
-    return products
+def records_frame(records):
+    """DataFrame of a listing; ``RecordColumns`` convert column by column."""
+    if isinstance(records, RecordColumns):
+        return records.to_pandas(sources=False)
+    return pd.DataFrame(records)
 
-def extract_articles(soup, base_url):
-    """Extract articles or blog posts from the page."""
-    articles = []
-    # Common article container elements
-    article_containers = soup.find_all(["article", "div"], class_=lambda x: x and any(art_term in x.lower() for art_term in ["article", "post", "blog", "news", "entry"]))
-    
-    # If no specific article containers found, look for headings with text
-    if not article_containers:
-        article_containers = []
-        for heading in soup.find_all(["h1", "h2", "h3"]):
-            if heading.get_text(strip=True) and len(heading.get_text(strip=True)) > 15:
-                article_containers.append(heading.parent)
-    
-    for container in article_containers:
-        # Try to find the article title, summary, date, author
-        title_elem = container.find(["h1", "h2", "h3", "h4"], class_=lambda x: x and any(title_term in x.lower() for title_term in ["title", "heading"]) if x else False) or container.find(["h1", "h2", "h3", "h4"])
-        summary_elem = container.find(["p", "div"], class_=lambda x: x and any(summ_term in x.lower() for summ_term in ["summary", "excerpt", "description", "content"]) if x else False) or container.find("p")
-        date_elem = container.find(["span", "time", "div"], class_=lambda x: x and any(date_term in x.lower() for date_term in ["date", "time", "published"]) if x else False)
-        author_elem = container.find(["span", "div", "a"], class_=lambda x: x and any(auth_term in x.lower() for auth_term in ["author", "by", "writer"]) if x else False)
-        link_elem = container.find("a", href=True) or title_elem.find("a", href=True) if title_elem else None
-        
-        title = clean_text(title_elem.get_text()) if title_elem else ""
-        summary = clean_text(summary_elem.get_text()) if summary_elem else ""
-        date = clean_text(date_elem.get_text()) if date_elem else ""
-        author = clean_text(author_elem.get_text()) if author_elem else ""
-        
-        # If we found a title or summary, consider it a valid article
-        if title or summary:
-            link = urljoin(base_url, link_elem.get("href")) if link_elem else ""
-            articles.append({
-                "title": title,
-                "summary": summary,
-                "date": date,
-                "author": author,
-                "link": link
-            })
-    
-    return articles
+# Listings longer than this are shown as a paged table instead of one card per record
+MAX_CARDS = 20
+# Tables longer than this are paged
+MAX_TABLE_ROWS = 100
 
-def extract_table_data(soup):
-    """Extract data from tables on the page."""
-    tables_data = []
-    
-    for table in soup.find_all("table"):
-        headers = []
-        rows = []
-        
-        # Extract headers
-        header_row = table.find("tr")
-        if header_row:
-            headers = [clean_text(th.get_text()) for th in header_row.find_all(["th", "td"])]
-        
-        # Extract rows
-        for row in table.find_all("tr")[1:] if headers else table.find_all("tr"):
-            cells = [clean_text(cell.get_text()) for cell in row.find_all(["td", "th"])]
-            if cells:
-                if headers and len(headers) == len(cells):
-                    rows.append(dict(zip(headers, cells)))
-                else:
-                    rows.append({"cells": cells})
-        
-        if rows:
-            tables_data.append({
-                "headers": headers,
-                "rows": rows,
-                "row_count": len(rows)
-            })
-    
-    return tables_data
+def result_frame(data, name, build):
+    """Build a DataFrame for part of a kept result once per session."""
+    frames = st.session_state.setdefault("result_frames", {})
+    key = (id(data), name)
+    if key not in frames:
+        frames[key] = build()
+    return frames[key]
 
-def extract_links(soup, base_url):
-    """Extract important links from the page."""
-    links = []
-    
-    for link in soup.find_all("a", href=True):
-        href = link.get("href")
-        absoulute_url = urljoin(base_url,href)
-        text = clean_text(link.get_text())
-        
-        # Skip empty links, anchors, and javascript
-        if not href or href.startswith("#") or href.startswith("javascript:"):
-            continue
-            
-        # Make link absolute
-        full_url = urljoin(base_url, href)
-        
-        # Only include links with text
-        if text:
-            links.append({
-                "text": text,
-                "url": full_url
-            })
-    
-    return links
+def _sort_key(column):
+    # Categoricals sort by first appearance; sort them by their text instead
+    return column.astype(str) if isinstance(column.dtype, pd.CategoricalDtype) else column
 
-def extract_images(soup, base_url):
-    """Extract important images from the page."""
-    images = []
-    
-    for img in soup.find_all("img"):
-        src = img.get("src")
-        alt = img.get("alt", "")
-        
-        # Skip data URIs and empty sources
-        if not src or src.startswith("data:"):
-            continue
-            
-        # Make image URL absolute
-        full_url = urljoin(base_url, src)
-        
-        images.append({
-            "url": full_url,
-            "alt": alt
-        })
-    
-    return images
-
-def extract_headings(soup):
-    """Extract hierarchical headings from the page."""
-    headings = []
-    
-    for level in range(1, 7):
-        for heading in soup.find_all(f"h{level}"):
-            text = clean_text(heading.get_text())
-            if text:
-                headings.append({
-                    "level": level,
-                    "text": text
-                })
-    
-    return headings
+def filter_and_sort(frame, search=None, order_by=None, descending=False):
+    """Rows containing ``search`` in any column (case-insensitive), sorted by ``order_by``."""
+    view = frame
+    if search:
+        mask = pd.Series(False, index=frame.index)
+        for name in frame.columns:
+            column = frame[name]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                # Test each distinct value once
+                categories = column.cat.categories
+                mask |= column.isin(categories[categories.astype(str).str.contains(search, case=False, regex=False)])
+            else:
+                mask |= column.astype(str).str.contains(search, case=False, regex=False, na=False)
+        view = view[mask]
+    if order_by is not None:
+        view = view.sort_values(order_by, ascending=not descending, kind="stable", na_position="last", key=_sort_key)
+    return view
 
-def extract_main_content(soup):
-    """Extract what appears to be the main content from the page."""
-    # Try to find main content containers
-    main_containers = soup.find_all(["main", "article", "div"], class_=lambda x: x and any(main_term in x.lower() for main_term in ["main", "content", "article", "body"]) if x else False)
-    
-    if main_containers:
-        # Use the container with the most text content
-        main_container = max(main_containers, key=lambda x: len(x.get_text(strip=True)))
-        
-        # Extract paragraphs from the main container
-        paragraphs = [clean_text(p.get_text()) for p in main_container.find_all("p")]
-        return [p for p in paragraphs if p and len(p) > 20]  # Filter out very short paragraphs
-    
-    # Fallback: extract all paragraphs from the page
-    paragraphs = [clean_text(p.get_text()) for p in soup.find_all("p")]
-    return [p for p in paragraphs if p and len(p) > 20]  # Filter out very short paragraphs
+def show_paged_table(frame, key):
+    """Show a DataFrame a page at a time; filtering and sorting run here, not in the browser."""
+    col1, col2, col3 = st.columns(3)
+    search = col1.text_input("Filter", key=f"{key}_search", placeholder="Text in any column")
+    order_by = col2.selectbox("Sort by", [None] + list(frame.columns), key=f"{key}_order_by",
+                              format_func=lambda name: "Page order" if name is None else str(name))
+    descending = col3.checkbox("Descending", key=f"{key}_descending")
+    
+    # Paging through the same filter reuses its rows
+    views = st.session_state.setdefault("result_views", {})
+    query = (id(frame), search, order_by, descending)
+    if views.get(key, (None,))[0] != query:
+        views[key] = (query, filter_and_sort(frame, search, order_by, descending))
+    view = views[key][1]
+    
+    col1, col2 = st.columns(2)
+    page_size = col1.selectbox("Rows per page", BROWSE_PAGE_SIZES, index=1, key=f"{key}_page_size")
+    pages = max(1, -(-len(view) // page_size))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = col2.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, key=page_key)
+    st.caption(f"{len(view):,} of {len(frame):,} records")
+    st.dataframe(view.iloc[(page - 1) * page_size:page * page_size])
 
-def remove_redundant_data(data_list):
-    """Remove duplicate or nearly duplicate entries from a list of dictionaries."""
-    unique_data = []
-    seen_titles = set()
-    
-    for item in data_list:
-        if "title" in item and item["title"]:
-            title = item["title"].lower()
-            if title not in seen_titles:
-                seen_titles.add(title)
-                unique_data.append(item)
-        else:
-            unique_data.append(item)
-    
-    return unique_data
-
-def smart_scrape(url):
-    """Intelligently scrape a website based on its content type."""
-    driver = setup_selenium_driver()
-    
-    try:
-        html_content = get_html_content(url, driver)
-        if not html_content:
-            return {"error": "Failed to retrieve content from the URL"}
-        
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Remove unwanted elements
-        for tag in soup(["script", "style", "noscript", "iframe", "svg"]):
-            tag.decompose()
-        
-        # Try to get structured data first
-        schema_data = extract_schema_data(soup)
-        
-        # Detect content type
-        content_type = detect_content_type(soup)
-        
-        # Extract data based on content type
-        result = {
-            "page_title": soup.title.get_text() if soup.title else "",
-            "content_type": content_type,
-            "url": url
-        }
-        
-        # Add schema data if available
-        if schema_data:
-            result["schema_data"] = schema_data
-        
-        # Extract specific data based on content type
-        if content_type == "job_listing":
-            jobs = extract_job_listings(soup, url)
-            result["jobs"] = remove_redundant_data(jobs)
-        
-        elif content_type == "product":
-            products = extract_products(soup, url)
-            result["products"] = remove_redundant_data(products)
-        
-        elif content_type == "article":
-            articles = extract_articles(soup, url)
-            result["articles"] = remove_redundant_data(articles)
-        
-        elif content_type == "table_data":
-            tables = extract_table_data(soup)
-            result["tables"] = tables
-        
-        elif content_type == "directory":
-            links = extract_links(soup, url)
-            result["links"] = links
-        
-        elif content_type == "image_gallery":
-            images = extract_images(soup, url)
-            result["images"] = images
-        
-        else:
-            # General content extraction
-            result["headings"] = extract_headings(soup)
-            result["main_content"] = extract_main_content(soup)
-            result["links"] = extract_links(soup, url)[:20]  # Limit to top 20 links
-        
-        return result
-    
-    except Exception as e:
-        return {"error": str(e)}
-    
-    finally:
-        driver.quit()
-
-def create_download_link(data, file_format):
-    """Create a download link for the scraped data."""
-    if file_format == 'JSON':
-        json_data = json.dumps(data, indent=4)
-        b64 = base64.b64encode(json_data.encode()).decode()
-        href = f'<a href="data:file/json;base64,{b64}" download="scraped_data.json">Download JSON File</a>'
-    elif file_format == 'CSV':
-        # Convert to DataFrame based on content type
-        content_type = data.get("content_type", "general")
-        
-        if content_type == "job_listing" and "jobs" in data:
-            df = pd.DataFrame(data["jobs"])
-        elif content_type == "product" and "products" in data:
-            df = pd.DataFrame(data["products"])
-        elif content_type == "article" and "articles" in data:
-            df = pd.DataFrame(data["articles"])
-        elif content_type == "table_data" and "tables" in data and data["tables"]:
-            # Use the first table with headers
-            for table in data["tables"]:
-                if table["headers"]:
-                    df = pd.DataFrame(table["rows"])
-                    break
-            else:
-                # Fallback to a simple representation
-                df = pd.DataFrame([{"table_count": len(data["tables"])}])
-        else:
-            # Create a simple DataFrame for other content types
-            if "main_content" in data and data["main_content"]:
-                df = pd.DataFrame({"content": data["main_content"]})
-            elif "links" in data and data["links"]:
-                df = pd.DataFrame(data["links"])
-            else:
-                df = pd.DataFrame([{"page_title": data.get("page_title", "")}])
-        
-        csv_data = df.to_csv(index=False)
-        b64 = base64.b64encode(csv_data.encode()).decode()
-        href = f'<a href="data:file/csv;base64,{b64}" download="scraped_data.csv">Download CSV File</a>'
-    
-    return href
+def show_listing(data, name):
+    """Show a listing as a paged table."""
+    show_paged_table(result_frame(data, name, lambda: records_frame(data[name])), f"{name}_{id(data)}")
 
 def display_scraped_data(data):
-    """Display the scraped data in an organized way."""
+    """Display the scraped data in an organized way.
+    
+    Short listings get a card per record; longer ones and big tables are
+    paged, so a rerun only sends the visible rows to the browser.
+    """
     if "error" in data:
         st.error(f"Error: {data['error']}")
         return
@@ -496,75 +176,93 @@ def display_scraped_data(data):
     st.markdown(f"### Page Title: {data['page_title']}")
     st.markdown(f"**Content Type Detected:** {data['content_type'].replace('_', ' ').title()}")
     
+    if data.get("changes"):
+        show_changes(data["changes"])
+    
     # Display data based on content type
     if data["content_type"] == "job_listing" and "jobs" in data:
         st.markdown("### 💼 Job Listings")
-        for i, job in enumerate(data["jobs"]):
-            with st.expander(f"{job.get('title', 'Job')} at {job.get('company', 'Company')}"):
-                st.write(f"**Title:** {job.get('title', 'N/A')}")
-                st.write(f"**Company:** {job.get('company', 'N/A')}")
-                st.write(f"**Location:** {job.get('location', 'N/A')}")
-                if job.get('description'):
-                    st.write(f"**Description:** {job.get('description')}")
-                if job.get('link'):
-                    st.write(f"**Link:** [{job.get('link')}]({job.get('link')})")
+        if len(data["jobs"]) > MAX_CARDS:
+            show_listing(data, "jobs")
+        else:
+            for i, job in enumerate(data["jobs"]):
+                with st.expander(f"{job.get('title', 'Job')} at {job.get('company', 'Company')}"):
+                    st.write(f"**Title:** {job.get('title', 'N/A')}")
+                    st.write(f"**Company:** {job.get('company', 'N/A')}")
+                    st.write(f"**Location:** {job.get('location', 'N/A')}")
+                    if job.get('description'):
+                        st.write(f"**Description:** {job.get('description')}")
+                    if job.get('link'):
+                        st.write(f"**Link:** [{job.get('link')}]({job.get('link')})")
     
     elif data["content_type"] == "product" and "products" in data:
         st.markdown("### 🛍️ Products")
         
-        # Create rows of 3 products
-        for i in range(0, len(data["products"]), 3):
-            cols = st.columns(3)
-            for j in range(3):
-                if i+j < len(data["products"]):
-                    product = data["products"][i+j]
-                    with cols[j]:
-                        st.subheader(product.get('name', 'Product'))
-                        st.write(f"**Price:** {product.get('price', 'N/A')}")
-                        if product.get('link'):
-                            st.write(f"[View Product]({product.get('link')})")
+        if len(data["products"]) > MAX_CARDS:
+            show_listing(data, "products")
+        else:
+            # Create rows of 3 products
+            for i in range(0, len(data["products"]), 3):
+                cols = st.columns(3)
+                for j in range(3):
+                    if i+j < len(data["products"]):
+                        product = data["products"][i+j]
+                        with cols[j]:
+                            st.subheader(product.get('name', 'Product'))
+                            st.write(f"**Price:** {product.get('price', 'N/A')}")
+                            if product.get('link'):
+                                st.write(f"[View Product]({product.get('link')})")
     
     elif data["content_type"] == "article" and "articles" in data:
         st.markdown("### 📰 Articles")
-        for article in data["articles"]:
-            with st.expander(article.get('title', 'Article')):
-                st.write(f"**Title:** {article.get('title', 'N/A')}")
-                if article.get('date'):
-                    st.write(f"**Date:** {article.get('date')}")
-                if article.get('author'):
-                    st.write(f"**Author:** {article.get('author')}")
-                if article.get('summary'):
-                    st.write(f"**Summary:** {article.get('summary')}")
-                if article.get('link'):
-                    st.write(f"**Link:** [{article.get('link')}]({article.get('link')})")
+        if len(data["articles"]) > MAX_CARDS:
+            show_listing(data, "articles")
+        else:
+            for article in data["articles"]:
+                with st.expander(article.get('title', 'Article')):
+                    st.write(f"**Title:** {article.get('title', 'N/A')}")
+                    if article.get('date'):
+                        st.write(f"**Date:** {article.get('date')}")
+                    if article.get('author'):
+                        st.write(f"**Author:** {article.get('author')}")
+                    if article.get('summary'):
+                        st.write(f"**Summary:** {article.get('summary')}")
+                    if article.get('link'):
+                        st.write(f"**Link:** [{article.get('link')}]({article.get('link')})")
     
     elif data["content_type"] == "table_data" and "tables" in data:
         st.markdown("### 📊 Tables")
         for i, table in enumerate(data["tables"]):
             st.subheader(f"Table {i+1}")
             if table["headers"]:
-                df = pd.DataFrame(table["rows"])
-                st.dataframe(df)
+                df = result_frame(data, f"table_{i}", lambda: pd.DataFrame(table["rows"]))
             else:
                 # Display tables without headers
-                rows_data = [row.get("cells", []) for row in table["rows"]]
-                df = pd.DataFrame(rows_data)
+                df = result_frame(data, f"table_{i}", lambda: pd.DataFrame([row.get("cells", []) for row in table["rows"]]))
+            if len(df) > MAX_TABLE_ROWS:
+                show_paged_table(df, f"table_{i}_{id(data)}")
+            else:
                 st.dataframe(df)
     
     elif data["content_type"] == "directory" and "links" in data:
         st.markdown("### 🔗 Directory Links")
-        links_df = pd.DataFrame(data["links"])
-        st.dataframe(links_df)
+        if len(data["links"]) > MAX_TABLE_ROWS:
+            show_listing(data, "links")
+        else:
+            st.dataframe(records_frame(data["links"]))
     
     elif data["content_type"] == "image_gallery" and "images" in data:
         st.markdown("### 🖼️ Image Gallery")
         image_count = len(data["images"])
         st.write(f"Found {image_count} images on the page")
         
-        # Display a sample of images
-        for i, img in enumerate(data["images"][:10]):  # Show max 10 images
-            st.write(f"**Image {i+1}:** {img.get('alt', 'No description')}")
-            st.write(f"URL: {img.get('url')}")
+        if image_count > MAX_CARDS:
+            show_listing(data, "images")
+        else:
+            # Display a sample of images
+            for i, img in enumerate(data["images"][:10]):  # Show max 10 images
+                st.write(f"**Image {i+1}:** {img.get('alt', 'No description')}")
+                st.write(f"URL: {img.get('url')}")
     
     else:
         # General content display
@@ -583,38 +281,317 @@ def display_scraped_data(data):
         
         if "links" in data and data["links"]:
             st.markdown("### 🔗 Important Links")
-            links_df = pd.DataFrame(data["links"][:10])  # Show max 10 links
+            links_df = records_frame(data["links"][:10])  # Show max 10 links
             st.dataframe(links_df)
     
+    if data.get("_metrics"):
+        show_metrics_panel(data["_metrics"], data.get("url"))
+    
     return True
 
+def show_changes(changes):
+    """Summarize what changed since the previous scrape of the page."""
+    status = changes["status"]
+    if status == "new":
+        st.info("🆕 First scrape of this page; later scrapes will report changes")
+        return
+    last_change = datetime.datetime.fromtimestamp(changes["changed_at"]).strftime("%Y-%m-%d %H:%M")
+    if status == "unchanged":
+        st.info(f"⏸️ No changes since {last_change}")
+        return
+    summary = changes["summary"]
+    st.warning(f"🔄 {summary['added']} added · {summary['removed']} removed · {summary['changed']} changed")
+    with st.expander("Changes since the last scrape"):
+        for name in ("added", "removed"):
+            for key, items in changes[name].items():
+                st.markdown(f"**{name.title()} {key.replace('_', ' ')}**")
+                st.dataframe(pd.DataFrame(items if isinstance(items[0], dict) else {"text": items}))
+        for key, items in changes["changed"].items():
+            st.markdown(f"**Changed {key.replace('_', ' ')}**")
+            st.json(items)
+
+def show_metrics_panel(scrape_metrics, url=None):
+    """Show per-stage timings in a collapsible panel with Prometheus/JSON downloads."""
+    with st.expander(f"⏱️ Performance metrics ({scrape_metrics['total_wall_s']:.2f}s)"):
+        stages = pd.DataFrame.from_dict(scrape_metrics["stages"], orient="index")
+        if not stages.empty:
+            stages = stages.sort_values("wall_s", ascending=False)
+            stages.index.name = "stage"
+            st.dataframe(stages)
+        counters = {name: value for name, value in scrape_metrics.items() if name not in ("stages", "total_wall_s")}
+        if counters:
+            st.write(", ".join(f"**{name.replace('_', ' ')}:** {value:,}" for name, value in counters.items()))
+        labels = {"url": url} if url else None
+        col1, col2 = st.columns(2)
+        col1.download_button("Download Prometheus metrics", metrics.to_prometheus(scrape_metrics, labels),
+                             file_name="scrape_metrics.prom", mime="text/plain", key=f"metrics_prom_{url}")
+        col2.download_button("Download metrics JSON", metrics.to_json(scrape_metrics),
+                             file_name="scrape_metrics.json", mime="application/json", key=f"metrics_json_{url}")
+
+def count_records(data):
+    """Count the extracted records in a scrape result."""
+    return sum(
+        len(value) for key, value in data.items()
+        if isinstance(value, (list, RecordColumns)) and key != "schema_data"
+    )
+
+# Dedupe scope label -> factory for the index shared by the pages of a batch
+DEDUPE_SCOPES = {
+    "Within each page": lambda: None,
+    "Across this batch": DedupeIndex,
+    "Across all runs": get_dedupe_index,
+}
+
+def batch_scrape_ui():
+    """Show the batch mode inputs and the results of the last batch."""
+    urls_text = st.text_area("URLs (one per line)", height=200)
+    uploaded = st.file_uploader("...or upload a URL list", type=["txt", "csv"])
+    col1, col2 = st.columns(2)
+    max_concurrency = col1.slider("Concurrent pages", 1, 32, 8)
+    per_host = col2.slider("Concurrent pages per host", 1, 8, 2)
+    parse_workers = st.slider(
+        "Parse processes", 0, max(DEFAULT_WORKERS, 1), DEFAULT_PARSE_WORKERS,
+        help="Parse and extract pages in this many worker processes, one core each; 0 parses in the fetch threads"
+    )
+    force_refresh = st.checkbox("Force refresh (ignore cached pages)", key="batch_force_refresh")
+    dedupe_scope = st.selectbox(
+        "Drop duplicate records:", list(DEDUPE_SCOPES),
+        help="Near-duplicates (reworded reposts, the same item on several pages) are dropped within this scope"
+    )
+    save_results = st.checkbox("Save results to the local store", value=True, key="batch_save_results")
+    track_changes = st.checkbox("Report changes since the last scrape", value=True, key="batch_track_changes")
+    
+    if st.button("Scrape All", key="batch_button", help="Click to start scraping every URL"):
+        store = get_results_store() if save_results else None
+        tracker = get_change_tracker() if track_changes else None
+        run_batch(urls_text, uploaded, max_concurrency, per_host, force_refresh, DEDUPE_SCOPES[dedupe_scope](), store, tracker,
+                  parse_workers)
+    
+    if "batch_results" in st.session_state:
+        show_batch_results(st.session_state["batch_results"], st.session_state["batch_summary"])
+
+def run_batch(urls_text, uploaded, max_concurrency, per_host, force_refresh=False, dedupe=None, store=None,
+              tracker=None, parse_workers=0):
+    """Run a batch scrape, streaming a summary row per finished page."""
+    text = urls_text
+    if uploaded is not None:
+        text += "\n" + uploaded.getvalue().decode("utf-8", errors="replace")
+    urls = read_url_list(text)
+    if not urls:
+        st.error("Please enter at least one http(s) URL")
+        return
+    
+    progress = st.progress(0.0, text=f"0 / {len(urls)} pages")
+    summary_placeholder = st.empty()
+    summary = []
+    results = [None] * len(urls)
+    
+    # Resolve the cached fetcher here; worker threads have no Streamlit context
+    scrape = partial(
+        smart_scrape, fetcher=get_fetcher(), force_refresh=force_refresh, dedupe=dedupe, store=store, tracker=tracker,
+        templates=get_template_store(), pool=get_parse_pool(parse_workers)
+    )
+    batch = scrape_batch(urls, scrape, max_concurrency, per_host, politeness=get_fetcher().politeness)
+    for done, (index, url, data) in enumerate(batch, start=1):
+        # Kept for the whole session, so store the listings column by column
+        results[index] = compact_result(data)
+        summary.append({
+            "url": url,
+            "status": "error" if "error" in data else "ok",
+            "content_type": data.get("content_type", ""),
+            "records": count_records(data),
+            "changes": data.get("changes", {}).get("status", ""),
+            "error": data.get("error", ""),
+        })
+        progress.progress(done / len(urls), text=f"{done} / {len(urls)} pages")
+        summary_placeholder.dataframe(pd.DataFrame(summary))
+    
+    progress.empty()
+    summary_placeholder.empty()
+    st.session_state["batch_summary"] = summary
+    keep_result("batch_results", results)
+
+def show_batch_results(results, summary):
+    """Show the batch summary, one selected page and the combined download."""
+    failed = sum(1 for row in summary if row["status"] == "error")
+    st.success(f"✅ Scraped {len(results) - failed} of {len(results)} pages")
+    st.dataframe(pd.DataFrame(summary))
+    
+    scraped = [data for data in results if "error" not in data]
+    if scraped:
+        selected = st.selectbox("Show page", range(len(scraped)), format_func=lambda i: scraped[i].get("page_title") or scraped[i]["url"])
+        display_scraped_data(scraped[selected])
+    
+    st.markdown("### Download Data")
+    file_format = st.selectbox("Select file format to save data:", list(EXPORT_FORMATS), key="batch_file_format")
+    show_download_button({"content_type": "batch", "results": results}, file_format, key="batch_download")
+
+STREAMING_KINDS = {"Jobs": "job", "Products": "product", "Articles": "article"}
+
+def streaming_scrape_ui(url, streaming_kind, file_format):
+    """Stream a large page's records straight into an export file with bounded memory."""
+    if streaming_kind == "Tables":
+        records = (table_row_record(table, row, url) for table, row in stream_table_rows(url))
+    else:
+        records = stream_listing_records(url, STREAMING_KINDS[streaming_kind])
+    if file_format not in RECORD_FORMATS:
+        file_format = "NDJSON"
+    
+    counter = st.empty()
+    preview_placeholder = st.empty()
+    preview = []
+    
+    def progress(records):
+        for count, record in enumerate(records, start=1):
+            if len(preview) < 100:
+                preview.append(record)
+                # Show the first records as soon as they are extracted
+                if count in (10, 100):
+                    preview_placeholder.dataframe(pd.DataFrame(preview))
+            if count % 1000 == 0:
+                counter.write(f"Extracted {count:,} records...")
+            yield record
+    
+    extension, mime = EXPORT_FORMATS[file_format]
+    fd, path = tempfile.mkstemp(suffix=extension)
+    os.close(fd)
+    try:
+        total = export_records(progress(records), file_format, path)
+        counter.empty()
+        st.success(f"✅ Extracted {total:,} records")
+        if preview:
+            preview_placeholder.dataframe(pd.DataFrame(preview))
+        with open(path, "rb") as f:
+            st.download_button(f"Download {file_format} File", f, file_name=f"scraped_data{extension}", mime=mime)
+    except Exception as e:
+        st.error(f"Failed to stream the website: {e}")
+    finally:
+        os.remove(path)
+
+# Browse view label -> record kind in the results store
+STORE_VIEWS = {"Jobs": "job", "Products": "product", "Articles": "article", "Table rows": "table_row", "Links": "link"}
+BROWSE_PAGE_SIZES = [25, 50, 100, 250]
+
+def browse_store_ui():
+    """Query stored records page by page; only the visible page is loaded."""
+    store = get_results_store()
+    counts = store.stats()
+    view = st.selectbox("Records", list(STORE_VIEWS), format_func=lambda name: f"{name} ({counts[STORE_VIEWS[name]]:,})")
+    kind = STORE_VIEWS[view]
+    _, columns, title_column, _ = STORE_KINDS[kind]
+    
+    col1, col2, col3 = st.columns(3)
+    domain = col1.selectbox("Domain", ["All"] + store.domains(kind))
+    search = col2.text_input(f"{title_column.replace('_', ' ').title()} contains")
+    since_date = col3.date_input("Scraped since", value=None)
+    
+    sort_columns = ["last_seen", "first_seen", title_column, "domain"] + [name for name, _ in columns if name != title_column]
+    col1, col2, col3 = st.columns(3)
+    order_by = col1.selectbox("Sort by", sort_columns)
+    descending = col2.checkbox("Descending", value=True)
+    page_size = col3.selectbox("Rows per page", BROWSE_PAGE_SIZES, index=1)
+    
+    filters = {
+        "domain": None if domain == "All" else domain,
+        "search": search or None,
+        "since": datetime.datetime.combine(since_date, datetime.time()).timestamp() if since_date else None,
+    }
+    total = store.count(kind, **filters)
+    pages = max(1, -(-total // page_size))
+    page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, value=1)
+    rows = store.query(kind, order_by=order_by, descending=descending, limit=page_size, offset=(page - 1) * page_size, **filters)
+    
+    st.caption(f"{total:,} matching records")
+    if rows:
+        df = pd.DataFrame(rows).drop(columns=["record_hash"])
+        for column in ("first_seen", "last_seen"):
+            df[column] = pd.to_datetime(df[column], unit="s")
+        st.dataframe(df)
+
+def show_cache_stats():
+    """Show the response cache counters."""
+    stats = get_response_cache().stats()
+    st.caption(
+        f"Cache: {stats['hits']} hits · {stats['revalidated']} revalidated · {stats['misses']} misses · "
+        f"{stats['entries']} pages ({stats['bytes'] / 1e6:.1f} MB)"
+    )
+    templates = get_template_store().stats()
+    if templates["templates"]:
+        st.caption(
+            f"Templates: {templates['usable']} of {templates['templates']} site sections extracted with learned "
+            f"selectors · {templates['hits']} pages used them"
+        )
+    cut_off = [host for host, breaker in get_resilience().stats().items() if breaker["state"] != "closed"]
+    if cut_off:
+        st.caption(f"Failing hosts, paused by their circuit breaker: {', '.join(sorted(cut_off))}")
+
 # Main Streamlit app
 def main():
     st.markdown("<div class='main-title'>🕸️ Web Scraper</div>", unsafe_allow_html=True)
     
+    mode = st.radio("Mode", ["Single URL", "Batch", "Browse stored results"], horizontal=True)
+    if mode == "Batch":
+        batch_scrape_ui()
+        show_cache_stats()
+        return
+    if mode == "Browse stored results":
+        browse_store_ui()
+        return
+    
     st.write("Enter the URL of the website you want to scrape:")
     
     url = st.text_input("URL")
-    file_format = st.selectbox("Select file format to save data:", ["JSON", "CSV"])
+    wait_selector = st.text_input("Wait for CSS selector (optional)", help="Return as soon as this element appears on the page")
+    file_format = st.selectbox("Select file format to save data:", list(EXPORT_FORMATS))
+    force_refresh = st.checkbox("Force refresh (ignore cached pages)")
+    skip_seen = st.checkbox("Skip records seen in earlier runs")
+    save_results = st.checkbox("Save results to the local store", value=True)
+    track_changes = st.checkbox("Report changes since the last scrape", value=True)
+    streaming_kind = st.selectbox(
+        "Streaming mode for very large pages:", ["Off", "Tables", "Jobs", "Products", "Articles"],
+        help="Parse the page incrementally and write records to a file instead of building the whole page in memory"
+    )
+    default_level = metrics.DEFAULT_LEVEL if metrics.DEFAULT_LEVEL in metrics.LEVELS else "on"
+    metrics_level = st.selectbox(
+        "Performance metrics:", metrics.LEVELS, index=metrics.LEVELS.index(default_level),
+        help="Record time spent in each stage; \"memory\" also traces peak memory but slows scraping down"
+    )
     
     if st.button("Scrape", key="scrape_button", help="Click to start scraping"):
+        st.session_state.pop("scraped_data", None)
         if not url:
             st.error("Please enter a URL to scrape")
             return
         
+        if streaming_kind != "Off":
+            streaming_scrape_ui(url, streaming_kind, file_format)
+            return
+        
         with st.spinner("Analyzing and scraping the website..."):
             try:
-                scraped_data = smart_scrape(url)
+                scraped_data = smart_scrape(
+                    url, wait_selector=wait_selector or None, force_refresh=force_refresh,
+                    metrics_level=metrics_level, dedupe=get_dedupe_index() if skip_seen else None,
+                    store=get_results_store() if save_results else None,
+                    tracker=get_change_tracker() if track_changes else None,
+                    templates=get_template_store()
+                )
                 
                 if scraped_data and "error" not in scraped_data:
-                    display_scraped_data(scraped_data)
-                    download_link = create_download_link(scraped_data, file_format)
-                    st.markdown("### Download Data")
-                    st.markdown(download_link, unsafe_allow_html=True)
+                    keep_result("scraped_data", compact_result(scraped_data))
                 else:
                     st.error(f"Failed to scrape the website: {scraped_data.get('error', 'Unknown error')}")
             except Exception as e:
                 st.error(f"An error occurred: {e}")
+    
+    # Shown from session state, so other widgets (export format, paging) rerun without scraping again
+    if "scraped_data" in st.session_state:
+        scraped_data = st.session_state["scraped_data"]
+        display_scraped_data(scraped_data)
+        st.markdown("### Download Data")
+        show_download_button(scraped_data, file_format, key="download")
+    
+    show_cache_stats()
 
 if __name__ == "__main__":
     main()
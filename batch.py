@@ -0,0 +1,111 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fetcher import domain_of
+from politeness import interleave_hosts
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_PER_HOST = 2
+
+
+def read_url_list(text):
+    """Parse one URL per line, skipping blanks, comments and repeats."""
+    urls = []
+    seen = set()
+    for line in text.splitlines():
+        url = line.strip().split(",")[0].strip()
+        if not url or url.startswith("#") or url in seen:
+            continue
+        if not url.startswith(("http://", "https://")):
+            continue
+        seen.add(url)
+        urls.append(url)
+    return urls
+
+
+async def scrape_batch_async(urls, scrape_func, max_concurrency=DEFAULT_CONCURRENCY,
+                             per_host=DEFAULT_PER_HOST, politeness=None):
+    """Scrape many URLs concurrently and yield ``(index, url, result)`` as each finishes.
+
+    ``scrape_func(url)`` is the blocking single-page scraper (e.g. ``smart_scrape``);
+    it runs on a worker pool sized to ``max_concurrency`` while the event loop
+    enforces the global and per-host limits. A failing URL yields an
+    ``{"error": ...}`` result instead of aborting the batch.
+
+    URLs are started round-robin across hosts. Given the ``PolitenessScheduler``
+    that ``scrape_func``'s fetcher uses, a URL whose host is rate limited waits
+    here, before taking a worker, so the pool stays busy with other hosts.
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="scrape")
+    global_slots = asyncio.Semaphore(max_concurrency)
+    host_slots = {}
+
+    async def run_one(index, url):
+        host = domain_of(url)
+        if host not in host_slots:
+            host_slots[host] = asyncio.Semaphore(per_host)
+        # Take the host slot first so URLs queued behind a busy host do not hold global slots
+        async with host_slots[host]:
+            if politeness is not None:
+                while (delay := politeness.ready_in(url)) > 0:
+                    await asyncio.sleep(delay)
+            async with global_slots:
+                try:
+                    result = await loop.run_in_executor(executor, scrape_func, url)
+                except Exception as e:
+                    result = {"error": str(e)}
+        if result is None:
+            result = {"error": "No result returned"}
+        result.setdefault("url", url)
+        return index, url, result
+
+    tasks = [asyncio.ensure_future(run_one(i, url)) for i, url in interleave_hosts(urls)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def scrape_batch(urls, scrape_func, max_concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                 politeness=None):
+    """Synchronous generator over ``scrape_batch_async`` for scripts and Streamlit."""
+    results = queue.Queue()
+    stop = threading.Event()
+    done = object()
+
+    async def pump():
+        batch = scrape_batch_async(urls, scrape_func, max_concurrency, per_host, politeness)
+        try:
+            async for item in batch:
+                results.put(item)
+                if stop.is_set():
+                    break
+        finally:
+            await batch.aclose()
+
+    def run():
+        try:
+            asyncio.run(pump())
+        except Exception as e:
+            results.put(e)
+        finally:
+            results.put(done)
+
+    thread = threading.Thread(target=run, name="scrape-batch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = results.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
@@ -0,0 +1,148 @@
+"""Compare the single-pass DOM index against the original per-call soup scans.
+
+Run from the repository root:
+
+    python benchmarks/bench_dom_index.py --items 2000 --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scrape_core  # noqa: E402
+from dom_index import build_dom_index  # noqa: E402
+
+
+def legacy_detect_content_type(soup):
+    """detect_content_type as it was before the DOM index."""
+    type_counts = {
+        "job_listing": len(soup.find_all("div", class_=lambda x: x and any(t in x.lower() for t in ["job", "career", "position", "listing", "vacancy"]))),
+        "product": len(soup.find_all("div", class_=lambda x: x and any(t in x.lower() for t in ["product", "item", "goods", "merchandise"]))),
+        "article": len(soup.find_all(["article", "div"], class_=lambda x: x and any(t in x.lower() for t in ["article", "post", "blog", "news"]))),
+        "table_data": len(soup.find_all("table")),
+        "image_gallery": len(soup.find_all("img")) > 10,
+    }
+    for table in soup.find_all("table"):
+        if len(table.find_all("tr")) > 3:
+            type_counts["table_data"] += 5
+    if len(soup.find_all("form")) > 0:
+        type_counts["form"] = len(soup.find_all("form")) * 3
+    link_count = len(soup.find_all("a", href=True))
+    if link_count > 30:
+        type_counts["directory"] = link_count
+    main_type = max(type_counts.items(), key=lambda x: x[1])
+    return main_type[0] if main_type[1] > 0 else "general"
+
+
+def legacy_extract_job_listings(soup, base_url):
+    """extract_job_listings as it was before the DOM index."""
+    jobs = []
+    job_containers = soup.find_all("div", class_=lambda x: x and any(t in x.lower() for t in ["job", "career", "position", "listing", "vacancy"]))
+    if not job_containers:
+        job_containers = soup.find_all(["div", "li"], class_=lambda x: x and any(t in x.lower() for t in ["item", "result", "card", "listing", "post"]))
+    for container in job_containers:
+        title_elem = container.find(["h1", "h2", "h3", "h4", "a"], class_=lambda x: x and any(t in x.lower() for t in ["title", "name", "position"]) if x else False) or container.find(["h1", "h2", "h3", "h4", "a"])
+        company_elem = container.find(["span", "div", "p"], class_=lambda x: x and any(t in x.lower() for t in ["company", "employer", "organization"]) if x else False)
+        location_elem = container.find(["span", "div", "p"], class_=lambda x: x and any(t in x.lower() for t in ["location", "place", "address", "city"]) if x else False)
+        description_elem = container.find(["p", "div"], class_=lambda x: x and any(t in x.lower() for t in ["description", "summary", "detail"]) if x else False)
+        link_elem = container.find("a", href=True)
+        title = scrape_core.clean_text(title_elem.get_text()) if title_elem else ""
+        company = scrape_core.clean_text(company_elem.get_text()) if company_elem else ""
+        location = scrape_core.clean_text(location_elem.get_text()) if location_elem else ""
+        description = scrape_core.clean_text(description_elem.get_text()) if description_elem else ""
+        if title or (link_elem and link_elem.get("href")):
+            link = urljoin(base_url, link_elem.get("href")) if link_elem else ""
+            jobs.append({"title": title, "company": company, "location": location, "description": description, "link": link})
+    return jobs
+
+
+def legacy_extract_table_data(soup):
+    """extract_table_data as it was before the DOM index."""
+    tables_data = []
+    for table in soup.find_all("table"):
+        headers = []
+        rows = []
+        header_row = table.find("tr")
+        if header_row:
+            headers = [scrape_core.clean_text(th.get_text()) for th in header_row.find_all(["th", "td"])]
+        for row in table.find_all("tr")[1:] if headers else table.find_all("tr"):
+            cells = [scrape_core.clean_text(cell.get_text()) for cell in row.find_all(["td", "th"])]
+            if cells:
+                if headers and len(headers) == len(cells):
+                    rows.append(dict(zip(headers, cells)))
+                else:
+                    rows.append({"cells": cells})
+        if rows:
+            tables_data.append({"headers": headers, "rows": rows, "row_count": len(rows)})
+    return tables_data
+
+
+def build_listing_page(items):
+    """Build a synthetic job board page with navigation, cards and a table."""
+    parts = ["<html><head><title>Jobs</title></head><body>"]
+    parts.append("<nav>" + "".join(f'<a href="/nav/{i}">Nav {i}</a>' for i in range(40)) + "</nav>")
+    parts.append('<div class="results">')
+    for i in range(items):
+        parts.append(
+            f'<div class="job-card result-item">'
+            f'<h3 class="job-title"><a href="/jobs/{i}">Engineer {i}</a></h3>'
+            f'<span class="company-name">Company {i % 50}</span>'
+            f'<span class="job-location">City {i % 20}</span>'
+            f'<p class="job-description">Build things for team {i}. ' + "Details " * 10 + "</p>"
+            f'<img src="/logo/{i % 50}.png" alt="logo">'
+            f"</div>"
+        )
+    parts.append("</div><table><tr><th>Name</th><th>Salary</th></tr>")
+    parts.extend(f"<tr><td>Role {i}</td><td>{i * 1000}</td></tr>" for i in range(items // 4))
+    parts.append("</table></body></html>")
+    return "".join(parts)
+
+
+def timed(func, repeat):
+    """Return the best wall time over ``repeat`` runs and the last result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    html = build_listing_page(args.items)
+    soup = BeautifulSoup(html, "html.parser")
+    url = "https://example.com/jobs"
+    print(f"page size: {len(html) / 1e6:.2f} MB, items: {args.items}")
+
+    def legacy():
+        content_type = legacy_detect_content_type(soup)
+        return content_type, legacy_extract_job_listings(soup, url), legacy_extract_table_data(soup)
+
+    def indexed():
+        index = build_dom_index(soup)
+        content_type = scrape_core.detect_content_type(soup, index)
+        return content_type, scrape_core.extract_job_listings(soup, url, index), scrape_core.extract_table_data(soup, index)
+
+    legacy_time, legacy_result = timed(legacy, args.repeat)
+    indexed_time, indexed_result = timed(indexed, args.repeat)
+    if legacy_result != indexed_result:
+        raise SystemExit("indexed results differ from the legacy implementation")
+
+    print(f"legacy  detect+extract: {legacy_time * 1000:8.1f} ms")
+    print(f"indexed detect+extract: {indexed_time * 1000:8.1f} ms")
+    print(f"speedup: {legacy_time / indexed_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
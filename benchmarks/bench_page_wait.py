@@ -0,0 +1,124 @@
+"""Compare fixed sleeps with readiness-based waits on local fixture pages.
+
+Then checks that ``wait_for_page_ready`` with a selector only returns once
+the delayed content is on the page, and that a page that never gets ready
+is given up on at the timeout. Requires Chrome and a matching chromedriver.
+Run from the repository root:
+
+    python benchmarks/bench_page_wait.py --runs 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixture_server import serve_directory  # noqa: E402
+from page_wait import wait_for_page_ready  # noqa: E402
+
+# (label, fixture path, expected job cards, seconds until the last card is rendered)
+SCENARIOS = [
+    ("static", "static_jobs.html", 3, 0.0),
+    ("spa 300ms", "delayed_content.html?delay=300&batches=3", 30, 0.6),
+    ("spa 1500ms", "delayed_content.html?delay=1500&batches=3", 30, 1.8),
+    ("spa 4000ms", "delayed_content.html?delay=4000&batches=3", 30, 4.3),
+]
+# Pages that never get ready: (label, fixture path, selector)
+NEVER_READY = [
+    ("missing selector", "static_jobs.html", "[data-never]"),
+    ("endless mutations", "delayed_content.html?delay=0&batches=100000&per_batch=1", None),
+]
+# The hard timeout for those, and how far past it the wait may return
+CHECK_TIMEOUT = 2.0
+TIMEOUT_SLACK = 0.5
+
+
+def make_driver(chromedriver):
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    service = Service(chromedriver) if chromedriver else Service()
+    return webdriver.Chrome(service=service, options=options)
+
+
+def load_fixed(driver, url, seconds):
+    driver.get(url)
+    time.sleep(seconds)
+
+
+def load_ready(driver, url, selector=None):
+    driver.get(url)
+    wait_for_page_ready(driver, timeout=15, selector=selector)
+
+
+def measure(driver, url, expected, loader):
+    """Return (seconds, completeness) for one page load."""
+    start = time.perf_counter()
+    loader(driver, url)
+    elapsed = time.perf_counter() - start
+    found = len(driver.find_elements("css selector", ".job-card"))
+    return elapsed, found / expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--chromedriver", default=None, help="Path to chromedriver (default: Selenium Manager)")
+    args = parser.parse_args()
+
+    strategies = [
+        ("sleep 2s", lambda d, u: load_fixed(d, u, 2)),
+        ("sleep 3s", lambda d, u: load_fixed(d, u, 3)),
+        ("ready", load_ready),
+        ("ready+selector", lambda d, u: load_ready(d, u, "[data-complete]")),
+    ]
+
+    driver = make_driver(args.chromedriver)
+    try:
+        with serve_directory() as base_url:
+            print(f"{'scenario':<12} {'strategy':<16} {'median s':>9} {'complete':>9}")
+            failures = []
+            for label, path, expected, rendered_by in SCENARIOS:
+                url = f"{base_url}/{path}"
+                for name, loader in strategies:
+                    samples = [measure(driver, url, expected, loader) for _ in range(args.runs)]
+                    median = statistics.median(s for s, _ in samples)
+                    completeness = statistics.mean(c for _, c in samples)
+                    print(f"{label:<12} {name:<16} {median:>9.2f} {completeness:>8.0%}")
+                    if name != "ready+selector":
+                        continue
+                    if completeness < 1:
+                        failures.append(f"{label}: ready+selector returned with {completeness:.0%} of the cards")
+                    if min(s for s, _ in samples) < rendered_by:
+                        failures.append(f"{label}: ready+selector returned before the cards were rendered")
+
+            print()
+            print(f"{'never ready':<18} {'elapsed s':>9} {'reason':>8}")
+            for label, path, selector in NEVER_READY:
+                driver.get(f"{base_url}/{path}")
+                result = wait_for_page_ready(driver, timeout=CHECK_TIMEOUT, selector=selector)
+                print(f"{label:<18} {result['elapsed']:>9.2f} {result['reason']:>8}")
+                if not result["timed_out"]:
+                    failures.append(f"{label}: reported {result['reason']!r} instead of timing out")
+                if not CHECK_TIMEOUT <= result["elapsed"] <= CHECK_TIMEOUT + TIMEOUT_SLACK:
+                    failures.append(f"{label}: gave up after {result['elapsed']:.2f}s, timeout {CHECK_TIMEOUT}s")
+    finally:
+        driver.quit()
+
+    print()
+    if failures:
+        print("FAILED:\n  " + "\n  ".join(failures))
+        return 1
+    print("OK: waits with a selector returned with all content loaded and timeouts were honoured")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
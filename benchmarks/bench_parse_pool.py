@@ -0,0 +1,84 @@
+"""Measure extraction throughput with parsing in threads and in a process pool.
+
+Pages from the corpus are "fetched" from memory with a simulated network
+latency by ``scrape_batch``'s threads, then parsed and extracted either in
+those threads (one core, because of the GIL) or in a ``ParsePool`` of 1, 2,
+4, ... worker processes up to the core count. Run from the repository root:
+
+    python benchmarks/bench_parse_pool.py --pages 200 --latency 50
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scrape_core  # noqa: E402
+from batch import scrape_batch  # noqa: E402
+from corpus import load_corpus  # noqa: E402
+from dedupe import DedupeIndex  # noqa: E402
+from pipeline import ParsePool  # noqa: E402
+
+
+class MemoryFetcher:
+    """Serves corpus pages after a fixed delay, standing in for the network."""
+
+    def __init__(self, pages, latency):
+        self.pages = pages
+        self.latency = latency
+
+    def fetch(self, url, **kwargs):
+        time.sleep(self.latency)
+        return {"url": url, "html": self.pages[url.rsplit("#", 1)[0]], "tier": "memory", "cache": None}
+
+
+def run(urls, fetcher, concurrency, pool):
+    dedupe = DedupeIndex()
+
+    def scrape(url):
+        return scrape_core.smart_scrape(url, fetcher=fetcher, metrics_level="off", dedupe=dedupe, pool=pool)
+
+    start = time.perf_counter()
+    errors = sum("error" in result for _, _, result in scrape_batch(urls, scrape, concurrency, concurrency))
+    return len(urls) / (time.perf_counter() - start), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=50, help="Simulated fetch time in ms")
+    parser.add_argument("--concurrency", type=int, default=32, help="Fetch threads")
+    parser.add_argument("--sizes", nargs="+", default=["medium"])
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    pages = {f"https://bench.example/{name}": html for name, html in load_corpus(args.sizes)}
+    names = sorted(pages)
+    # Distinct URLs so the change tracker and per-section memories see separate pages
+    urls = [f"{names[i % len(names)]}#{i}" for i in range(args.pages)]
+    fetcher = MemoryFetcher(pages, args.latency / 1000)
+
+    counts = [1]
+    while counts[-1] * 2 <= args.max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != args.max_workers:
+        counts.append(args.max_workers)
+
+    baseline, errors = run(urls, fetcher, args.concurrency, None)
+    print(f"{os.cpu_count()} cores, {args.pages} pages, {args.latency:.0f} ms fetch latency")
+    print(f"{'parsing in':<16} {'pages/s':>8} {'speedup':>8} {'errors':>7}")
+    print(f"{'fetch threads':<16} {baseline:>8.1f} {1:>8.2f} {errors:>7}")
+    for workers in counts:
+        pool = ParsePool(workers)
+        try:
+            # Start the workers before timing
+            list(pool._executor.map(abs, range(workers)))
+            rate, errors = run(urls, fetcher, args.concurrency, pool)
+        finally:
+            pool.close()
+        print(f"{f'{workers} processes':<16} {rate:>8.1f} {rate / baseline:>8.2f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
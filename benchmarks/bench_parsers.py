@@ -0,0 +1,75 @@
+"""Compare parse time, peak memory and extraction results across parser backends.
+
+Run from the repository root:
+
+    python benchmarks/bench_parsers.py --repeat 5
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scrape_core  # noqa: E402
+from bench_dom_index import build_listing_page  # noqa: E402
+from fixture_server import FIXTURES_DIR  # noqa: E402
+from parsers import AVAILABLE_BACKENDS, make_soup  # noqa: E402
+
+BASE_URL = "https://example.com/page"
+
+
+def load_corpus():
+    """Return (name, html bytes) pairs for the fixture corpus plus a large page."""
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "corpus", "*.html"))):
+        with open(path, "rb") as f:
+            corpus.append((os.path.basename(path), f.read()))
+    corpus.append(("listing-5000.html", build_listing_page(5000).encode("utf-8")))
+    return corpus
+
+
+def parse_time(html, backend, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        make_soup(html, backend)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def parse_peak_memory(html, backend):
+    tracemalloc.start()
+    soup = make_soup(html, backend)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del soup
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"backends installed: {', '.join(AVAILABLE_BACKENDS)}")
+    print(f"{'page':<20} {'backend':<14} {'parse ms':>9} {'peak MB':>8} {'matches':>8}")
+    mismatches = 0
+    for name, html in load_corpus():
+        reference = json.dumps(scrape_core.scrape_html(html, BASE_URL, "html.parser"), sort_keys=True)
+        for backend in AVAILABLE_BACKENDS:
+            seconds = parse_time(html, backend, args.repeat)
+            peak = parse_peak_memory(html, backend)
+            same = json.dumps(scrape_core.scrape_html(html, BASE_URL, backend), sort_keys=True) == reference
+            mismatches += not same
+            print(f"{name:<20} {backend:<14} {seconds * 1000:>9.1f} {peak / 1e6:>8.1f} {'yes' if same else 'NO':>8}")
+
+    if mismatches:
+        raise SystemExit(f"{mismatches} backend results differ from html.parser")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Check per-host rate limits, robots.txt and fairness against local stand-in hosts.
+
+Starts one small HTTP server per loopback address (127.0.0.2, 127.0.0.3, ...),
+each with its own robots.txt, scrapes a batch that is skewed towards one host
+and verifies from the servers' request logs that no host saw more requests,
+faster or more concurrently, than it allows. Run from the repository root:
+
+    python benchmarks/bench_politeness.py --rate 5
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch import scrape_batch  # noqa: E402
+from fetcher import TieredFetcher  # noqa: E402
+from politeness import ROBOTS_AGENT, PolitenessScheduler  # noqa: E402
+from scrape_core import smart_scrape  # noqa: E402
+
+# (loopback address, robots.txt body, pages in the batch)
+HOSTS = [
+    ("127.0.0.2", "", 40),
+    ("127.0.0.3", "User-agent: *\nCrawl-delay: 1\n", 6),
+    ("127.0.0.4", f"User-agent: {ROBOTS_AGENT}\nDisallow: /private/\n", 8),
+    ("127.0.0.5", None, 8),
+]
+# How long each page takes to serve, so overlapping requests are visible
+SERVE_SECONDS = 0.05
+PAGE = (
+    "<html><head><title>Page {n}</title></head><body><main>"
+    + "<p>Paragraph {n} with enough text to count as server-rendered content.</p>" * 8
+    + "</main></body></html>"
+)
+
+
+class StandInHost:
+    """One host: serves robots.txt and pages, and logs every request."""
+
+    def __init__(self, address, robots):
+        self.address = address
+        self.robots = robots
+        self.log = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        host = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/robots.txt":
+                    with host.lock:
+                        host.log.append((time.monotonic(), self.path))
+                    if host.robots is None:
+                        return self.reply(404, "")
+                    return self.reply(200, host.robots, "text/plain")
+                with host.lock:
+                    host.log.append((time.monotonic(), self.path))
+                    host.in_flight += 1
+                    host.max_in_flight = max(host.max_in_flight, host.in_flight)
+                try:
+                    time.sleep(SERVE_SECONDS)
+                    self.reply(200, PAGE.format(n=self.path.rsplit("/", 1)[-1]))
+                finally:
+                    with host.lock:
+                        host.in_flight -= 1
+
+            def reply(self, status, body, content_type="text/html; charset=utf-8"):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((address, 0), Handler)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def page_times(self):
+        return [t for t, path in self.log if path != "/robots.txt"]
+
+    def robots_fetches(self):
+        return sum(1 for _, path in self.log if path == "/robots.txt")
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def batch_urls(hosts):
+    """The skewed batch: every page of the big host first, then the others."""
+    urls = []
+    for host, (_, _, pages) in zip(hosts, HOSTS):
+        for n in range(pages):
+            section = "private" if "Disallow" in (host.robots or "") and n % 2 else "page"
+            urls.append(f"http://{host.address}:{host.port}/{section}/{n}")
+    return urls
+
+
+def max_in_window(times, window):
+    """Most requests that fell into any ``window``-second span."""
+    most = 0
+    start = 0
+    for end in range(len(times)):
+        while times[end] - times[start] >= window:
+            start += 1
+        most = max(most, end - start + 1)
+    return most
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=5.0, help="Requests per second per host")
+    parser.add_argument("--burst", type=int, default=2)
+    parser.add_argument("--per-host", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    hosts = [StandInHost(address, robots) for address, robots, _ in HOSTS]
+    scheduler = PolitenessScheduler(rate=args.rate, burst=args.burst, concurrency=args.per_host)
+    fetcher = TieredFetcher(browser_fetch=None, cache=None, politeness=scheduler)
+    urls = batch_urls(hosts)
+    finished_at = {}
+    errors = {}
+    start = time.monotonic()
+    try:
+        for _, url, result in scrape_batch(
+            urls, lambda u: smart_scrape(u, fetcher=fetcher), args.concurrency, args.per_host, politeness=scheduler
+        ):
+            finished_at[url] = time.monotonic() - start
+            if "error" in result:
+                errors[url] = result["error"]
+    finally:
+        for host in hosts:
+            host.close()
+    elapsed = time.monotonic() - start
+
+    failures = []
+    print(f"{len(urls)} URLs in {elapsed:.2f}s ({len(urls) / elapsed:.1f} pages/s)\n")
+    print(f"{'host':<11} {'pages':>6} {'robots':>7} {'limit/s':>8} {'peak 1s':>8} {'min gap':>8} "
+          f"{'in flight':>9} {'done by':>8}")
+    for host, (_, _, pages) in zip(hosts, HOSTS):
+        times = sorted(host.page_times())
+        stats = scheduler.stats().get(host.address, {})
+        delay = stats.get("crawl_delay")
+        rate = min(args.rate, 1 / delay) if delay else args.rate
+        burst = 1 if delay else args.burst
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        peak = max_in_window(times, 1.0)
+        done_by = max(t for url, t in finished_at.items() if f"//{host.address}:" in url)
+        print(f"{host.address:<11} {len(times):>6} {host.robots_fetches():>7} {rate:>8.1f} {peak:>8} "
+              f"{min(gaps, default=0):>8.3f} {host.max_in_flight:>9} {done_by:>7.2f}s")
+
+        # Tolerance for timer jitter between the scheduler and the server log
+        if peak > burst + rate + 1:
+            failures.append(f"{host.address}: {peak} requests in one second, limit {rate}/s + burst {burst}")
+        if delay and gaps and min(gaps) < delay * 0.9:
+            failures.append(f"{host.address}: requests {min(gaps):.3f}s apart despite crawl-delay {delay}")
+        if host.max_in_flight > args.per_host:
+            failures.append(f"{host.address}: {host.max_in_flight} requests in flight, limit {args.per_host}")
+        if host.robots_fetches() != 1:
+            failures.append(f"{host.address}: robots.txt fetched {host.robots_fetches()} times")
+        if any("/private/" in path for _, path in host.log):
+            failures.append(f"{host.address}: fetched a path disallowed by robots.txt")
+
+    disallowed = [url for url in urls if "/private/" in url]
+    if sorted(errors) != sorted(disallowed):
+        failures.append(f"expected errors for the {len(disallowed)} disallowed URLs, got {errors}")
+    # The small hosts sit behind 40 URLs of the big one in the input; with fair
+    # interleaving they still finish long before it does
+    big_host_done = max(t for url, t in finished_at.items() if f"//{hosts[0].address}:" in url)
+    for host in hosts[2:]:
+        done_by = max(t for url, t in finished_at.items() if f"//{host.address}:" in url)
+        if done_by > big_host_done * 0.75:
+            failures.append(f"{host.address} finished at {done_by:.2f}s, not ahead of the big host ({big_host_done:.2f}s)")
+
+    print()
+    if failures:
+        print("FAILED:\n  " + "\n  ".join(failures))
+        return 1
+    print("OK: per-host rates, crawl-delay, concurrency, robots.txt and fairness all held")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
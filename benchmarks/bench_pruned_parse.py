@@ -0,0 +1,111 @@
+"""Compare building the whole tree with pruned and subtree-only parsing.
+
+For each large corpus page, three ways of getting a soup ready for
+extraction are measured:
+
+* full: parse everything, then decompose scripts, styles and the like
+* pruned: cut those elements from the markup before parsing
+* subtrees: also build only the containers of the page's learned template,
+  as on listing pages scraped with a ``TemplateStore`` once it has one
+
+The corpus pages carry little script or SVG, so a copy of each listing page
+with an inline state blob and an icon per card (as many real sites ship)
+is measured too. Reports element count, best parse time and peak traced
+memory. Run from the repository root:
+
+    python benchmarks/bench_pruned_parse.py --sizes large xlarge --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scrape_core  # noqa: E402
+from corpus import load_corpus  # noqa: E402
+from parsers import make_soup  # noqa: E402
+from templates import TemplateStore  # noqa: E402
+
+BASE_URL = "https://example.com/"
+# An icon as sites inline them, and a framework state blob
+ICON = (
+    '<svg class="icon" viewBox="0 0 24 24"><g fill="none" stroke="currentColor">'
+    + "".join(f'<path d="M{i} {i}l{i + 4} {i + 2}h-{i}v{i + 1}z"/>' for i in range(12))
+    + "</g></svg>"
+)
+STATE = "<script>window.__STATE__ = {" + ",".join(f'"item{i}": {{"id": {i}, "tags": ["a", "b"]}}' for i in range(20000)) + "};</script>"
+
+
+def with_scripts(html):
+    """A page with an inline state blob in the head and an SVG icon in every card."""
+    html = html.replace(b"</head>", STATE.encode() + b"</head>", 1)
+    for card in (b'<div class="job-card">', b'<div class="product-tile">', b'<article class="blog-post">'):
+        html = html.replace(card, card + ICON.encode())
+    return html
+
+
+def parse_full(html):
+    soup = make_soup(html)
+    for tag in soup(scrape_core.UNUSED_TAGS):
+        tag.decompose()
+    return soup
+
+
+def subtrees_for(name, html):
+    """The subtrees scrape_html would build for this page once it has seen it."""
+    url = BASE_URL + name
+    templates = TemplateStore(":memory:")
+    scrape_core.scrape_html(html, url, templates=templates)
+    template = templates.lookup(url)
+    return (template.container,) if template is not None else None
+
+
+def measure(parse, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        soup = parse()
+        best = min(best, time.perf_counter() - start)
+    del soup
+    tracemalloc.start()
+    soup = parse()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del soup
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["large", "xlarge"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'page':<28} {'mode':<9} {'built':>7} {'parse ms':>9} {'peak MB':>8}  subtrees")
+    pages = []
+    for name, html in load_corpus(args.sizes):
+        if name.startswith(tuple(f"{kind}-" for kind in ("blog", "directory", "jobs", "products", "table"))):
+            pages.append((name, html))
+            if name.startswith(("blog-", "jobs-", "products-")):
+                pages.append((name.replace(".html", "+scripts.html"), with_scripts(html)))
+    for name, html in pages:
+        subtrees = subtrees_for(name, html)
+        # (mode, parse, elements built by the parser)
+        modes = [
+            ("full", lambda: parse_full(html), lambda: make_soup(html)),
+            ("pruned", lambda: scrape_core._parse(html, None), lambda: scrape_core._parse(html, None)),
+        ]
+        if subtrees:
+            subtree_parse = lambda: scrape_core._parse(html, None, subtrees)  # noqa: E731
+            modes.append(("subtrees", subtree_parse, subtree_parse))
+        for mode, parse, built in modes:
+            seconds, peak = measure(parse, args.repeat)
+            nodes = len(built().find_all(True))
+            label = ", ".join(subtrees) if mode == "subtrees" else ""
+            print(f"{name:<28} {mode:<9} {nodes:>7} {seconds * 1000:>9.1f} {peak / 1e6:>8.1f}  {label}")
+
+
+if __name__ == "__main__":
+    main()
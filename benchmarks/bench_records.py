@@ -0,0 +1,109 @@
+"""Compare memory and DataFrame conversion of job records as dicts, slotted records and columns.
+
+Builds the same synthetic job records three ways: a list of dicts as the
+extractors return them, a list of ``JobRecord`` and one ``RecordColumns``.
+Every record gets fresh string objects, as text pulled from a page does,
+so the interning of company and location shows in the numbers. Reports the
+memory held by each (tracemalloc, which also slows the build down) and the
+time to convert it to a DataFrame and, with pyarrow installed, an Arrow
+table. Run from the repository root:
+
+    python benchmarks/bench_records.py --records 200000
+"""
+import argparse
+import gc
+import itertools
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from records import HAS_PYARROW, JobRecord, RecordColumns  # noqa: E402
+
+WORDS = "senior data cloud platform remote engineer design secure modern analytics customer mobile".split()
+CITIES = ["Berlin", "London", "Paris", "Remote", "New York", "Toronto", "Madrid", "Amsterdam", "Warsaw", "Lisbon"]
+# Records per scraped page, which share a source URL
+PAGE_SIZE = 50
+
+
+def job_records(count, companies, seed=5):
+    """Yield job dicts with fresh strings, ``companies`` distinct employers."""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            "title": " ".join(rng.choices(WORDS, k=3)) + f" {i}",
+            "company": "".join(["Company ", str(rng.randrange(companies))]),
+            "location": "".join([rng.choice(CITIES), ""]),
+            "description": " ".join(rng.choices(WORDS, k=25)),
+            "link": f"https://jobs.example.com/jobs/{i}",
+        }
+
+
+def build(label, count, companies):
+    if label == "dicts":
+        return list(job_records(count, companies))
+    if label == "slotted":
+        return [JobRecord(**record) for record in job_records(count, companies)]
+    columns = RecordColumns("job")
+    records = job_records(count, companies)
+    for page in range(0, count, PAGE_SIZE):
+        columns.extend(itertools.islice(records, PAGE_SIZE), f"https://jobs.example.com/jobs?page={page // PAGE_SIZE}")
+    return columns
+
+
+def measure_memory(label, count, companies):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    records = build(label, count, companies)
+    elapsed = time.perf_counter() - start
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return records, held, elapsed
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--companies", type=int, default=500)
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    print(f"{args.records:,} job records, {args.companies} companies, {len(CITIES)} locations")
+    print(f"{'layout':<10} {'held MB':>9} {'B/record':>9} {'build s':>8} {'DataFrame s':>12} {'Arrow s':>8}")
+    built = {}
+    for label in ("dicts", "slotted", "columns"):
+        records, held, elapsed = measure_memory(label, args.records, args.companies)
+        if label == "columns":
+            frame, to_frame = timed(records.to_pandas)
+            arrow = timed(records.to_arrow)[1] if HAS_PYARROW else None
+        else:
+            rows = records if label == "dicts" else [record.to_dict() for record in records]
+            frame, to_frame = timed(lambda: pd.DataFrame(rows))
+            if HAS_PYARROW:
+                import pyarrow as pa
+                arrow = timed(lambda: pa.Table.from_pylist(rows))[1]
+            else:
+                arrow = None
+        arrow_text = f"{arrow:>8.2f}" if arrow is not None else f"{'-':>8}"
+        print(f"{label:<10} {held / 1e6:>9.1f} {held / args.records:>9.0f} {elapsed:>8.2f} {to_frame:>12.2f} {arrow_text}")
+        built[label] = records
+        del frame
+
+    # The columns write back out in the dicts' JSON shape
+    assert built["columns"].to_dicts() == built["dicts"]
+    assert all(record == original for record, original in zip(built["slotted"], built["dicts"]))
+
+
+if __name__ == "__main__":
+    main()
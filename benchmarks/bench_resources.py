@@ -0,0 +1,156 @@
+"""Compare page-load time and bytes transferred with and without resource blocking.
+
+Generates fixture pages with heavy images, fonts, stylesheets, video and
+tracker scripts, then loads each one in headless Chrome with no blocking and
+with the policy ``resource_policy`` picks for its content type. Requires
+Chrome and a matching chromedriver. Run from the repository root:
+
+    python benchmarks/bench_resources.py --runs 5
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixture_server import serve_directory  # noqa: E402
+from page_wait import wait_for_page_ready  # noqa: E402
+from parsers import make_soup  # noqa: E402
+from resource_policy import NO_IMAGES_PREFS, ResourcePolicy, policy_for  # noqa: E402
+
+HEAVY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "generated", "heavy")
+
+# (asset path, size in bytes)
+ASSETS = (
+    [(f"img/photo{i}.jpg", 150_000) for i in range(30)]
+    + [("fonts/body.woff2", 120_000), ("fonts/heading.woff2", 120_000)]
+    + [("css/site.css", 80_000), ("media/clip.mp4", 2_000_000)]
+    + [("google-analytics.com/analytics.js", 200_000), ("googletagmanager.com/gtm.js", 150_000)]
+)
+
+_HEAD = (
+    '<head><meta charset="utf-8"><title>{title}</title>'
+    '<link rel="stylesheet" href="css/site.css">'
+    '<script async src="google-analytics.com/analytics.js"></script>'
+    '<script async src="googletagmanager.com/gtm.js"></script></head>'
+)
+_GALLERY = "".join(f'<img src="img/photo{i}.jpg" alt="Photo {i}">' for i in range(30))
+# Article pages embed fewer pictures, or they would be detected as galleries
+_FIGURES = "".join(f'<figure><img src="img/photo{i}.jpg" alt="Figure {i}"></figure>' for i in range(6))
+_VIDEO = '<video preload="auto" src="media/clip.mp4"></video>'
+
+# (label, file, content type, expected records)
+PAGES = [
+    ("jobs", "heavy_jobs.html", "job_listing", 12),
+    ("article", "heavy_article.html", "article", 6),
+]
+
+
+def write_fixtures():
+    """Write the heavy pages and their assets (deterministic bytes)."""
+    rng = random.Random(19)
+    for path, size in ASSETS:
+        full = os.path.join(HEAVY_DIR, path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        if path.endswith(".css"):
+            rule = "@font-face{font-family:b;src:url(../fonts/body.woff2)}" \
+                   "@font-face{font-family:h;src:url(../fonts/heading.woff2)}body{font-family:b}h2,h3{font-family:h}"
+            body = (rule + "".join(f".c{i}{{margin:{i % 9}px}}" for i in range(size // 16))).encode()[:size]
+        elif path.endswith(".js"):
+            body = ("var t=[" + ",".join(str(rng.randrange(10**6)) for _ in range(size // 7)) + "];").encode()[:size]
+        else:
+            body = rng.randbytes(size)
+        with open(full, "wb") as f:
+            f.write(body)
+
+    cards = "".join(
+        f'<div class="job-card"><h3 class="job-title"><a href="/jobs/{i}">Engineer {i}</a></h3>'
+        f'<div class="company">Company {i}</div><div class="location">Berlin</div></div>'
+        for i in range(12)
+    )
+    articles = "".join(
+        f'<article class="post"><h2><a href="/posts/{i}">Post {i}</a></h2><p>{"Long read text. " * 40}</p></article>'
+        for i in range(6)
+    )
+    pages = {
+        "heavy_jobs.html": f"<html>{_HEAD.format(title='Jobs')}<body><main>{cards}{_GALLERY}{_VIDEO}</main></body></html>",
+        "heavy_article.html": f"<html>{_HEAD.format(title='Blog')}<body><main>{articles}{_FIGURES}{_VIDEO}</main></body></html>",
+    }
+    for name, html in pages.items():
+        with open(os.path.join(HEAVY_DIR, name), "w", encoding="utf-8") as f:
+            f.write(html)
+
+
+def make_driver(chromedriver, no_images):
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    if no_images:
+        options.add_experimental_option("prefs", NO_IMAGES_PREFS)
+    service = Service(chromedriver) if chromedriver else Service()
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+    return driver
+
+
+_BYTES_SCRIPT = """
+return performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))
+    .reduce(function (total, entry) { return total + (entry.transferSize || 0); }, 0);
+"""
+
+
+def measure(driver, url):
+    """Return (seconds, bytes transferred, records found, image srcs found) for one load."""
+    driver.get("about:blank")
+    start = time.perf_counter()
+    driver.get(url)
+    wait_for_page_ready(driver, timeout=30)
+    elapsed = time.perf_counter() - start
+    transferred = driver.execute_script(_BYTES_SCRIPT)
+    soup = make_soup(driver.page_source)
+    records = len(soup.select(".job-card")) + len(soup.select("article"))
+    srcs = len([img for img in soup.find_all("img") if img.get("src")])
+    return elapsed, transferred, records, srcs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--chromedriver", default=None, help="Path to chromedriver (default: Selenium Manager)")
+    args = parser.parse_args()
+
+    write_fixtures()
+    # (label, profile without images, policy for a content type)
+    strategies = [
+        ("load everything", False, lambda content_type: ResourcePolicy(())),
+        ("policy, css kept", True, lambda content_type: policy_for(content_type, block_css="off")),
+        ("policy", True, policy_for),
+    ]
+    with serve_directory(HEAVY_DIR) as base_url:
+        print(f"{'page':<8} {'strategy':<18} {'median s':>9} {'median KB':>10} {'records':>8} {'img src':>8}")
+        for name, no_images, choose in strategies:
+            driver = make_driver(args.chromedriver, no_images)
+            try:
+                for label, path, content_type, expected in PAGES:
+                    choose(content_type).apply(driver)
+                    samples = [measure(driver, f"{base_url}/{path}") for _ in range(args.runs)]
+                    seconds = statistics.median(s[0] for s in samples)
+                    kilobytes = statistics.median(s[1] for s in samples) / 1024
+                    records = min(s[2] for s in samples)
+                    srcs = min(s[3] for s in samples)
+                    print(f"{label:<8} {name:<18} {seconds:>9.2f} {kilobytes:>10.0f} {records:>4}/{expected:<3} {srcs:>8}")
+            finally:
+                driver.quit()
+
+
+if __name__ == "__main__":
+    main()
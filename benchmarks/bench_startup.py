@@ -0,0 +1,75 @@
+"""Measure cold-start time of the scraping entry points and which heavy modules they load.
+
+Each target runs in a fresh interpreter. Fails if importing the core for
+parsing pulls in selenium, pandas or streamlit. Run from the repository root:
+
+    python benchmarks/bench_startup.py --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["selenium", "pandas", "streamlit"]
+
+# Name -> (code run in a fresh interpreter, heavy modules it must not load)
+TARGETS = {
+    "python": ("pass", HEAVY_MODULES),
+    "scrape_core (parse only)": ("import scrape_core", HEAVY_MODULES),
+    "cli": ("import cli", HEAVY_MODULES),
+    "app (Streamlit UI)": ("import app", []),
+}
+
+PROBE = """
+import json, sys
+{code}
+print(json.dumps([name for name in {heavy!r} if name in sys.modules]))
+"""
+
+
+def run(code):
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE.format(code=code, heavy=HEAVY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        return elapsed, None, completed.stderr.strip().splitlines()[-1]
+    return elapsed, json.loads(completed.stdout.strip().splitlines()[-1]), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'target':<28} {'median':>9} {'min':>9}  heavy modules loaded")
+    for name, (code, forbidden) in TARGETS.items():
+        samples = []
+        loaded, error = [], None
+        for _ in range(args.repeat):
+            elapsed, loaded, error = run(code)
+            if error:
+                break
+            samples.append(elapsed)
+        if error:
+            print(f"{name:<28} skipped: {error}")
+            continue
+        print(f"{name:<28} {statistics.median(samples) * 1000:7.0f}ms {min(samples) * 1000:7.0f}ms  {', '.join(loaded) or '-'}")
+        bad = [module for module in loaded if module in forbidden]
+        if bad:
+            failures.append(f"{name} loads {', '.join(bad)}")
+
+    if failures:
+        raise SystemExit("; ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
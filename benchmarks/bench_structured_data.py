@@ -0,0 +1,118 @@
+"""Compare scraping listing pages through their schema.org data and through the DOM.
+
+Generates job, product and article pages that carry the same listing twice:
+as cards in the markup and as a JSON-LD ItemList. Each page is scraped as is
+(structured-data fast path) and with the JSON-LD disabled (parse, index,
+detect and the heuristic extractors). Run from the repository root:
+
+    python benchmarks/bench_structured_data.py --items 300 --repeat 5
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics  # noqa: E402
+import scrape_core  # noqa: E402
+
+BASE_URL = "https://shop.example.com/listing"
+WORDS = "senior data cloud platform remote engineer design secure modern analytics customer mobile".split()
+
+
+def _words(rng, count):
+    return " ".join(rng.choices(WORDS, k=count))
+
+
+def job_page(rng, items):
+    records = [
+        {"@type": "JobPosting", "title": f"{_words(rng, 3)} {i}", "url": f"/jobs/{i}",
+         "hiringOrganization": {"@type": "Organization", "name": f"Company {i % 40}"},
+         "jobLocation": {"@type": "Place", "address": {"@type": "PostalAddress", "addressLocality": "Berlin"}},
+         "description": _words(rng, 30)}
+        for i in range(items)
+    ]
+    cards = "".join(
+        f'<div class="job-card"><h3 class="job-title"><a href="{r["url"]}">{r["title"]}</a></h3>'
+        f'<span class="company">{r["hiringOrganization"]["name"]}</span><span class="location">Berlin</span>'
+        f'<p class="description">{r["description"]}</p></div>'
+        for r in records
+    )
+    return records, cards
+
+
+def product_page(rng, items):
+    records = [
+        {"@type": "Product", "name": f"{_words(rng, 3)} {i}", "url": f"/p/{i}", "image": f"/img/{i}.jpg",
+         "offers": {"@type": "Offer", "price": f"{i}.99", "priceCurrency": "USD"}}
+        for i in range(items)
+    ]
+    cards = "".join(
+        f'<div class="product-item"><h2 class="product-name">{r["name"]}</h2><span class="price">${i}.99</span>'
+        f'<img src="{r["image"]}"><a href="{r["url"]}">View</a></div>'
+        for i, r in enumerate(records)
+    )
+    return records, cards
+
+
+def article_page(rng, items):
+    records = [
+        {"@type": "BlogPosting", "headline": f"{_words(rng, 6)} {i}", "url": f"/posts/{i}",
+         "datePublished": f"2024-01-{i % 28 + 1:02d}", "author": {"@type": "Person", "name": "Ada"},
+         "description": _words(rng, 40)}
+        for i in range(items)
+    ]
+    cards = "".join(
+        f'<article class="post"><h2><a href="{r["url"]}">{r["headline"]}</a></h2>'
+        f'<time class="date">{r["datePublished"]}</time><span class="author">Ada</span><p>{r["description"]}</p></article>'
+        for r in records
+    )
+    return records, cards
+
+
+def page(records, cards):
+    item_list = {
+        "@context": "https://schema.org", "@type": "ItemList",
+        "itemListElement": [{"@type": "ListItem", "position": i + 1, "item": r} for i, r in enumerate(records)],
+    }
+    return (
+        f'<html><head><title>Listing</title><script type="application/ld+json">{json.dumps(item_list)}</script>'
+        f'<script>var analytics = 1;</script></head><body><main>{cards}</main></body></html>'
+    )
+
+
+def time_scrape(html, repeat):
+    """Best total and best non-dedupe time; dedupe costs the same on both paths."""
+    best = best_extract = float("inf")
+    for _ in range(repeat):
+        with metrics.collect("on") as collector:
+            start = time.perf_counter()
+            result = scrape_core.scrape_html(html, BASE_URL)
+            elapsed = time.perf_counter() - start
+        dedupe = collector.as_dict()["stages"].get("dedupe", {}).get("wall_s", 0)
+        best = min(best, elapsed)
+        best_extract = min(best_extract, elapsed - dedupe)
+    return best, best_extract, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(21)
+    print(f"{'page':<10} {'path':<11} {'best ms':>8} {'w/o dedupe':>11} {'records':>8}")
+    for label, make, key in (("jobs", job_page, "jobs"), ("products", product_page, "products"),
+                             ("articles", article_page, "articles")):
+        html = page(*make(rng, args.items))
+        for path, markup in (("structured", html), ("dom", html.replace("application/ld+json", "text/plain"))):
+            seconds, extract, result = time_scrape(markup, args.repeat)
+            print(f"{label:<10} {path:<11} {seconds * 1000:>8.1f} {extract * 1000:>11.1f} {len(result.get(key, [])):>8}")
+
+
+if __name__ == "__main__":
+    main()
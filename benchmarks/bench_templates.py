@@ -0,0 +1,67 @@
+"""Compare heuristic extraction with learned per-site templates.
+
+Generates a site of job listing pages that share one layout, learns a
+template from the first page and then scrapes the rest with and without it.
+Reports the time per page and how many records each path extracts. Run from
+the repository root:
+
+    python benchmarks/bench_templates.py --pages 10 --items 300
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scrape_core  # noqa: E402
+from templates import TemplateStore  # noqa: E402
+
+BASE_URL = "https://jobs.example.com/search"
+WORDS = "senior junior data cloud platform backend frontend remote engineer analyst".split()
+
+
+def job_page(rng, items, offset):
+    cards = "".join(
+        f'<div class="job-card"><div class="job-header"><h3 class="job-title">'
+        f'<a href="/jobs/{offset + i}">{" ".join(rng.choices(WORDS, k=3))} {offset + i}</a></h3></div>'
+        f'<span class="company">Company {i % 40}</span><span class="location">{rng.choice(WORDS)}</span>'
+        f'<p class="description">{" ".join(rng.choices(WORDS, k=30))}</p></div>'
+        for i in range(items)
+    )
+    return (
+        "<html><head><title>Jobs</title></head><body><header><nav><a href='/'>Home</a></nav></header>"
+        f"<main>{cards}</main><footer>Footer</footer></body></html>"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--items", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(20)
+    pages = [job_page(rng, args.items, page * args.items) for page in range(args.pages + 1)]
+    store = TemplateStore(":memory:")
+    scrape_core.scrape_html(pages[0], f"{BASE_URL}?page=1", templates=store)
+    stats = store.stats()
+    if not stats["usable"]:
+        sys.exit(f"No usable template learned: {stats}")
+
+    print(f"{'path':<12} {'ms/page':>8} {'records/page':>13}")
+    for label, templates in (("heuristics", None), ("template", store)):
+        start = time.perf_counter()
+        results = [
+            scrape_core.scrape_html(html, f"{BASE_URL}?page={page}", templates=templates)
+            for page, html in enumerate(pages[1:], start=2)
+        ]
+        elapsed = (time.perf_counter() - start) / args.pages * 1000
+        records = sum(len(result.get("jobs", [])) for result in results) / args.pages
+        print(f"{label:<12} {elapsed:>8.1f} {records:>13.0f}")
+    print(f"template stats: {store.stats()}")
+
+
+if __name__ == "__main__":
+    main()
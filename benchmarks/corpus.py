@@ -0,0 +1,183 @@
+"""Versioned, deterministic corpus of fixture pages for the benchmark suite.
+
+Pages are generated from fixed seeds so every machine benchmarks identical
+bytes. Bump CORPUS_VERSION whenever a generator changes; results recorded
+against different corpus versions are not comparable.
+
+    python benchmarks/corpus.py            # write the corpus and its manifest
+    python benchmarks/corpus.py --freeze   # also record the hashes for this version
+"""
+import glob
+import hashlib
+import json
+import os
+import random
+import shutil
+import sys
+
+CORPUS_VERSION = 1
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+HANDWRITTEN_DIR = os.path.join(BENCH_DIR, "fixtures", "corpus")
+GENERATED_DIR = os.path.join(BENCH_DIR, "fixtures", "generated", f"v{CORPUS_VERSION}")
+# Committed hashes of the generated pages; a mismatch means a generator changed
+EXPECTED_MANIFEST = os.path.join(BENCH_DIR, "fixtures", f"corpus-v{CORPUS_VERSION}.manifest.json")
+
+# Size name -> number of repeated items on the page
+SIZES = {"small": 20, "medium": 200, "large": 2000, "xlarge": 10000}
+
+WORDS = (
+    "data platform team remote senior engineer product design cloud service fast "
+    "secure modern analytics customer growth mobile web api scale reliable global"
+).split()
+CITIES = ["Berlin", "London", "Pune", "Austin", "Toronto", "Remote", "Sydney", "Paris"]
+COMPANIES = [f"Company {i}" for i in range(40)]
+
+
+def _sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _page(title, body, rng):
+    """Wrap a body in a realistic shell with scripts, styles and navigation."""
+    nav = "".join(f'<a href="/section/{i}">Section {i}</a>' for i in range(12))
+    script = "var analytics = {" + ",".join(f'"k{i}": {i}' for i in range(50)) + "};"
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\">"
+        f"<title>{title}</title><style>.x{{color:red}}</style>"
+        f"<script>{script}</script></head><body>"
+        f"<header class=\"site-header\"><nav>{nav}</nav></header>"
+        f"<main class=\"main-content\">{body}</main>"
+        f"<footer><p>{_sentence(rng)}</p><svg><path d=\"M0 0L10 10\"/></svg></footer>"
+        "</body></html>"
+    )
+
+
+def job_board(items, rng):
+    cards = []
+    for i in range(items):
+        cards.append(
+            f'<div class="job-card"><h3 class="job-title"><a href="/jobs/{i}">'
+            f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} Engineer {i}</a></h3>"
+            f'<span class="company-name">{rng.choice(COMPANIES)}</span>'
+            f'<span class="job-location">{rng.choice(CITIES)}</span>'
+            f'<p class="job-description">{_sentence(rng, 30)}</p>'
+            f'<a class="apply" href="/jobs/{i}/apply">Apply now</a></div>'
+        )
+    return _page("Jobs", "<h1>Open roles</h1>" + "".join(cards), rng)
+
+
+def product_grid(items, rng):
+    tiles = []
+    for i in range(items):
+        tiles.append(
+            f'<div class="product-tile"><a href="/p/{i}"><img src="/img/{i}.jpg" alt="Product {i}"></a>'
+            f'<h2 class="product-name">{rng.choice(WORDS).title()} {i}</h2>'
+            f'<span class="price">${rng.randint(5, 900)}.{rng.randint(0, 99):02d}</span></div>'
+        )
+    return _page("Shop", "<div class=\"catalog\">" + "".join(tiles) + "</div>", rng)
+
+
+def blog(items, rng):
+    posts = []
+    for i in range(items):
+        posts.append(
+            f'<article class="blog-post"><h2 class="entry-title"><a href="/blog/{i}">'
+            f"{_sentence(rng, 6)}</a></h2>"
+            f'<time class="published-date">2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}</time>'
+            f'<span class="author-name">Author {rng.randint(1, 30)}</span>'
+            f'<p class="entry-summary">{_sentence(rng, 40)}</p></article>'
+        )
+    return _page("Blog", "".join(posts), rng)
+
+
+def big_table(items, rng):
+    rows = "".join(
+        f"<tr><td>{i}</td><td>{rng.choice(CITIES)}</td><td>{rng.randint(1000, 10**7)}</td>"
+        f"<td>{rng.random():.4f}</td></tr>"
+        for i in range(items * 5)
+    )
+    table = f"<table><tr><th>Id</th><th>City</th><th>Population</th><th>Ratio</th></tr>{rows}</table>"
+    return _page("Statistics", table, rng)
+
+
+def link_directory(items, rng):
+    links = "".join(f'<li><a href="/dir/{i}">{_sentence(rng, 4)}</a></li>' for i in range(items))
+    return _page("Directory", f"<ul>{links}</ul>", rng)
+
+
+GENERATORS = {
+    "jobs": job_board,
+    "products": product_grid,
+    "blog": blog,
+    "table": big_table,
+    "directory": link_directory,
+}
+
+
+def generated_pages():
+    """Yield ``(name, html)`` for every generated page."""
+    for kind, generator in GENERATORS.items():
+        for size, items in SIZES.items():
+            rng = random.Random(f"{CORPUS_VERSION}-{kind}-{size}")
+            yield f"{kind}-{size}.html", generator(items, rng)
+
+
+def build_corpus(directory=GENERATED_DIR):
+    """Write the generated pages and a manifest with their sizes and hashes."""
+    if os.path.isdir(directory):
+        shutil.rmtree(directory)
+    os.makedirs(directory)
+    manifest = {"version": CORPUS_VERSION, "pages": {}}
+    for name, html in generated_pages():
+        data = html.encode("utf-8")
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(data)
+        manifest["pages"][name] = {"bytes": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+    with open(os.path.join(directory, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def ensure_corpus(directory=GENERATED_DIR):
+    """Build the corpus unless it already exists, and check it against the committed hashes."""
+    manifest_path = os.path.join(directory, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    else:
+        manifest = build_corpus(directory)
+    if os.path.exists(EXPECTED_MANIFEST):
+        with open(EXPECTED_MANIFEST) as f:
+            expected = json.load(f)
+        if expected["pages"] != manifest["pages"]:
+            raise RuntimeError(
+                f"Generated corpus does not match {os.path.basename(EXPECTED_MANIFEST)}; "
+                "bump CORPUS_VERSION after changing a generator"
+            )
+    return directory
+
+
+def load_corpus(sizes=None):
+    """Return ``(name, html bytes)`` for hand-written and generated pages."""
+    ensure_corpus()
+    pages = []
+    for path in sorted(glob.glob(os.path.join(HANDWRITTEN_DIR, "*.html"))):
+        with open(path, "rb") as f:
+            pages.append((os.path.basename(path), f.read()))
+    for path in sorted(glob.glob(os.path.join(GENERATED_DIR, "*.html"))):
+        name = os.path.basename(path)
+        if sizes and name.rsplit("-", 1)[1][:-len(".html")] not in sizes:
+            continue
+        with open(path, "rb") as f:
+            pages.append((name, f.read()))
+    return pages
+
+
+if __name__ == "__main__":
+    manifest = build_corpus()
+    if "--freeze" in sys.argv:
+        with open(EXPECTED_MANIFEST, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    total = sum(page["bytes"] for page in manifest["pages"].values())
+    print(f"corpus v{CORPUS_VERSION}: {len(manifest['pages'])} pages, {total / 1e6:.1f} MB in {GENERATED_DIR}")
@@ -0,0 +1,239 @@
+"""End-to-end and per-function benchmarks for the smart_scrape pipeline.
+
+Runs micro-benchmarks of every pipeline stage on the versioned corpus and
+end-to-end scrapes against a local HTTP server, then writes the results as
+JSON. Pass --compare to flag regressions against an earlier run.
+
+    python benchmarks/run_benchmarks.py --sizes small,medium
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/baseline.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import scrape_core  # noqa: E402
+from batch import scrape_batch  # noqa: E402
+from corpus import CORPUS_VERSION, GENERATED_DIR, load_corpus  # noqa: E402
+from dom_index import build_dom_index  # noqa: E402
+from fetcher import TieredFetcher  # noqa: E402
+from fixture_server import FIXTURES_DIR, serve_directory  # noqa: E402
+from parsers import make_soup, resolve_backend  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+BASE_URL = "https://example.com/page"
+
+# Content type -> (result key, extractor taking (soup, index))
+EXTRACTORS = {
+    "job_listing": ("jobs", lambda soup, index: scrape_core.extract_job_listings(soup, BASE_URL, index)),
+    "product": ("products", lambda soup, index: scrape_core.extract_products(soup, BASE_URL, index)),
+    "article": ("articles", lambda soup, index: scrape_core.extract_articles(soup, BASE_URL, index)),
+    "table_data": ("tables", lambda soup, index: scrape_core.extract_table_data(soup, index)),
+    "directory": ("links", lambda soup, index: scrape_core.extract_links(soup, BASE_URL, index)),
+    "image_gallery": ("images", lambda soup, index: scrape_core.extract_images(soup, BASE_URL, index)),
+    "general": ("main_content", lambda soup, index: scrape_core.extract_main_content(soup, index)),
+}
+
+
+def summarize(samples):
+    """Return p50/p95/mean of a list of seconds, in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "runs": len(ordered),
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far."""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return usage / 1024 if sys.platform != "darwin" else usage / (1024 * 1024)
+
+
+def time_call(func, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return samples, result
+
+
+def micro_benchmarks(pages, repeat):
+    """Time each pipeline stage separately on every corpus page."""
+    results = {}
+    for name, html in pages:
+        stages = {}
+
+        def parse():
+            soup = make_soup(html)
+            for tag in soup(["script", "style", "noscript", "iframe", "svg"]):
+                tag.decompose()
+            return soup
+
+        stages["parse"], soup = time_call(parse, repeat)
+        stages["build_dom_index"], index = time_call(lambda: build_dom_index(soup), repeat)
+        stages["detect_content_type"], content_type = time_call(lambda: scrape_core.detect_content_type(soup, index), repeat)
+        key, extractor = EXTRACTORS.get(content_type, EXTRACTORS["general"])
+        stages[f"extract:{key}"], records = time_call(lambda: extractor(soup, index), repeat)
+        if key in ("jobs", "products", "articles"):
+            stages["remove_redundant_data"], _ = time_call(lambda: scrape_core.remove_redundant_data(records), repeat)
+        stages["scrape_html"], _ = time_call(lambda: scrape_core.scrape_html(html, BASE_URL), repeat)
+
+        results[name] = {
+            "bytes": len(html),
+            "content_type": content_type,
+            "records": len(records),
+            "stages": {stage: summarize(samples) for stage, samples in stages.items()},
+        }
+        print(f"  {name:<24} {content_type:<12} scrape_html p50 {results[name]['stages']['scrape_html']['p50_ms']:9.1f} ms")
+    return results
+
+
+def end_to_end(pages, rounds, concurrency):
+    """Scrape every page through a local HTTP server, sequentially and concurrently."""
+    # HTTP tier only, without the response cache, so every request does the full work
+    fetcher = TieredFetcher(browser_fetch=None, cache=None)
+    results = {}
+    with serve_directory(FIXTURES_DIR) as base_url:
+        urls = []
+        for name, _ in pages:
+            folder = "corpus" if os.path.exists(os.path.join(FIXTURES_DIR, "corpus", name)) else os.path.relpath(GENERATED_DIR, FIXTURES_DIR)
+            urls.append(f"{base_url}/{folder}/{name}")
+        urls = urls * rounds
+
+        latencies = []
+        errors = 0
+        start = time.perf_counter()
+        for url in urls:
+            request_start = time.perf_counter()
+            data = scrape_core.smart_scrape(url, fetcher=fetcher)
+            latencies.append(time.perf_counter() - request_start)
+            errors += "error" in data
+        wall = time.perf_counter() - start
+        results["sequential"] = dict(summarize(latencies), pages_per_s=len(urls) / wall, errors=errors)
+
+        finished = {}
+
+        def timed_scrape(url):
+            request_start = time.perf_counter()
+            data = scrape_core.smart_scrape(url, fetcher=fetcher)
+            data["_elapsed"] = time.perf_counter() - request_start
+            return data
+
+        start = time.perf_counter()
+        for index, _, data in scrape_batch(urls, timed_scrape, max_concurrency=concurrency, per_host=concurrency):
+            finished[index] = data
+        wall = time.perf_counter() - start
+        latencies = [data.get("_elapsed", 0.0) for data in finished.values()]
+        errors = sum("error" in data for data in finished.values())
+        results["concurrent"] = dict(
+            summarize(latencies), pages_per_s=len(urls) / wall, errors=errors, concurrency=concurrency
+        )
+    for mode, stats in results.items():
+        print(f"  {mode:<11} {stats['pages_per_s']:7.1f} pages/s  p50 {stats['p50_ms']:8.1f} ms  p95 {stats['p95_ms']:8.1f} ms  errors {stats['errors']}")
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, threshold):
+    """Print p50 changes against a baseline run and return the regressions."""
+    regressions = []
+    if baseline.get("corpus_version") != current["corpus_version"]:
+        print(f"warning: baseline uses corpus v{baseline.get('corpus_version')}, this run v{current['corpus_version']}")
+
+    def check(label, new, old):
+        if not old:
+            return
+        change = (new - old) / old
+        flag = "REGRESSION" if change > threshold else ""
+        print(f"  {label:<56} {old:9.1f} -> {new:9.1f} ms  {change:+7.1%} {flag}")
+        if flag:
+            regressions.append(label)
+
+    for page, stats in current["micro"].items():
+        old_page = baseline.get("micro", {}).get(page)
+        if not old_page:
+            continue
+        for stage, values in stats["stages"].items():
+            old_stage = old_page["stages"].get(stage)
+            if old_stage:
+                check(f"{page} {stage}", values["p50_ms"], old_stage["p50_ms"])
+    for mode, values in current.get("end_to_end", {}).items():
+        old_mode = baseline.get("end_to_end", {}).get(mode)
+        if old_mode:
+            check(f"end_to_end {mode}", values["p50_ms"], old_mode["p50_ms"])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="small,medium,large", help="Comma-separated corpus sizes (small,medium,large,xlarge)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per micro-benchmark")
+    parser.add_argument("--rounds", type=int, default=3, help="Passes over the corpus end to end")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--skip-e2e", action="store_true")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative p50 slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    pages = load_corpus(set(args.sizes.split(",")))
+    print(f"corpus v{CORPUS_VERSION}: {len(pages)} pages, parser {resolve_backend()}")
+
+    report = {
+        "corpus_version": CORPUS_VERSION,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parser": resolve_backend(),
+        "settings": vars(args),
+    }
+    print("micro-benchmarks:")
+    report["micro"] = micro_benchmarks(pages, args.repeat)
+    report["peak_rss_mb_micro"] = peak_rss_mb()
+    if not args.skip_e2e:
+        print("end to end:")
+        report["end_to_end"] = end_to_end(pages, args.rounds, args.concurrency)
+    report["peak_rss_mb"] = peak_rss_mb()
+    print(f"peak RSS: {report['peak_rss_mb']:.0f} MB")
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"compared with {args.compare}:")
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            raise SystemExit(f"{len(regressions)} regressions over {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+from http_cache import normalize_url
+from parsers import decode_html, strip_elements
+
+DEFAULT_CHANGES_PATH = os.environ.get(
+    "SCRAPER_CHANGES_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "ai_web_scraper", "changes.sqlite"),
+)
+
+# Result list key -> fields identifying an item; items with the same identity
+# but other differences are reported as changed. None means the item itself.
+DIFF_KEYS = {
+    "jobs": ("title", "company", "location", "link"),
+    "products": ("name", "link"),
+    "articles": ("title", "link"),
+    "links": ("url",),
+    "images": ("url",),
+    "headings": ("level", "text"),
+    "main_content": None,
+    "table_rows": None,
+}
+# Result keys describing one fetch rather than the page content
+_TRANSIENT_KEYS = {"_metrics", "changes", "stored", "cache", "fetch_tier"}
+
+# Elements no extractor reads (scrape_core drops them before parsing)
+_IGNORED_TAGS = ("script", "style", "noscript", "iframe", "svg", "template")
+_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+_SPACES = re.compile(r"\s+")
+
+
+def body_fingerprint(body):
+    """Hash of the raw response body."""
+    if isinstance(body, str):
+        body = body.encode("utf-8", errors="replace")
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def content_fingerprint(markup):
+    """Hash of the whole document as the extractors see it.
+
+    Read from the raw markup, so the same page hashes the same however much
+    of it a scrape parses. Scripts, styles, comments and the other elements
+    dropped before parsing are left out, so tokens and timestamps in them do
+    not count as changes; everything else, tags and attributes included, does.
+    """
+    markup = _COMMENT.sub("", strip_elements(decode_html(markup), _IGNORED_TAGS))
+    return hashlib.blake2b(_SPACES.sub(" ", markup).strip().encode("utf-8"), digest_size=16).hexdigest()
+
+
+def data_fingerprint(data):
+    """Hash of structured data extracted without a parse tree (see ``structured_data``)."""
+    return hashlib.blake2b(json.dumps(data, sort_keys=True).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _items(result, key):
+    if key == "table_rows":
+        return [
+            {"table": index, **row}
+            for index, table in enumerate(result.get("tables") or [])
+            for row in table["rows"]
+        ]
+    return result.get(key) or []
+
+
+def _identity(item, fields):
+    if fields is None:
+        return json.dumps(item, sort_keys=True, ensure_ascii=False)
+    return json.dumps([item.get(field) for field in fields], ensure_ascii=False)
+
+
+def diff_results(old, new):
+    """Return the items added, removed and changed between two scrape results."""
+    diff = {"added": {}, "removed": {}, "changed": {}}
+    for key, fields in DIFF_KEYS.items():
+        before = {_identity(item, fields): item for item in _items(old, key)}
+        after = {_identity(item, fields): item for item in _items(new, key)}
+        added = [item for identity, item in after.items() if identity not in before]
+        removed = [item for identity, item in before.items() if identity not in after]
+        changed = [
+            {"before": before[identity], "after": item}
+            for identity, item in after.items()
+            if identity in before and before[identity] != item
+        ]
+        for name, items in (("added", added), ("removed", removed), ("changed", changed)):
+            if items:
+                diff[name][key] = items
+    diff["summary"] = {name: sum(len(items) for items in diff[name].values()) for name in ("added", "removed", "changed")}
+    return diff
+
+
+class ChangeTracker:
+    """Per-URL fingerprints and last results, for incremental re-scrapes.
+
+    For every URL the hash of the raw body, the hash of the document without
+    its scripts, styles and comments, and the last extracted result are kept
+    in SQLite. An identical body skips parsing entirely, and so does an
+    identical cleaned document. Either way the previous result is returned.
+    Otherwise the new result is stored and compared with the previous one.
+    """
+
+    def __init__(self, path=DEFAULT_CHANGES_PATH):
+        self.path = path
+        self.counters = {"new": 0, "unchanged": 0, "changed": 0}
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                body_hash TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                result BLOB NOT NULL,
+                checked_at REAL NOT NULL,
+                changed_at REAL NOT NULL
+            )"""
+        )
+
+    def get(self, url):
+        """Return the stored fingerprints of a URL (result still compressed), or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body_hash, content_hash, result, checked_at, changed_at FROM pages WHERE key = ?",
+                (normalize_url(url),),
+            ).fetchone()
+        if row is None:
+            return None
+        body_hash, content_hash, result, checked_at, changed_at = row
+        return {
+            "body_hash": body_hash,
+            "content_hash": content_hash,
+            "result": result,
+            "checked_at": checked_at,
+            "changed_at": changed_at,
+        }
+
+    def unchanged(self, url, previous, level, body_hash=None):
+        """Return the previous result for a page that has not changed at ``level``."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE pages SET checked_at = ?, body_hash = COALESCE(?, body_hash) WHERE key = ?",
+                (now, body_hash, normalize_url(url)),
+            )
+            self.counters["unchanged"] += 1
+        result = json.loads(zlib.decompress(previous["result"]))
+        result["changes"] = {
+            "status": "unchanged",
+            "level": level,
+            "changed_at": previous["changed_at"],
+            "checked_at": previous["checked_at"],
+        }
+        return result
+
+    def record(self, url, result, body_hash, content_hash, previous=None):
+        """Store a freshly extracted result and return its diff against the previous one."""
+        stored = {key: value for key, value in result.items() if key not in _TRANSIENT_KEYS}
+        blob = zlib.compress(json.dumps(stored, ensure_ascii=False).encode("utf-8"), 6)
+        now = time.time()
+        if previous is None:
+            changes = {"status": "new"}
+        else:
+            changes = diff_results(json.loads(zlib.decompress(previous["result"])), stored)
+            # The region changed but no extracted record did
+            changes["status"] = "changed" if any(changes["summary"].values()) else "unchanged"
+            changes["checked_at"] = previous["checked_at"]
+        changed_at = now if changes["status"] != "unchanged" else previous["changed_at"]
+        changes["changed_at"] = changed_at
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_url(url), body_hash, content_hash, blob, now, changed_at),
+            )
+            self.counters[changes["status"]] += 1
+        return changes
+
+    def forget(self, url):
+        """Drop the fingerprints of a URL so its next scrape runs in full."""
+        with self._lock:
+            self._db.execute("DELETE FROM pages WHERE key = ?", (normalize_url(url),))
+
+    def stats(self):
+        """Return the counters together with the number of tracked URLs."""
+        with self._lock:
+            pages = self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            return dict(self.counters, pages=pages)
+
+
+_default_tracker = None
+_default_tracker_lock = threading.Lock()
+
+
+def get_change_tracker():
+    """Return the process-wide change tracker, creating it on first use."""
+    global _default_tracker
+    with _default_tracker_lock:
+        if _default_tracker is None:
+            _default_tracker = ChangeTracker()
+        return _default_tracker
@@ -0,0 +1,162 @@
+"""Scrape URLs headlessly and write the results as NDJSON to stdout.
+
+    python cli.py urls.txt > results.ndjson
+    cat urls.txt | python cli.py --records --http-only
+
+Needs neither Streamlit nor pandas; selenium is only loaded when a page has
+to be rendered in the browser.
+"""
+import time
+
+_started = time.perf_counter()
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import sys  # noqa: E402
+from functools import partial  # noqa: E402
+
+import metrics  # noqa: E402
+from batch import DEFAULT_CONCURRENCY, DEFAULT_PER_HOST, read_url_list, scrape_batch  # noqa: E402
+from change_tracker import get_change_tracker  # noqa: E402
+from dedupe import get_dedupe_index  # noqa: E402
+from export import iter_records  # noqa: E402
+from fetcher import TieredFetcher  # noqa: E402
+from http_cache import get_response_cache  # noqa: E402
+from parsers import BACKENDS  # noqa: E402
+from pipeline import DEFAULT_PARSE_WORKERS, ParsePool  # noqa: E402
+from politeness import DEFAULT_HOST_RATE, PolitenessScheduler  # noqa: E402
+from resilience import MAX_ATTEMPTS, Resilience  # noqa: E402
+from results_store import get_results_store  # noqa: E402
+from scrape_core import fetch_with_browser, smart_scrape  # noqa: E402
+from templates import get_template_store  # noqa: E402
+
+_imported = time.perf_counter()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Scrape URLs and write one JSON object per line to stdout.")
+    parser.add_argument("urls", nargs="?", default="-", help="File with one URL per line, or - for stdin (default)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST)
+    parser.add_argument("--host-rate", type=float, default=DEFAULT_HOST_RATE,
+                        help="Requests per second per host, before any robots.txt crawl-delay")
+    parser.add_argument("--ignore-robots", action="store_true", help="Do not fetch or obey robots.txt")
+    parser.add_argument("--impolite", action="store_true", help="No per-host rate limits or robots.txt at all")
+    parser.add_argument("--retries", type=int, default=MAX_ATTEMPTS - 1,
+                        help="Retries per request for timeouts, connection errors and 429/5xx responses")
+    parser.add_argument("--http-only", action="store_true", help="Never fall back to the headless browser")
+    parser.add_argument("--wait-selector", help="Render every page in the browser and wait for this selector")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the persistent response cache")
+    parser.add_argument("--force-refresh", action="store_true", help="Refetch pages even when they are cached")
+    parser.add_argument("--parser", choices=BACKENDS + ["auto"], help="HTML parser backend")
+    parser.add_argument("--parse-workers", type=int, default=DEFAULT_PARSE_WORKERS,
+                        help="Processes that parse and extract pages (default: one per core, none on a single "
+                             "core; 0 parses in the fetch threads)")
+    parser.add_argument("--metrics", choices=metrics.LEVELS, help="Add per-stage timings under _metrics")
+    parser.add_argument("--dedupe", action="store_true", help="Drop listing records seen in earlier pages or runs")
+    parser.add_argument("--store", action="store_true", help="Also upsert the records into the local results store")
+    parser.add_argument("--track-changes", action="store_true",
+                        help="Skip re-parsing unchanged pages and report changes under \"changes\"")
+    parser.add_argument("--changed-only", action="store_true",
+                        help="With --track-changes, leave unchanged pages out of the output")
+    parser.add_argument("--no-templates", action="store_true",
+                        help="Always use the heuristic extractors, never selectors learned for a site")
+    parser.add_argument("--records", action="store_true", help="Write flat export records instead of one object per page")
+    parser.add_argument("--ordered", action="store_true", help="Write pages in input order instead of as they finish")
+    parser.add_argument("--timing", action="store_true", help="Report startup time and throughput on stderr")
+    return parser
+
+
+def read_urls(source):
+    if source == "-":
+        return read_url_list(sys.stdin.read())
+    with open(source, encoding="utf-8") as f:
+        return read_url_list(f.read())
+
+
+def iter_results(urls, scrape, ordered, max_concurrency, per_host, politeness=None):
+    """Yield results as they finish, or buffered back into input order."""
+    finished = scrape_batch(urls, scrape, max_concurrency=max_concurrency, per_host=per_host, politeness=politeness)
+    if not ordered:
+        for _, _, result in finished:
+            yield result
+        return
+    pending = {}
+    next_index = 0
+    for index, _, result in finished:
+        pending[index] = result
+        while next_index in pending:
+            yield pending.pop(next_index)
+            next_index += 1
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    urls = read_urls(args.urls)
+    if not urls:
+        print("No URLs given", file=sys.stderr)
+        return 2
+
+    browser_fetch = None if args.http_only else fetch_with_browser
+    if args.wait_selector and browser_fetch is None:
+        print("--wait-selector needs the browser; drop --http-only", file=sys.stderr)
+        return 2
+    cache = None if args.no_cache else get_response_cache()
+    politeness = None if args.impolite else PolitenessScheduler(
+        rate=args.host_rate, concurrency=args.per_host, obey_robots=not args.ignore_robots, cache=cache
+    )
+    fetcher = TieredFetcher(
+        browser_fetch=browser_fetch, cache=cache, politeness=politeness,
+        resilience=Resilience(max_attempts=args.retries + 1),
+    )
+    pool = ParsePool(args.parse_workers) if args.parse_workers > 0 else None
+    scrape = partial(
+        smart_scrape, fetcher=fetcher, pool=pool, wait_selector=args.wait_selector,
+        force_refresh=args.force_refresh, parser=args.parser, metrics_level=args.metrics,
+        dedupe=get_dedupe_index() if args.dedupe else None,
+        store=get_results_store() if args.store else None,
+        tracker=get_change_tracker() if args.track_changes or args.changed_only else None,
+        templates=None if args.no_templates else get_template_store(),
+    )
+
+    ready = time.perf_counter()
+    pages = failed = 0
+    out = sys.stdout
+    try:
+        for result in iter_results(urls, scrape, args.ordered, args.concurrency, args.per_host, politeness):
+            pages += 1
+            if "error" in result:
+                failed += 1
+            elif args.changed_only and result.get("changes", {}).get("status") == "unchanged":
+                continue
+            rows = iter_records(result) if args.records and "error" not in result else [result]
+            for row in rows:
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            out.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); stop quietly
+        sys.stderr.close()
+        return 1
+    finally:
+        if pool is not None:
+            pool.close()
+
+    if args.timing:
+        elapsed = time.perf_counter() - ready
+        print(
+            f"imports {(_imported - _started) * 1000:.0f} ms, ready {(ready - _started) * 1000:.0f} ms; "
+            f"{pages} pages ({failed} failed) in {elapsed:.2f}s, {pages / elapsed if elapsed else 0:.1f} pages/s",
+            file=sys.stderr,
+        )
+        if pool is not None:
+            stats = pool.stats()
+            print(
+                f"{stats['workers']} parse workers; fetchers waited for the parse queue "
+                f"{stats['queue_waits']} times ({stats['queue_wait_s']:.2f}s)",
+                file=sys.stderr,
+            )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,438 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+from collections import Counter, deque
+from operator import eq
+
+DEFAULT_DEDUPE_PATH = os.environ.get(
+    "SCRAPER_DEDUPE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "ai_web_scraper", "fingerprints.sqlite"),
+)
+# Records remembered before the oldest are forgotten, on disk and in memory
+DEFAULT_MAX_RECORDS = 2_000_000
+DEFAULT_MAX_MEMORY_RECORDS = 100_000
+# Estimated Jaccard similarity of the shingle sets above which records are duplicates
+DEFAULT_THRESHOLD = 0.7
+# Record kinds where a near-duplicate is the same item reposted. Product variants
+# (sizes, colours) read almost alike but are different items, so other kinds
+# only drop records identical down to their URLs.
+NEAR_DUPLICATE_KINDS = frozenset({"job", "article"})
+
+NUM_HASHES = 64
+# 16 bands of 4 rows: pairs above ~0.5 similarity almost always share a band
+BANDS = 16
+ROWS = NUM_HASHES // BANDS
+# Word pairs: a one-word edit changes few of them, unlike 3-word shingles
+SHINGLE_WORDS = 2
+# Candidates compared per record, most shared bands first; bounds the cost on
+# pages of templated records that all land in the same buckets
+MAX_CANDIDATES = 32
+
+# Fields that locate a record rather than describe it; a repost keeps its text
+# but usually gets a new link
+URL_FIELDS = {"link", "apply_link", "url", "image_url", "source_url"}
+
+_NON_WORD = re.compile(r"[^\w]+")
+_EMPTY_BIN = 0xFFFFFFFF
+
+
+def normalize(text):
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def record_text(record):
+    """Return the normalized descriptive text of a record, without its URLs."""
+    parts = []
+    for key, value in record.items():
+        if key in URL_FIELDS or key == "record_type" or not isinstance(value, str):
+            continue
+        if value:
+            parts.append(normalize(value))
+    return " ".join(part for part in parts if part)
+
+
+def shingles(text, size=SHINGLE_WORDS):
+    """Return the set of ``size``-word shingles of normalized text."""
+    words = text.split()
+    if len(words) <= size:
+        return {text} if text else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash(shingle_set, num_hashes=NUM_HASHES):
+    """One-permutation MinHash signature of a shingle set.
+
+    Every shingle is hashed once; the low bits pick one of ``num_hashes``
+    bins and the bin keeps its smallest remaining value. Empty bins borrow
+    from the next filled bin so short texts still get a full signature.
+    """
+    bins = [_EMPTY_BIN] * num_hashes
+    for shingle in shingle_set:
+        value = zlib.crc32(shingle.encode("utf-8"))
+        index = value % num_hashes
+        value //= num_hashes
+        if value < bins[index]:
+            bins[index] = value
+    if _EMPTY_BIN in bins and len(set(bins)) > 1:
+        # Densify: fill empty bins from the next filled one, offset by the distance
+        for i in range(num_hashes):
+            if bins[i] != _EMPTY_BIN:
+                continue
+            for step in range(1, num_hashes):
+                source = bins[(i + step) % num_hashes]
+                if source != _EMPTY_BIN:
+                    bins[i] = (source + step * 0x9E3779B1) & 0xFFFFFFF
+                    break
+    return bins
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(map(eq, a, b)) / len(a)
+
+
+def _band_keys(kind, signature):
+    prefix = kind.encode("utf-8") + b":"
+    packed = array("I", signature).tobytes()
+    step = ROWS * 4
+    return [prefix + bytes((band,)) + packed[band * step:(band + 1) * step] for band in range(BANDS)]
+
+
+def _exact_key(kind, text):
+    return hashlib.blake2b(f"{kind}:{text}".encode("utf-8"), digest_size=16).digest()
+
+
+def _record_urls(record):
+    return " ".join(str(record.get(key)) for key in sorted(URL_FIELDS) if record.get(key))
+
+
+def _dedupe_text(record):
+    # Nothing descriptive: fall back to the record's URLs
+    return record_text(record) or _record_urls(record)
+
+
+def _exact_text(record):
+    # URLs included, so only the very same record matches; a repost with a new
+    # link is left to the near-duplicate check
+    return f"{record_text(record)}\n{_record_urls(record)}"
+
+
+def fingerprint(record, kind=""):
+    """Return ``(exact_key, signature)``, what ``DedupeIndex`` compares a record by.
+
+    Computing it is the CPU-heavy part of a check; worker processes do it
+    and pass the result to ``DedupeIndex.filter`` in the process holding
+    the index.
+    """
+    return _exact_key(kind, _exact_text(record)), array("I", minhash(shingles(_dedupe_text(record))))
+
+
+class _MemoryStore:
+    """Bounded in-process fingerprint store; the oldest records go first."""
+
+    def __init__(self, max_records):
+        self.max_records = max_records
+        self.exact = {}
+        self.bands = {}
+        self.signatures = {}
+        self.order = deque()
+        self.next_id = 0
+
+    def find_exact(self, key):
+        return self.exact.get(key)
+
+    def candidates(self, band_keys):
+        found = Counter()
+        for key in band_keys:
+            ids = self.bands.get(hash(key))
+            if ids is None:
+                continue
+            if isinstance(ids, int):
+                found[ids] += 1
+            else:
+                found.update(ids)
+        return [record_id for record_id, _ in found.most_common(MAX_CANDIDATES)]
+
+    def signature(self, record_id):
+        return self.signatures.get(record_id)
+
+    def add(self, exact_key, signature, band_keys, url):
+        record_id = self.next_id
+        self.next_id += 1
+        self.exact[exact_key] = record_id
+        self.signatures[record_id] = array("I", signature)
+        # Keys are kept as their hashes and single ids unboxed, which roughly
+        # halves the memory per record
+        band_hashes = tuple(hash(key) for key in band_keys)
+        for key in band_hashes:
+            ids = self.bands.get(key)
+            if ids is None:
+                self.bands[key] = record_id
+            elif isinstance(ids, int):
+                self.bands[key] = [ids, record_id]
+            else:
+                ids.append(record_id)
+        self.order.append((record_id, exact_key, band_hashes))
+        while len(self.order) > self.max_records:
+            self._forget(*self.order.popleft())
+        return record_id
+
+    def _forget(self, record_id, exact_key, band_hashes):
+        if self.exact.get(exact_key) == record_id:
+            del self.exact[exact_key]
+        del self.signatures[record_id]
+        for key in band_hashes:
+            ids = self.bands[key]
+            if isinstance(ids, int):
+                del self.bands[key]
+                continue
+            ids.remove(record_id)
+            if len(ids) == 1:
+                self.bands[key] = ids[0]
+
+    def count(self):
+        return len(self.signatures)
+
+    def begin(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def clear(self):
+        self.__init__(self.max_records)
+
+    def close(self):
+        pass
+
+
+class _SQLiteStore:
+    """Fingerprints and LSH bands in SQLite, so memory use does not grow with the data."""
+
+    def __init__(self, path, max_records, max_age):
+        self.max_records = max_records
+        self.max_age = max_age
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS fingerprints (
+                id INTEGER PRIMARY KEY,
+                exact_key BLOB NOT NULL UNIQUE,
+                signature BLOB NOT NULL,
+                url TEXT,
+                seen_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS bands (band_key BLOB NOT NULL, fp_id INTEGER NOT NULL,"
+            " PRIMARY KEY (band_key, fp_id)) WITHOUT ROWID"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS bands_fp ON bands (fp_id)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS fingerprints_seen ON fingerprints (seen_at)")
+        self._pending = 0
+        self.prune()
+
+    def find_exact(self, key):
+        row = self._db.execute("SELECT id FROM fingerprints WHERE exact_key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def candidates(self, band_keys):
+        placeholders = ",".join("?" * len(band_keys))
+        rows = self._db.execute(
+            f"SELECT fp_id FROM bands WHERE band_key IN ({placeholders})"
+            " GROUP BY fp_id ORDER BY COUNT(*) DESC LIMIT ?", (*band_keys, MAX_CANDIDATES),
+        )
+        return [row[0] for row in rows]
+
+    def signature(self, record_id):
+        row = self._db.execute("SELECT signature FROM fingerprints WHERE id = ?", (record_id,)).fetchone()
+        return array("I", row[0]).tolist() if row else None
+
+    def add(self, exact_key, signature, band_keys, url):
+        # A replaced row gets a new id; its bands would otherwise point at nothing
+        self._db.execute(
+            "DELETE FROM bands WHERE fp_id IN (SELECT id FROM fingerprints WHERE exact_key = ?)", (exact_key,)
+        )
+        cursor = self._db.execute(
+            "INSERT OR REPLACE INTO fingerprints (exact_key, signature, url, seen_at) VALUES (?, ?, ?, ?)",
+            (exact_key, array("I", signature).tobytes(), url, time.time()),
+        )
+        record_id = cursor.lastrowid
+        self._db.executemany("INSERT OR IGNORE INTO bands VALUES (?, ?)", [(key, record_id) for key in band_keys])
+        self._pending += 1
+        return record_id
+
+    def prune(self):
+        """Forget records past ``max_age`` seconds and the oldest beyond ``max_records``."""
+        cutoff = None
+        if self.max_age:
+            row = self._db.execute(
+                "SELECT MAX(id) FROM fingerprints WHERE seen_at < ?", (time.time() - self.max_age,)
+            ).fetchone()
+            cutoff = row[0]
+        total, last = self._db.execute("SELECT COUNT(*), MAX(id) FROM fingerprints").fetchone()
+        if total > self.max_records:
+            # ids only grow, so the oldest records have the lowest ids
+            overflow = last - self.max_records
+            cutoff = max(cutoff or 0, overflow)
+        if cutoff:
+            self._db.execute("DELETE FROM bands WHERE fp_id <= ?", (cutoff,))
+            self._db.execute("DELETE FROM fingerprints WHERE id <= ?", (cutoff,))
+
+    def count(self):
+        return self._db.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
+
+    def begin(self):
+        self._db.execute("BEGIN")
+
+    def commit(self):
+        self._db.execute("COMMIT")
+        # Pruning after every insert would cost a COUNT(*) each time
+        if self._pending >= 1000:
+            self._pending = 0
+            self.prune()
+
+    def clear(self):
+        self._db.execute("DELETE FROM bands")
+        self._db.execute("DELETE FROM fingerprints")
+
+    def close(self):
+        self._db.close()
+
+
+class DedupeIndex:
+    """Near-duplicate detector for scraped records using MinHash and LSH.
+
+    Each record's descriptive text (URLs excluded, so reposts still match) is
+    normalized, cut into word shingles and reduced to a MinHash signature.
+    The signature is split into bands; records sharing a band are candidates
+    and count as duplicates when their estimated similarity reaches
+    ``threshold``. ``filter`` first drops repeated titles within the records
+    it is given, then identical records by an exact hash. Only
+    candidates are compared, never every pair. The near-duplicate check only
+    runs for the kinds in ``near_kinds``; records of other kinds are dropped
+    only when identical, URLs included.
+
+    With ``path`` the fingerprints live in SQLite and persist across pages,
+    batches and runs; otherwise they are kept in memory. Either way at most
+    ``max_records`` are remembered, and ``max_age`` (seconds) forgets old ones.
+    Records of different ``kind`` never match each other.
+    """
+
+    def __init__(self, path=None, threshold=DEFAULT_THRESHOLD, max_records=None, max_age=None,
+                 near_kinds=NEAR_DUPLICATE_KINDS):
+        self.path = path
+        self.threshold = threshold
+        self.near_kinds = frozenset(near_kinds)
+        self.counters = {"checked": 0, "exact": 0, "near": 0, "unique": 0}
+        self._lock = threading.Lock()
+        if path:
+            self._store = _SQLiteStore(path, max_records or DEFAULT_MAX_RECORDS, max_age)
+        else:
+            self._store = _MemoryStore(max_records or DEFAULT_MAX_MEMORY_RECORDS)
+
+    def _match(self, kind, record, precomputed=None):
+        """Return ``(duplicate_kind, exact_key, signature, band_keys)`` for a record."""
+        if precomputed is None:
+            exact_key, signature = _exact_key(kind, _exact_text(record)), None
+        else:
+            exact_key, signature = precomputed
+        if self._store.find_exact(exact_key) is not None:
+            return "exact", exact_key, None, None
+        if kind not in self.near_kinds:
+            return None, exact_key, array("I"), ()
+
+        if signature is None:
+            signature = minhash(shingles(_dedupe_text(record)))
+        band_keys = _band_keys(kind, signature)
+        for record_id in self._store.candidates(band_keys):
+            other = self._store.signature(record_id)
+            if other is not None and similarity(signature, other) >= self.threshold:
+                return "near", exact_key, signature, band_keys
+        return None, exact_key, signature, band_keys
+
+    def _check(self, record, kind, url, add, precomputed=None):
+        self.counters["checked"] += 1
+        duplicate, exact_key, signature, band_keys = self._match(kind, record, precomputed)
+        if duplicate:
+            self.counters[duplicate] += 1
+            return True
+        self.counters["unique"] += 1
+        if add:
+            self._store.add(exact_key, signature, band_keys, url)
+        return False
+
+    def is_duplicate(self, record, kind="", url=None, add=True):
+        """Return True if a similar record was seen before; otherwise remember this one."""
+        with self._lock:
+            self._store.begin()
+            try:
+                return self._check(record, kind, url, add)
+            finally:
+                self._store.commit()
+
+    def filter(self, records, kind="", url=None, fingerprints=None):
+        """Return the records not seen before, remembering them in one transaction.
+
+        Within ``records`` a title repeats only once: a second card with a
+        title already kept (case aside) is dropped before any fingerprint is
+        compared, since it is usually a partial copy of the same card.
+        ``fingerprints``, if given, are the records' ``fingerprint`` values,
+        computed elsewhere (in a worker process, say).
+        """
+        if fingerprints is None:
+            fingerprints = [None] * len(records)
+        unique = []
+        seen_titles = set()
+        with self._lock:
+            self._store.begin()
+            try:
+                for record, precomputed in zip(records, fingerprints):
+                    title = record.get("title")
+                    if title:
+                        title = title.lower()
+                        if title in seen_titles:
+                            self.counters["checked"] += 1
+                            self.counters["exact"] += 1
+                            continue
+                        seen_titles.add(title)
+                    if not self._check(record, kind, url, True, precomputed):
+                        unique.append(record)
+                return unique
+            finally:
+                self._store.commit()
+
+    def stats(self):
+        """Return the counters together with the number of remembered records."""
+        with self._lock:
+            return dict(self.counters, records=self._store.count())
+
+    def clear(self):
+        """Forget every remembered record."""
+        with self._lock:
+            self._store.clear()
+
+    def close(self):
+        with self._lock:
+            self._store.close()
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_dedupe_index():
+    """Return the process-wide persistent dedupe index, creating it on first use."""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = DedupeIndex(DEFAULT_DEDUPE_PATH)
+        return _default_index
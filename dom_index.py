@@ -0,0 +1,221 @@
+import re
+from collections import Counter
+
+from bs4.element import Tag
+
+# Keyword lists shared by content type detection and the extractors
+JOB_TERMS = ["job", "career", "position", "listing", "vacancy"]
+PRODUCT_TERMS = ["product", "item", "goods", "merchandise"]
+ARTICLE_TERMS = ["article", "post", "blog", "news"]
+ARTICLE_CONTAINER_TERMS = ARTICLE_TERMS + ["entry"]
+JOB_FALLBACK_TERMS = ["item", "result", "card", "listing", "post"]
+PRODUCT_FALLBACK_TERMS = ["item", "card", "listing", "post"]
+MAIN_CONTENT_TERMS = ["main", "content", "article", "body"]
+
+# Bucket name -> (tag names, class keywords); a tag lands in a bucket when its
+# name matches and any of its lowercased class tokens contains a keyword
+BUCKETS = {
+    "job": (("div",), JOB_TERMS),
+    "product": (("div",), PRODUCT_TERMS),
+    "article": (("article", "div"), ARTICLE_TERMS),
+    "article_container": (("article", "div"), ARTICLE_CONTAINER_TERMS),
+    "job_fallback": (("div", "li"), JOB_FALLBACK_TERMS),
+    "product_fallback": (("div", "li"), PRODUCT_FALLBACK_TERMS),
+    "main_content": (("main", "article", "div"), MAIN_CONTENT_TERMS),
+}
+
+# Field name -> (tag names, class keywords or None, required attribute or None)
+# for find_fields; "any_*" entries are fallbacks used when the keyed field is missing
+JOB_FIELDS = {
+    "title": (("h1", "h2", "h3", "h4", "a"), ["title", "name", "position"], None),
+    "any_heading": (("h1", "h2", "h3", "h4", "a"), None, None),
+    "company": (("span", "div", "p"), ["company", "employer", "organization"], None),
+    "location": (("span", "div", "p"), ["location", "place", "address", "city"], None),
+    "description": (("p", "div"), ["description", "summary", "detail"], None),
+    "link": (("a",), None, "href"),
+}
+
+PRODUCT_FIELDS = {
+    "name": (("h1", "h2", "h3", "h4", "a"), ["name", "title", "product"], None),
+    "any_heading": (("h1", "h2", "h3", "h4", "a"), None, None),
+    "price": (("span", "div", "p"), ["price", "cost", "amount"], None),
+    "image": (("img",), None, None),
+    "link": (("a",), None, "href"),
+}
+
+ARTICLE_FIELDS = {
+    "title": (("h1", "h2", "h3", "h4"), ["title", "heading"], None),
+    "any_heading": (("h1", "h2", "h3", "h4"), None, None),
+    "summary": (("p", "div"), ["summary", "excerpt", "description", "content"], None),
+    "any_paragraph": (("p",), None, None),
+    "date": (("span", "time", "div"), ["date", "time", "published"], None),
+    "author": (("span", "div", "a"), ["author", "by", "writer"], None),
+    "link": (("a",), None, "href"),
+}
+
+
+class DomIndex:
+    """Lookup tables built from a single traversal of a parsed document."""
+
+    def __init__(self):
+        self.by_name = {}
+        self.buckets = {name: [] for name in BUCKETS}
+        self.position = {}
+        self.table_rows = {}
+        self.row_cells = {}
+
+    def tags(self, *names):
+        """Return all tags with the given names in document order."""
+        if len(names) == 1:
+            return self.by_name.get(names[0], [])
+        found = []
+        for name in names:
+            found.extend(self.by_name.get(name, []))
+        found.sort(key=lambda tag: self.position[id(tag)])
+        return found
+
+    def count(self, name):
+        """Return the number of tags with the given name."""
+        return len(self.by_name.get(name, []))
+
+    def bucket(self, name):
+        """Return the tags of a keyword bucket in document order."""
+        return self.buckets[name]
+
+    def rows(self, table):
+        """Return every <tr> inside a table, nested tables included."""
+        return self.table_rows.get(id(table), [])
+
+    def cells(self, row):
+        """Return every <td>/<th> inside a table row."""
+        return self.row_cells.get(id(row), [])
+
+
+def class_key(tag):
+    """Return the lowercased, space-joined class attribute of a tag."""
+    classes = tag.get("class")
+    if not classes:
+        return ""
+    if isinstance(classes, str):
+        return classes.lower()
+    return " ".join(classes).lower()
+
+
+_bucket_cache = {}
+
+
+def _matching_buckets(name, key):
+    """Return the bucket names a tag with this name and class key belongs to."""
+    cache_key = (name, key)
+    matched = _bucket_cache.get(cache_key)
+    if matched is None:
+        matched = tuple(
+            bucket for bucket, (names, terms) in BUCKETS.items()
+            if name in names and any(term in key for term in terms)
+        )
+        if len(_bucket_cache) > 50000:
+            _bucket_cache.clear()
+        _bucket_cache[cache_key] = matched
+    return matched
+
+
+def build_dom_index(soup):
+    """Walk the document once and index tags, class buckets and table rows."""
+    index = DomIndex()
+    by_name = index.by_name
+    buckets = index.buckets
+    position = index.position
+    table_rows = index.table_rows
+    row_cells = index.row_cells
+
+    # Each stack entry carries the enclosing tables and rows of the element
+    stack = [(child, (), ()) for child in reversed(soup.contents) if isinstance(child, Tag)]
+    pos = 0
+    while stack:
+        tag, tables, rows = stack.pop()
+        name = tag.name
+        position[id(tag)] = pos
+        pos += 1
+
+        tag_list = by_name.get(name)
+        if tag_list is None:
+            tag_list = by_name[name] = []
+        tag_list.append(tag)
+
+        key = class_key(tag)
+        if key:
+            for bucket in _matching_buckets(name, key):
+                buckets[bucket].append(tag)
+
+        if name == "tr":
+            for table in tables:
+                table_rows[id(table)].append(tag)
+            row_cells[id(tag)] = []
+            rows = rows + (tag,)
+        elif name in ("td", "th"):
+            for row in rows:
+                row_cells[id(row)].append(tag)
+        elif name == "table":
+            table_rows[id(tag)] = []
+            tables = tables + (tag,)
+
+        for child in reversed(tag.contents):
+            if isinstance(child, Tag):
+                stack.append((child, tables, rows))
+
+    return index
+
+
+_CLASS_ATTR = re.compile(r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+
+
+def count_containers(markup, bucket):
+    """Estimate the number of listing cards in raw HTML, without parsing it.
+
+    Tags are matched against the bucket like ``build_dom_index`` does. A
+    wrapper around the list matches once and a card's header or footer as
+    often as the cards, so the count of the most common tag and class
+    combination is taken as the number of cards.
+    """
+    names, terms = BUCKETS[bucket]
+    tokens = re.compile(rf"<({'|'.join(names)})(?=[\s/>])([^>]*)>", re.IGNORECASE)
+    counts = Counter()
+    for match in tokens.finditer(markup):
+        classes = _CLASS_ATTR.search(match.group(2))
+        if classes is None:
+            continue
+        key = " ".join(next(value for value in classes.groups() if value is not None).lower().split())
+        if any(term in key for term in terms):
+            counts[match.group(1).lower(), key] += 1
+    return max(counts.values(), default=0)
+
+
+def find_fields(container, specs):
+    """Find the first descendant matching each spec in one pass over a container.
+
+    ``specs`` maps a field name to ``(tag_names, class_terms, required_attr)``;
+    ``class_terms`` of ``None`` matches any class and ``required_attr`` of
+    ``None`` skips the attribute check. Mirrors ``container.find`` semantics.
+    """
+    found = dict.fromkeys(specs)
+    pending = dict(specs)
+    for tag in container.descendants:
+        if not pending:
+            break
+        if not isinstance(tag, Tag):
+            continue
+        name = tag.name
+        key = None
+        for field, (names, terms, attr) in list(pending.items()):
+            if name not in names:
+                continue
+            if attr is not None and tag.get(attr) is None:
+                continue
+            if terms is not None:
+                if key is None:
+                    key = class_key(tag)
+                if not key or not any(term in key for term in terms):
+                    continue
+            found[field] = tag
+            del pending[field]
+    return found
@@ -0,0 +1,132 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import metrics
+
+
+class PooledDriver:
+    """Thin proxy around a WebDriver that counts page loads for the pool."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created = time.monotonic()
+
+    def get(self, url):
+        self.pages += 1
+        return self.driver.get(url)
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+
+class DriverPool:
+    """Bounded, thread-safe pool of warm headless WebDrivers.
+
+    Drivers are created on demand by ``factory`` up to ``max_size``, handed out
+    with ``lease()``, wiped of cookies and storage when returned, and replaced
+    after ``max_pages`` page loads or whenever a lease ends with an exception.
+    """
+
+    def __init__(self, factory, max_size=4, max_pages=50, acquire_timeout=120):
+        self.factory = factory
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.acquire_timeout = acquire_timeout
+        self._idle = []
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout=None):
+        """Take an idle driver, start a new one, or wait for one to be returned."""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No WebDriver available after {timeout} seconds")
+                self._cond.wait(remaining)
+
+        # Start the browser outside the lock so other leases are not blocked
+        try:
+            with metrics.stage("driver_start"):
+                return PooledDriver(self.factory())
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, pooled, broken=False):
+        """Return a driver to the pool, or retire it if it is worn out or broken."""
+        if not broken and pooled.pages < self.max_pages:
+            broken = not self._reset(pooled)
+        else:
+            broken = True
+
+        with self._cond:
+            if broken or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append(pooled)
+            self._cond.notify()
+
+        if broken or self._closed:
+            self._quit(pooled)
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """Context manager that leases a driver and returns it afterwards."""
+        with metrics.stage("driver_acquire"):
+            pooled = self.acquire(timeout)
+        try:
+            yield pooled
+        except Exception:
+            self.release(pooled, broken=True)
+            raise
+        else:
+            with metrics.stage("driver_release"):
+                self.release(pooled)
+
+    def close(self):
+        """Quit every idle driver and refuse further leases."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._quit(pooled)
+
+    def stats(self):
+        """Return the current pool occupancy."""
+        with self._cond:
+            return {"size": self._size, "idle": len(self._idle), "max_size": self.max_size}
+
+    def _reset(self, pooled):
+        """Clear cookies and web storage so the next lease starts clean."""
+        try:
+            pooled.driver.delete_all_cookies()
+            pooled.driver.execute_script(
+                "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+            )
+            pooled.driver.get("about:blank")
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, pooled):
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
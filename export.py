@@ -0,0 +1,201 @@
+import csv
+import gzip
+import json
+import os
+import tempfile
+
+from records import json_default
+from streaming import chunked
+
+# Result keys holding record lists, with the record type each one produces
+RECORD_LISTS = {
+    "jobs": "job",
+    "products": "product",
+    "articles": "article",
+    "links": "link",
+    "images": "image",
+    "headings": "heading",
+}
+
+CHUNK_SIZE = 1000
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def table_row_record(table_index, row, source_url=None):
+    """Build the export record for one table row."""
+    record = {"record_type": "table_row", "table": table_index}
+    if source_url:
+        record["source_url"] = source_url
+    record.update(row)
+    return record
+
+
+def iter_records(data):
+    """Flatten a scrape result (or a batch of them) into flat export records.
+
+    Every content type is covered: listing records, every row of every table,
+    main content paragraphs, and for batch results each page in turn.
+    """
+    if data.get("content_type") == "batch":
+        for result in data.get("results", []):
+            if result and "error" not in result:
+                yield from iter_records(result)
+        return
+
+    source_url = data.get("url")
+    for key, record_type in RECORD_LISTS.items():
+        for item in data.get(key) or []:
+            yield dict({"record_type": record_type, "source_url": source_url}, **item)
+    for table_index, table in enumerate(data.get("tables") or []):
+        for row in table["rows"]:
+            yield table_row_record(table_index, row, source_url)
+    for paragraph in data.get("main_content") or []:
+        yield {"record_type": "paragraph", "source_url": source_url, "content": paragraph}
+
+
+def _scalar(value):
+    """Render nested values as JSON so every column holds a plain string or number."""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _columns(batch):
+    columns = []
+    seen = set()
+    for record in batch:
+        for key in record:
+            if key not in seen:
+                seen.add(key)
+                columns.append(key)
+    return columns
+
+
+def write_ndjson(records, fp):
+    """Write one JSON object per line to a text stream."""
+    count = 0
+    for batch in chunked(records, CHUNK_SIZE):
+        fp.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in batch)
+        count += len(batch)
+    return count
+
+
+def write_csv(records, fp):
+    """Write records as CSV to a text stream.
+
+    Columns come from the first chunk of records; keys that only appear later
+    are kept as JSON in an ``extra`` column instead of being dropped.
+    """
+    writer = None
+    columns = None
+    count = 0
+    for batch in chunked(records, CHUNK_SIZE):
+        if writer is None:
+            columns = _columns(batch) + ["extra"]
+            writer = csv.DictWriter(fp, fieldnames=columns)
+            writer.writeheader()
+        known = set(columns)
+        for record in batch:
+            row = {key: _scalar(value) for key, value in record.items() if key in known}
+            extra = {key: value for key, value in record.items() if key not in known}
+            if extra:
+                row["extra"] = json.dumps(extra, ensure_ascii=False)
+            writer.writerow(row)
+        count += len(batch)
+    return count
+
+
+def write_parquet(records, path):
+    """Write records to a Parquet file, one row group per chunk. Needs pyarrow."""
+    if not HAS_PYARROW:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    columns = None
+    count = 0
+    try:
+        for batch in chunked(records, CHUNK_SIZE):
+            if writer is None:
+                columns = _columns(batch) + ["extra"]
+                schema = pa.schema([(column, pa.string()) for column in columns])
+                writer = pq.ParquetWriter(path, schema, compression="zstd")
+            known = set(columns)
+            table = {column: [] for column in columns}
+            for record in batch:
+                extra = {key: value for key, value in record.items() if key not in known}
+                for column in columns[:-1]:
+                    value = record.get(column)
+                    table[column].append(None if value is None else str(_scalar(value)))
+                table["extra"].append(json.dumps(extra, ensure_ascii=False) if extra else None)
+            writer.write_table(pa.table(table, schema=writer.schema))
+            count += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+def write_json(data, fp):
+    """Write the full result in its original JSON shape to a text stream."""
+    # json.dump encodes incrementally instead of building one large string
+    json.dump(data, fp, indent=4, ensure_ascii=False, default=json_default)
+
+
+# Format label -> (file extension, MIME type)
+FORMATS = {
+    "JSON": (".json", "application/json"),
+    "JSON (gzip)": (".json.gz", "application/gzip"),
+    "NDJSON": (".ndjson", "application/x-ndjson"),
+    "NDJSON (gzip)": (".ndjson.gz", "application/gzip"),
+    "CSV": (".csv", "text/csv"),
+}
+if HAS_PYARROW:
+    FORMATS["Parquet"] = (".parquet", "application/vnd.apache.parquet")
+
+
+# Formats that can be written from a record stream without the full result
+RECORD_FORMATS = [name for name in FORMATS if not name.startswith("JSON")]
+
+
+def export_data(data, file_format, path):
+    """Export a scrape result (or ``{"content_type": "batch", ...}``) to ``path``."""
+    if file_format == "JSON":
+        with open(path, "w", encoding="utf-8") as fp:
+            write_json(data, fp)
+    elif file_format == "JSON (gzip)":
+        with gzip.open(path, "wt", encoding="utf-8") as fp:
+            write_json(data, fp)
+    else:
+        export_records(iter_records(data), file_format, path)
+    return path
+
+
+def export_records(records, file_format, path):
+    """Stream already-flat records to ``path`` in a record-oriented format."""
+    if file_format == "NDJSON":
+        with open(path, "w", encoding="utf-8") as fp:
+            return write_ndjson(records, fp)
+    if file_format == "CSV":
+        with open(path, "w", encoding="utf-8", newline="") as fp:
+            return write_csv(records, fp)
+    if file_format == "Parquet":
+        return write_parquet(records, path)
+    if file_format == "NDJSON (gzip)":
+        with gzip.open(path, "wt", encoding="utf-8") as fp:
+            return write_ndjson(records, fp)
+    raise ValueError(f"Unsupported export format: {file_format}")
+
+
+def export_to_temp_file(data, file_format, prefix="scraped_data"):
+    """Export to a new temporary file and return its path."""
+    suffix = FORMATS[file_format][0]
+    fd, path = tempfile.mkstemp(prefix=f"{prefix}_", suffix=suffix)
+    os.close(fd)
+    return export_data(data, file_format, path)
@@ -0,0 +1,236 @@
+import re
+import threading
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+from http_cache import cached_get
+from resilience import BROWSER_RETRYABLE, HTTP_RETRYABLE, RETRY_STATUSES, RetryableStatus
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.81 Safari/537.36"
+
+# (connect, read) timeouts in seconds for the HTTP tier
+HTTP_TIMEOUT = (5, 20)
+
+# Pages with less visible text than this are assumed to be rendered client-side
+MIN_TEXT_LENGTH = 200
+# A "please enable JavaScript" notice only counts on pages with little text
+NOSCRIPT_TEXT_LENGTH = 2000
+
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+_SPA_ROOT_PATTERN = re.compile(
+    rb'<(?:div|main|app-root)[^>]*\b(?:id=["\']?(?:root|app|__next|__nuxt|svelte)["\']?|ng-app|data-reactroot)[^>]*>\s*</(?:div|main|app-root)>',
+    re.IGNORECASE,
+)
+_NOSCRIPT_PATTERN = re.compile(rb"<noscript[^>]*>(.*?)</noscript\s*>", re.IGNORECASE | re.DOTALL)
+_JS_NOTICE_PATTERN = re.compile(rb"(?:enable|requires?|turn on|need)\w*\s+(?:\w+\s+){0,3}javascript", re.IGNORECASE)
+_INVISIBLE_PATTERN = re.compile(rb"<(script|style|noscript|template|svg)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_TAG_PATTERN = re.compile(rb"<[^>]+>")
+_SPACE_PATTERN = re.compile(rb"\s+")
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_http_session(pool_size=20):
+    """Return the shared keep-alive HTTP session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({
+                "User-Agent": USER_AGENT,
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                "Accept-Encoding": ACCEPT_ENCODING,
+                "Accept-Language": "en-US,en;q=0.9",
+            })
+            _session = session
+        return _session
+
+
+def needs_javascript(html):
+    """Return why a server response looks incomplete without JavaScript, or None."""
+    if isinstance(html, str):
+        html = html.encode("utf-8", errors="replace")
+    if _SPA_ROOT_PATTERN.search(html):
+        return "spa_root"
+    body_start = html.lower().find(b"<body")
+    visible = _INVISIBLE_PATTERN.sub(b" ", html[body_start:] if body_start != -1 else html)
+    text = _SPACE_PATTERN.sub(b" ", _TAG_PATTERN.sub(b" ", visible)).strip()
+    if len(text) < MIN_TEXT_LENGTH:
+        return "empty_body"
+    if len(text) < NOSCRIPT_TEXT_LENGTH:
+        for notice in _NOSCRIPT_PATTERN.findall(html):
+            if _JS_NOTICE_PATTERN.search(notice):
+                return "noscript_notice"
+    return None
+
+
+def domain_of(url):
+    """Return the lowercased host of a URL."""
+    return (urlsplit(url).hostname or "").lower()
+
+
+class DomainTierMemory:
+    """Thread-safe record of which fetch tier last worked for each domain."""
+
+    def __init__(self):
+        self._tiers = {}
+        self._lock = threading.Lock()
+
+    def get(self, domain):
+        with self._lock:
+            return self._tiers.get(domain)
+
+    def set(self, domain, tier):
+        with self._lock:
+            self._tiers[domain] = tier
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._tiers)
+
+
+# Shared so every fetcher in the process learns from the others
+domain_tiers = DomainTierMemory()
+
+
+class TieredFetcher:
+    """Fetch pages over pooled HTTP and fall back to a browser when needed.
+
+    ``browser_fetch`` is a callable ``(url, **kwargs) -> html`` that renders the
+    page in a headless browser. Domains that needed the browser once go
+    straight to it on later fetches. With a ``cache`` (see ``http_cache``),
+    fresh pages from either tier are served without fetching and stale HTTP
+    responses are revalidated. With a ``politeness`` scheduler (see
+    ``politeness``) every request, from either tier, waits for its host's
+    rate limit and concurrency slot and respects robots.txt; cache hits do not.
+    With ``resilience`` (see ``resilience``) failed requests from either tier
+    are retried with backoff, and a host that keeps failing is cut off by its
+    circuit breaker.
+    """
+
+    def __init__(self, browser_fetch=None, session=None, timeout=HTTP_TIMEOUT, memory=None, cache=None,
+                 politeness=None, resilience=None):
+        self.browser_fetch = browser_fetch
+        self.session = session
+        self.timeout = timeout
+        self.memory = memory if memory is not None else domain_tiers
+        self.cache = cache
+        self.politeness = politeness
+        self.resilience = resilience
+
+    def _slot(self, url):
+        return self.politeness.slot(url) if self.politeness is not None else nullcontext()
+
+    def _call(self, url, func, retry_on):
+        if self.resilience is None:
+            return func()
+        return self.resilience.call(domain_of(url), func, retry_on)
+
+    def fetch(self, url, force_browser=False, force_refresh=False, **browser_kwargs):
+        """Fetch a page and return a dict with ``html``, ``tier``, ``reason`` and ``cache``."""
+        domain = domain_of(url)
+        reason = None
+        if force_browser and self.browser_fetch is None:
+            raise ValueError("No browser fetcher configured")
+
+        if self.cache is not None and not force_refresh:
+            with metrics.stage("cache_lookup"):
+                page = self.cached_page(url, force_browser)
+            if page is not None:
+                metrics.add(cached_bytes=len(page["html"]))
+                return page
+
+        if force_browser:
+            reason = "forced"
+        elif self.memory.get(domain) == "browser" and self.browser_fetch is not None:
+            reason = "remembered"
+        else:
+            page = self.fetch_http(url, force_refresh)
+            reason = page["reason"]
+            if reason is None or self.browser_fetch is None:
+                if reason is None:
+                    self.memory.set(domain, "http")
+                return page
+
+        def render():
+            with self._slot(url), metrics.stage("browser_fetch"):
+                return self.browser_fetch(url, **browser_kwargs)
+
+        html = self._call(url, render, BROWSER_RETRYABLE)
+        if html:
+            metrics.add(bytes_fetched=len(html))
+            if reason != "forced":
+                self.memory.set(domain, "browser")
+            if self.cache is not None:
+                self.cache.put(url, html, content_type="text/html; charset=utf-8", tier="browser")
+        cache_status = "miss" if self.cache is not None else None
+        return {"url": url, "html": html, "tier": "browser", "status": None, "reason": reason, "cache": cache_status}
+
+    def cached_page(self, url, force_browser=False):
+        """Return a fresh, usable cache entry as a page dict, or None."""
+        entry = self.cache.get(url)
+        if entry is None or not entry["fresh"]:
+            return None
+        if entry["tier"] == "http":
+            # A cached shell that needs JavaScript is not a usable answer
+            if force_browser or ("html" in (entry["content_type"] or "text/html") and needs_javascript(entry["body"])):
+                return None
+        self.cache.count("hits")
+        return {
+            "url": url,
+            "html": entry["body"],
+            "tier": entry["tier"],
+            "status": entry["status"],
+            "reason": None,
+            "cache": "hit",
+        }
+
+    def fetch_http(self, url, force_refresh=False):
+        """Fetch a page over HTTP and report whether it needs a browser."""
+        session = self.session or get_http_session()
+        retry_statuses = RETRY_STATUSES if self.resilience is not None else ()
+
+        def attempt():
+            with self._slot(url), metrics.stage("http_fetch"):
+                return cached_get(session, url, self.cache, self.timeout, force_refresh, retry_statuses)
+
+        try:
+            status, body, content_type, cache_status = self._call(url, attempt, HTTP_RETRYABLE)
+        except RetryableStatus as e:
+            # Still failing after the retries; the browser tier may do better
+            return {
+                "url": url, "html": None, "tier": "http", "status": e.status, "reason": f"status {e.status}", "cache": None
+            }
+        except requests.RequestException as e:
+            return {"url": url, "html": None, "tier": "http", "status": None, "reason": f"error: {e}", "cache": None}
+        if body:
+            # A hit or a 304 revalidation served the body without downloading it
+            metrics.add(**{"bytes_fetched" if cache_status in (None, "miss") else "cached_bytes": len(body)})
+
+        page = {
+            "url": url,
+            "html": body,
+            "tier": "http",
+            "status": status,
+            "reason": None,
+            "cache": cache_status,
+        }
+        if status != 200:
+            page["reason"] = f"status {status}"
+        elif "html" in (content_type or "text/html"):
+            with metrics.stage("js_check"):
+                page["reason"] = needs_javascript(body)
+        return page
@@ -0,0 +1,211 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from resilience import RetryableStatus
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "SCRAPER_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "ai_web_scraper", "responses.sqlite"),
+)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL = 600
+
+# Query parameters that never change the page content
+_TRACKING_PARAMS = ("utm_", "gclid", "fbclid", "mc_cid", "mc_eid")
+
+
+def normalize_url(url):
+    """Normalize a URL for use as a cache key."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(_TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+class ResponseCache:
+    """Persistent, size-bounded cache of page bodies keyed by normalized URL.
+
+    Bodies are stored zlib-compressed in SQLite together with their ``ETag`` and
+    ``Last-Modified`` validators. Entries younger than ``ttl`` seconds are served
+    directly; older ones should be revalidated with a conditional request.
+    When the stored bytes exceed ``max_bytes`` the least recently used entries
+    are evicted.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.counters = {"hits": 0, "misses": 0, "revalidated": 0, "stores": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                status INTEGER,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                tier TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+
+    def get(self, url):
+        """Return the cached entry for a URL with a ``fresh`` flag, or None."""
+        key = normalize_url(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, status, content_type, etag, last_modified, tier, fetched_at"
+                " FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        body, status, content_type, etag, last_modified, tier, fetched_at = row
+        return {
+            "url": url,
+            "body": zlib.decompress(body),
+            "status": status,
+            "content_type": content_type,
+            "etag": etag,
+            "last_modified": last_modified,
+            "tier": tier,
+            "fetched_at": fetched_at,
+            "fresh": time.time() - fetched_at < self.ttl,
+        }
+
+    def put(self, url, body, status=200, content_type=None, etag=None, last_modified=None, tier="http"):
+        """Store a response body and its validators, evicting old entries if needed."""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        compressed = zlib.compress(body, 6)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (normalize_url(url), compressed, len(compressed), status, content_type,
+                 etag, last_modified, tier, now, now),
+            )
+            self.counters["stores"] += 1
+            self._evict()
+
+    def mark_fresh(self, url):
+        """Restart the TTL of an entry after a successful revalidation."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, normalize_url(url)),
+            )
+
+    def count(self, name):
+        """Increment a hit/miss/revalidated counter."""
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        """Return the counters together with the entry count and stored bytes."""
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            return dict(self.counters, entries=entries, bytes=size)
+
+    def clear(self):
+        """Remove every cached entry."""
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        self.counters["evictions"] += len(evicted)
+
+
+def cached_get(session, url, cache=None, timeout=None, force_refresh=False, retry_statuses=()):
+    """GET a URL through the response cache.
+
+    Returns ``(status, body, content_type, cache_status)`` where ``cache_status``
+    is ``hit``, ``revalidated``, ``miss`` or ``None`` when no cache is used.
+    Fresh entries are served without a request; stale ones are revalidated
+    with ``If-None-Match``/``If-Modified-Since``. Only 200 responses are stored.
+    A response with a status in ``retry_statuses`` raises ``RetryableStatus``
+    carrying its ``Retry-After`` header instead.
+    """
+    if cache is None:
+        response = session.get(url, timeout=timeout)
+        _check_retryable(response, retry_statuses)
+        return response.status_code, response.content, response.headers.get("Content-Type"), None
+
+    entry = None if force_refresh else cache.get(url)
+    if entry is not None and entry["fresh"]:
+        cache.count("hits")
+        return entry["status"], entry["body"], entry["content_type"], "hit"
+
+    headers = {}
+    if entry is not None and entry["tier"] == "http":
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = session.get(url, headers=headers, timeout=timeout)
+    _check_retryable(response, retry_statuses)
+    if response.status_code == 304 and entry is not None:
+        cache.mark_fresh(url)
+        cache.count("revalidated")
+        return entry["status"], entry["body"], entry["content_type"], "revalidated"
+
+    cache.count("misses")
+    content_type = response.headers.get("Content-Type")
+    if response.status_code == 200:
+        cache.put(
+            url, response.content, response.status_code, content_type,
+            response.headers.get("ETag"), response.headers.get("Last-Modified"),
+        )
+    return response.status_code, response.content, content_type, "miss"
+
+
+def _check_retryable(response, retry_statuses):
+    if response.status_code in retry_statuses:
+        raise RetryableStatus(response.status_code, response.headers.get("Retry-After"))
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Return the process-wide response cache, creating it on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
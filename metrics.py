@@ -0,0 +1,230 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+# SCRAPER_METRICS: "off", "on" (wall/CPU time and counters) or "memory"
+# (also peak memory per stage via tracemalloc, which slows parsing noticeably)
+DEFAULT_LEVEL = os.environ.get("SCRAPER_METRICS", "on").lower()
+LEVELS = ("off", "on", "memory")
+
+_current = contextvars.ContextVar("scrape_metrics", default=None)
+_NULL_STAGE = nullcontext()
+
+
+class ScrapeMetrics:
+    """Per-stage wall time, CPU time and memory, plus counters such as bytes fetched.
+
+    Stages with the same name accumulate, so a paginated run reports the total
+    time spent in e.g. ``parse`` over all pages. Stages may nest; each one
+    reports its own inclusive time. CPU time is per thread. Peak memory is the
+    growth of traced Python allocations during a stage; tracemalloc is
+    process-wide, so stages that overlap in other threads inflate each other's
+    peaks.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.counters = {}
+        self.started = time.perf_counter()
+        self.peak_memory = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracing = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as stage ``name``."""
+        memory = self._enter_memory() if self.trace_memory else None
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.thread_time() - cpu
+            peak = self._exit_memory(memory) if memory is not None else None
+            with self._lock:
+                entry = self.stages.get(name)
+                if entry is None:
+                    entry = self.stages[name] = {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0}
+                entry["calls"] += 1
+                entry["wall_s"] += wall
+                entry["cpu_s"] += cpu
+                if peak is not None:
+                    entry["peak_bytes"] = max(entry.get("peak_bytes", 0), peak)
+                    self.peak_memory = max(self.peak_memory, peak)
+
+    def add(self, **values):
+        """Add to named counters, e.g. ``add(bytes_fetched=1024)``."""
+        with self._lock:
+            for name, value in values.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, data):
+        """Add the stages and counters of another collector's ``as_dict()``, e.g. from a worker process."""
+        with self._lock:
+            for name, other in data.get("stages", {}).items():
+                entry = self.stages.get(name)
+                if entry is None:
+                    self.stages[name] = dict(other)
+                    continue
+                entry["calls"] += other["calls"]
+                entry["wall_s"] += other["wall_s"]
+                entry["cpu_s"] += other["cpu_s"]
+                if "peak_bytes" in other:
+                    entry["peak_bytes"] = max(entry.get("peak_bytes", 0), other["peak_bytes"])
+            for name, value in data.items():
+                if name == "peak_memory_bytes":
+                    self.peak_memory = max(self.peak_memory, value)
+                elif name not in ("stages", "total_wall_s") and isinstance(value, (int, float)):
+                    self.counters[name] = self.counters.get(name, 0) + value
+
+    def _enter_memory(self):
+        # A stack of running peaks, so a nested stage's reset_peak does not
+        # hide the allocations its enclosing stage made before it started
+        stack = getattr(self._local, "peaks", None)
+        if stack is None:
+            stack = self._local.peaks = []
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1] = max(stack[-1], peak)
+        tracemalloc.reset_peak()
+        stack.append(current)
+        return current
+
+    def _exit_memory(self, start):
+        stack = self._local.peaks
+        peak = max(stack.pop(), tracemalloc.get_traced_memory()[1])
+        if stack:
+            stack[-1] = max(stack[-1], peak)
+        return max(0, peak - start)
+
+    def close(self):
+        """Stop tracemalloc if this collector started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def as_dict(self):
+        """Return the metrics as a JSON-serializable dict (the ``_metrics`` result key)."""
+        with self._lock:
+            data = {
+                "total_wall_s": time.perf_counter() - self.started,
+                "stages": {name: dict(entry) for name, entry in self.stages.items()},
+            }
+            data.update(self.counters)
+            if self.trace_memory:
+                data["peak_memory_bytes"] = self.peak_memory
+        return data
+
+
+@contextmanager
+def collect(level=None):
+    """Collect metrics for everything run in this context and yield the collector.
+
+    Yields None when ``level`` is ``"off"``; the module-level ``stage`` and
+    ``add`` helpers are then no-ops costing a single context variable lookup.
+    """
+    level = (level or DEFAULT_LEVEL).lower()
+    if level not in LEVELS:
+        raise ValueError(f"Unknown metrics level {level!r}; choose from {', '.join(LEVELS)}")
+    if level == "off":
+        token = _current.set(None)
+        try:
+            yield None
+        finally:
+            _current.reset(token)
+        return
+
+    metrics = ScrapeMetrics(trace_memory=level == "memory")
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+        metrics.close()
+
+
+def current():
+    """Return the collector active in this context, or None."""
+    return _current.get()
+
+
+def stage(name):
+    """Time a block as a stage of the active collector, if any."""
+    metrics = _current.get()
+    if metrics is None:
+        return _NULL_STAGE
+    return metrics.stage(name)
+
+
+def add(**values):
+    """Add to counters of the active collector, if any."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add(**values)
+
+
+def bind(func):
+    """Wrap ``func`` to run in the current context, for use in worker threads.
+
+    Executor threads do not inherit context variables, so stages recorded in
+    them would otherwise be lost.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.run(func, *args, **kwargs)
+    return run
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def to_prometheus(metrics, labels=None, prefix="scraper"):
+    """Render a ``_metrics`` dict in the Prometheus text exposition format."""
+    labels = labels or {}
+
+    def label_text(extra=None):
+        merged = dict(labels, **(extra or {}))
+        if not merged:
+            return ""
+        return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in merged.items()) + "}"
+
+    lines = []
+    stage_series = [
+        ("stage_wall_seconds", "wall_s", "Wall-clock time spent in each scrape stage"),
+        ("stage_cpu_seconds", "cpu_s", "CPU time spent in each scrape stage"),
+        ("stage_calls", "calls", "Number of times each scrape stage ran"),
+        ("stage_peak_memory_bytes", "peak_bytes", "Peak traced memory growth during each scrape stage"),
+    ]
+    stages = metrics.get("stages", {})
+    for metric, key, help_text in stage_series:
+        samples = [(name, entry[key]) for name, entry in stages.items() if key in entry]
+        if not samples:
+            continue
+        lines.append(f"# HELP {prefix}_{metric} {help_text}")
+        lines.append(f"# TYPE {prefix}_{metric} gauge")
+        for name, value in samples:
+            lines.append(f"{prefix}_{metric}{label_text({'stage': name})} {value}")
+
+    for name, value in metrics.items():
+        if name == "stages" or not isinstance(value, (int, float)):
+            continue
+        lines.append(f"# TYPE {prefix}_{name} gauge")
+        lines.append(f"{prefix}_{name}{label_text()} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def to_json(metrics):
+    """Render a ``_metrics`` dict as JSON."""
+    return json.dumps(metrics, indent=2)
@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import deque
+
+# Installs a MutationObserver once per document and reports readiness state
+_PROBE_SCRIPT = """
+if (typeof window.__scraperMutations !== "number") {
+    window.__scraperMutations = 0;
+    new MutationObserver(function (records) {
+        window.__scraperMutations += records.length;
+    }).observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+var selector = arguments[0];
+return [
+    document.readyState,
+    window.__scraperMutations,
+    selector ? document.querySelector(selector) !== null : true
+];
+"""
+
+DEFAULT_TIMEOUT = 15.0
+DEFAULT_STABLE_FOR = 0.5
+DEFAULT_POLL_INTERVAL = 0.1
+
+
+def wait_for_page_ready(driver, timeout=DEFAULT_TIMEOUT, selector=None,
+                        stable_for=DEFAULT_STABLE_FOR, poll_interval=DEFAULT_POLL_INTERVAL):
+    """Wait until the loaded page is complete and its DOM has stopped changing.
+
+    The page counts as ready once ``document.readyState`` is ``complete``, the
+    optional CSS ``selector`` matches, and no DOM mutations were seen for
+    ``stable_for`` seconds. Returns a dict describing the wait; a wait that hits
+    ``timeout`` is reported with ``timed_out`` set rather than raising.
+    """
+    start = time.monotonic()
+    last_count = None
+    stable_since = None
+    reason = "timeout"
+
+    while True:
+        now = time.monotonic()
+        try:
+            ready_state, mutations, found = driver.execute_script(_PROBE_SCRIPT, selector)
+        except Exception:
+            # The document may be mid-navigation; try again on the next poll
+            ready_state, mutations, found = None, None, False
+
+        if ready_state == "complete" and found:
+            if mutations != last_count:
+                last_count = mutations
+                stable_since = now
+            elif now - stable_since >= stable_for:
+                reason = "stable"
+                break
+        else:
+            last_count = None
+
+        if now - start >= timeout:
+            break
+        time.sleep(min(poll_interval, max(0.0, timeout - (now - start))))
+
+    result = {
+        "elapsed": time.monotonic() - start,
+        "timed_out": reason == "timeout",
+        "reason": reason,
+        "selector": selector,
+    }
+    record_wait(result)
+    return result
+
+
+_history = deque(maxlen=1000)
+_history_lock = threading.Lock()
+
+
+def record_wait(result):
+    """Remember a finished wait for the latency summary."""
+    with _history_lock:
+        _history.append((result["elapsed"], result["timed_out"]))
+
+
+def wait_stats():
+    """Summarize recent page waits: count, median/p95 seconds and timeouts."""
+    with _history_lock:
+        history = list(_history)
+    if not history:
+        return {"count": 0, "median": 0.0, "p95": 0.0, "timeouts": 0}
+    elapsed = sorted(seconds for seconds, _ in history)
+    return {
+        "count": len(elapsed),
+        "median": elapsed[len(elapsed) // 2],
+        "p95": elapsed[min(len(elapsed) - 1, int(len(elapsed) * 0.95))],
+        "timeouts": sum(1 for _, timed_out in history if timed_out),
+    }
@@ -0,0 +1,191 @@
+import os
+import re
+from functools import lru_cache
+
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.dammit import EncodingDetector
+
+# Backends in order of preference for "auto"
+BACKENDS = ["lxml", "html5-parser", "html.parser"]
+
+# SCRAPER_PARSER selects a backend; "auto" picks the fastest one installed
+DEFAULT_BACKEND = os.environ.get("SCRAPER_PARSER", "auto")
+
+
+def _backend_installed(name):
+    if name == "lxml":
+        try:
+            import lxml  # noqa: F401
+        except ImportError:
+            return False
+        return True
+    if name == "html5-parser":
+        try:
+            import html5_parser  # noqa: F401
+        except (ImportError, RuntimeError):
+            # RuntimeError: built against a different libxml2 than lxml
+            return False
+        return True
+    return name == "html.parser"
+
+
+AVAILABLE_BACKENDS = [name for name in BACKENDS if _backend_installed(name)]
+
+# Elements whose content is never markup, or that cannot nest: stripped up to the first end tag
+_FLAT = {"script", "style", "noscript", "iframe", "textarea", "title", "template"}
+_VOID = {"meta", "link", "base", "img", "input", "br", "hr", "source", "track", "wbr", "embed", "area", "col"}
+# Only SVG and MathML elements close themselves with "/>"
+_FOREIGN = {"svg", "math"}
+# End of a tag name (so "script" does not match <script-loader>), then its
+# attributes, allowing ">" inside quoted values
+_END = r"(?=[\s/>])"
+_ATTRS = r"""(?:[^>"']|"[^"]*"|'[^']*')*"""
+
+
+def resolve_backend(backend=None):
+    """Return the backend to use, falling back to html.parser if one is missing."""
+    backend = backend or DEFAULT_BACKEND
+    if backend == "auto":
+        return AVAILABLE_BACKENDS[0]
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown parser backend {backend!r}; choose from {', '.join(BACKENDS)} or auto")
+    return backend if backend in AVAILABLE_BACKENDS else "html.parser"
+
+
+def decode_html(markup):
+    """Decode raw HTML as BeautifulSoup would: byte-order mark, declared charset, then detection.
+
+    Code that reads the raw markup (structured data, the title) and the
+    parser then agree on every character; pass the result to ``make_soup``
+    so the charset is only worked out once.
+    """
+    if not isinstance(markup, bytes):
+        return markup
+    detector = EncodingDetector(markup, is_html=True)
+    for encoding in detector.encodings:
+        try:
+            return detector.markup.decode(encoding)
+        except (UnicodeDecodeError, LookupError):
+            continue
+    return markup.decode("utf-8", errors="replace")
+
+
+@lru_cache(maxsize=32)
+def _strip_patterns(tags, binary):
+    """Regexes removing ``tags`` from str or bytes markup; comments are matched so they are left alone."""
+    flat = [tag for tag in tags if tag in _FLAT]
+    void = [tag for tag in tags if tag in _VOID]
+    nested = [tag for tag in tags if tag not in _FLAT and tag not in _VOID]
+    # Every alternative starts with "<", so the regex engine can skip ahead to one
+    # Bodies are matched a run of non-"<" characters at a time, which is far
+    # quicker than a lazy ".*?" over a large inline script
+    alternatives = [r"(!--[^-]*(?:-(?!->)[^-]*)*-)->"]
+    if flat:
+        alternatives.append(rf"({'|'.join(flat)}){_END}{_ATTRS}>[^<]*(?:<(?!/\2\s*>)[^<]*)*</\2\s*>")
+    if void:
+        alternatives.append(rf"(?:{'|'.join(void)}){_END}{_ATTRS}>")
+    simple = f"<(?:{'|'.join(alternatives)})"
+    tokens = rf"<(?:!--[^-]*(?:-(?!->)[^-]*)*-->|(/?)({'|'.join(nested)}){_END}({_ATTRS})>)" if nested else None
+    if binary:
+        simple = simple.encode()
+        tokens = tokens.encode() if tokens else None
+    flags = re.IGNORECASE | re.DOTALL
+    return re.compile(simple, flags), re.compile(tokens, flags) if tokens else None
+
+
+def strip_elements(markup, tags):
+    """Remove the given elements, with everything inside them, from raw HTML.
+
+    Script, style and other elements that cannot nest end at their first end
+    tag; elements that can (``svg``, ``header``, ``footer``...) end at the
+    matching one. An element left unclosed is kept, since how far it reaches
+    is up to the parser. Works on str and bytes without decoding.
+    """
+    binary = isinstance(markup, bytes)
+    simple, tokens = _strip_patterns(tuple(sorted(set(tags))), binary)
+    markup = simple.sub(lambda match: match.group(0) if match.group(1) else markup[:0], markup)
+    if tokens is None:
+        return markup
+
+    pieces = []
+    kept = 0
+    # (tag name, start offset, depth) of the element being removed
+    open_tag = None
+    for match in tokens.finditer(markup):
+        closing, name = match.group(1), match.group(2)
+        if name is None:
+            continue  # a comment
+        name = name.lower()
+        self_closing = name in _FOREIGN and match.group(3).rstrip().endswith(b"/" if binary else "/")
+        if open_tag is None:
+            if not closing and not self_closing:
+                open_tag = [name, match.start(), 1]
+            elif not closing:
+                pieces.append(markup[kept:match.start()])
+                kept = match.end()
+        elif name == open_tag[0] and not self_closing:
+            open_tag[2] += -1 if closing else 1
+            if not open_tag[2]:
+                pieces.append(markup[kept:open_tag[1]])
+                kept = match.end()
+                open_tag = None
+    pieces.append(markup[kept:])
+    return markup[:0].join(pieces)
+
+
+class SubtreeFilter(SoupStrainer):
+    """Build only elements matching ``tag.class1.class2`` selectors, with their subtrees.
+
+    Everything outside the first matching element on each branch, text
+    included, is skipped while parsing.
+    """
+
+    def __init__(self, selectors):
+        super().__init__()
+        self.selectors = {}
+        for selector in selectors:
+            name, *classes = selector.split(".")
+            self.selectors.setdefault(name, []).append(frozenset(classes))
+
+    def _wanted(self, name, attrs):
+        required = self.selectors.get(name)
+        if not required:
+            return False
+        classes = (attrs or {}).get("class") or ()
+        if isinstance(classes, str):
+            classes = classes.split()
+        return any(wanted.issubset(classes) for wanted in required)
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self._wanted(name, attrs)
+
+    def allow_string_creation(self, string):
+        return False
+
+    # BeautifulSoup before 4.13 asks these instead
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        return self._wanted(markup_name, markup_attrs)
+
+    def search(self, markup):
+        return False
+
+
+def make_soup(markup, backend=None, parse_only=None, drop=None):
+    """Parse HTML into a BeautifulSoup tree with the configured backend.
+
+    ``lxml`` and ``html5-parser`` are C parsers and several times faster than
+    the pure-Python ``html.parser``. ``parse_only`` takes a ``SoupStrainer``
+    (such as a ``SubtreeFilter``); html5-parser cannot filter while parsing,
+    so lxml is used instead when one is given. Elements named in ``drop`` are
+    cut from the markup before parsing (see ``strip_elements``) rather than
+    built and decomposed afterwards.
+    """
+    if drop:
+        markup = strip_elements(markup, drop)
+    backend = resolve_backend(backend)
+    if backend == "html5-parser":
+        if parse_only is None:
+            from html5_parser import parse
+            return parse(markup, treebuilder="soup", keep_doctype=False)
+        backend = "lxml" if "lxml" in AVAILABLE_BACKENDS else "html.parser"
+    return BeautifulSoup(markup, backend, parse_only=parse_only)
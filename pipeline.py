@@ -0,0 +1,206 @@
+"""Fetch on threads, parse and extract in a pool of worker processes.
+
+BeautifulSoup and the extractors are pure Python, so however many threads
+fetch pages, parsing runs on one core under the GIL. A ``ParsePool`` moves
+``scrape_html`` (parse, detect, extract, in-page dedupe) into worker
+processes. Fetch threads hand over the raw page and wait for the result;
+when ``max_pending`` pages are already queued they wait before handing
+over, so fetching slows down to what the workers keep up with.
+
+Pass a pool to ``smart_scrape`` (or ``scrape_batch``'s ``scrape_func``) as
+``pool=``. A cross-page ``DedupeIndex`` stays in the calling process; the
+workers send each record's fingerprint along so it only looks them up. A
+``ChangeTracker`` or ``TemplateStore`` is opened again in every worker from
+its SQLite path; in-memory ones are not shared and the workers run without.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import metrics
+from change_tracker import ChangeTracker
+from dedupe import NEAR_DUPLICATE_KINDS, DedupeIndex, fingerprint
+from templates import TemplateStore
+
+# SCRAPER_PARSE_WORKERS: worker processes; defaults to one per core
+_CONFIGURED_WORKERS = int(os.environ.get("SCRAPER_PARSE_WORKERS", "0"))
+DEFAULT_WORKERS = _CONFIGURED_WORKERS or os.cpu_count() or 1
+# Workers the CLI and app use unless told otherwise. On a single core a pool
+# only adds pickling to the same work, so there pages parse in the fetch threads (0).
+DEFAULT_PARSE_WORKERS = _CONFIGURED_WORKERS or (DEFAULT_WORKERS if DEFAULT_WORKERS > 1 else 0)
+# Pages fetched but not yet parsed, per worker, before fetch threads wait
+QUEUE_PER_WORKER = 2
+
+
+def _mp_context():
+    # Forking a process that runs threads (fetchers, Streamlit) can copy held
+    # locks; a fork server is started clean once and forks the workers from it
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["pipeline", "scrape_core"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class _RecordingIndex(DedupeIndex):
+    """In-page dedupe that keeps the fingerprints of the records it lets through."""
+
+    def __init__(self, near_kinds=NEAR_DUPLICATE_KINDS):
+        super().__init__(near_kinds=near_kinds)
+        self.kept = {}
+
+    def filter(self, records, kind="", url=None, fingerprints=None):
+        fingerprints = [fingerprint(record, kind) for record in records]
+        by_record = {id(record): value for record, value in zip(records, fingerprints)}
+        unique = super().filter(records, kind, url, fingerprints)
+        self.kept[kind] = [by_record[id(record)] for record in unique]
+        return unique
+
+
+# Stores opened in this worker process, by (class, path)
+_worker_stores = {}
+
+
+def _open_store(cls, path):
+    if path is None:
+        return None
+    store = _worker_stores.get((cls, path))
+    if store is None:
+        store = _worker_stores[(cls, path)] = cls(path)
+    return store
+
+
+def _scrape_page(html_content, url, parser, tracker_path, templates_path, fingerprints, metrics_level,
+                 near_kinds=NEAR_DUPLICATE_KINDS):
+    """Run ``scrape_html`` in a worker; returns ``(result, fingerprints by kind or None)``."""
+    from scrape_core import scrape_html
+
+    dedupe = _RecordingIndex(near_kinds) if fingerprints else None
+    with metrics.collect(metrics_level) as collector:
+        result = scrape_html(
+            html_content, url, parser, dedupe,
+            _open_store(ChangeTracker, tracker_path), _open_store(TemplateStore, templates_path),
+        )
+        if collector is not None:
+            result["_metrics"] = collector.as_dict()
+    return result, dedupe.kept if dedupe is not None else None
+
+
+def _shared_path(store):
+    path = getattr(store, "path", None) if store is not None else None
+    return path if path and path != ":memory:" else None
+
+
+class ParsePool:
+    """Process pool for the CPU-bound half of scraping, with a bounded queue in front.
+
+    ``scrape_html`` has the signature of ``scrape_core.scrape_html`` and
+    blocks the calling (fetch) thread until its page is done. At most
+    ``max_pending`` pages (default ``QUEUE_PER_WORKER`` per worker) are
+    queued or being parsed; further callers wait for a slot, which shows up
+    as the ``parse_queue`` stage in their metrics.
+    """
+
+    def __init__(self, workers=None, max_pending=None):
+        self.workers = max(1, workers or DEFAULT_WORKERS)
+        self.max_pending = max(1, max_pending or self.workers * QUEUE_PER_WORKER)
+        self.counters = {"pages": 0, "failed": 0, "queue_waits": 0, "queue_wait_s": 0.0}
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_context())
+
+    def submit(self, html_content, url, parser=None, tracker=None, templates=None, fingerprints=False,
+               metrics_level=None, near_kinds=NEAR_DUPLICATE_KINDS):
+        """Queue a page for a worker, waiting while the queue is full; returns a future.
+
+        With ``fingerprints`` the worker dedupes the page's records, matching
+        near-duplicates for ``near_kinds`` only, and returns their fingerprints.
+        """
+        if not self._slots.acquire(blocking=False):
+            start = time.perf_counter()
+            with metrics.stage("parse_queue"):
+                self._slots.acquire()
+            with self._lock:
+                self.counters["queue_waits"] += 1
+                self.counters["queue_wait_s"] += time.perf_counter() - start
+        try:
+            future = self._executor.submit(
+                _scrape_page, html_content, url, parser, _shared_path(tracker), _shared_path(templates),
+                fingerprints, metrics_level, frozenset(near_kinds),
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        self._slots.release()
+        with self._lock:
+            self.counters["pages"] += 1
+            self.counters["failed"] += future.exception() is not None
+
+    def scrape_html(self, html_content, url, parser=None, dedupe=None, tracker=None, templates=None):
+        """``scrape_core.scrape_html`` run in a worker process."""
+        collector = metrics.current()
+        level = "off" if collector is None else "memory" if collector.trace_memory else "on"
+        near_kinds = dedupe.near_kinds if dedupe is not None else NEAR_DUPLICATE_KINDS
+        future = self.submit(html_content, url, parser, tracker, templates, dedupe is not None, level, near_kinds)
+        with metrics.stage("parse_pool"):
+            result, fingerprints = future.result()
+        worker_metrics = result.pop("_metrics", None)
+        if collector is not None and worker_metrics:
+            collector.merge(worker_metrics)
+        if dedupe is not None and fingerprints:
+            from scrape_core import LISTING_EXTRACTORS
+
+            # Records already unique within the page; drop those seen on other pages
+            with metrics.stage("dedupe"):
+                for result_key, kind, _, _ in LISTING_EXTRACTORS.values():
+                    if kind in fingerprints and result_key in result:
+                        result[result_key] = dedupe.filter(result[result_key], kind, url, fingerprints[kind])
+        return result
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, workers=self.workers, max_pending=self.max_pending)
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Shared pools by worker count; one caller asking for another size must not
+# shut down a pool another (a concurrent Streamlit session, say) is using
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(_close_pools)
+
+
+def get_parse_pool(workers=None):
+    """Return the process-wide parse pool with ``workers`` processes, creating it on first use.
+
+    ``workers`` defaults to ``DEFAULT_PARSE_WORKERS``; None is returned when
+    that is 0, meaning pages are better parsed in the fetch threads.
+    """
+    if workers is None:
+        workers = DEFAULT_PARSE_WORKERS
+    if workers < 1:
+        return None
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ParsePool(workers)
+        return pool
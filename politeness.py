@@ -0,0 +1,252 @@
+import math
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from urllib import robotparser
+from urllib.parse import urlsplit
+
+import requests
+
+import metrics
+from fetcher import HTTP_TIMEOUT, domain_of, get_http_session
+from http_cache import cached_get, get_response_cache
+
+# Requests per second and burst allowed per host when robots.txt sets no crawl-delay
+DEFAULT_HOST_RATE = float(os.environ.get("SCRAPER_HOST_RATE", "2"))
+DEFAULT_HOST_BURST = 2
+# Requests in flight per host
+DEFAULT_HOST_CONCURRENCY = 2
+# Product token matched against robots.txt User-agent lines
+ROBOTS_AGENT = "AiWebScraper"
+# Seconds a parsed robots.txt is reused; unreachable ones are retried sooner
+ROBOTS_TTL = 3600
+ROBOTS_ERROR_TTL = 300
+# Longest crawl-delay honoured, so a hostile robots.txt cannot stall a batch
+MAX_CRAWL_DELAY = 60
+
+_FRACTIONAL_DELAY = re.compile(r"^(\s*crawl-delay\s*:\s*)(\d*\.\d+)", re.IGNORECASE | re.MULTILINE)
+
+
+class RobotsDisallowed(Exception):
+    """Raised for a URL that robots.txt does not let us fetch."""
+
+
+class TokenBucket:
+    """Reservation-style token bucket.
+
+    ``reserve()`` always takes a token and returns how long the caller has to
+    wait before using it; the balance may go negative, which queues later
+    callers behind earlier ones instead of letting them race for refills.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def configure(self, rate, burst):
+        """Change the rate without forgiving reservations already made."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+            self.burst = burst
+            self._tokens = min(self._tokens, burst)
+
+    def reserve(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def ready_in(self):
+        """Seconds until a token is free, without taking it."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+
+class _Host:
+    def __init__(self, rate, burst, concurrency):
+        self.bucket = TokenBucket(rate, burst)
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.crawl_delay = None
+        self.requests = 0
+        self.waited = 0.0
+        self.disallowed = 0
+
+
+class PolitenessScheduler:
+    """Per-host rate limits, concurrency slots and robots.txt rules.
+
+    Every host gets its own token bucket (``rate`` requests per second, bursts
+    of ``burst``) and ``concurrency`` slots. A ``Crawl-delay`` or
+    ``Request-rate`` in the host's robots.txt slows its bucket down further.
+    robots.txt is fetched once per origin, through the response cache when one
+    is given, and the parsed rules are reused for ``robots_ttl`` seconds.
+
+    Fetchers wrap each network request in ``slot(url)``; batch schedulers use
+    ``ready_in(url)`` to leave a throttled host waiting without tying up a
+    worker, so other hosts keep the pool busy.
+    """
+
+    def __init__(self, rate=DEFAULT_HOST_RATE, burst=DEFAULT_HOST_BURST, concurrency=DEFAULT_HOST_CONCURRENCY,
+                 obey_robots=True, cache=None, session=None, robots_ttl=ROBOTS_TTL, user_agent=ROBOTS_AGENT):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.obey_robots = obey_robots
+        self.cache = cache
+        self.session = session
+        self.robots_ttl = robots_ttl
+        self.user_agent = user_agent
+        self._hosts = {}
+        self._robots = {}
+        self._robots_locks = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host):
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = _Host(self.rate, self.burst, self.concurrency)
+            return state
+
+    def robots(self, url):
+        """Return the parsed robots.txt of the URL's origin, fetching it if needed."""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            lock = self._robots_locks.setdefault(origin, threading.Lock())
+        # One fetch per origin even when many workers ask at once
+        with lock:
+            entry = self._robots.get(origin)
+            if entry is not None and entry[1] > time.monotonic():
+                return entry[0]
+            parser, ttl = self._fetch_robots(origin)
+            with self._lock:
+                self._robots[origin] = (parser, time.monotonic() + ttl)
+            self._apply_crawl_delay(domain_of(url), parser)
+            return parser
+
+    def _fetch_robots(self, origin):
+        parser = robotparser.RobotFileParser(origin + "/robots.txt")
+        try:
+            with metrics.stage("robots_fetch"):
+                status, body, _, _ = cached_get(
+                    self.session or get_http_session(), parser.url, self.cache, HTTP_TIMEOUT
+                )
+        except requests.RequestException:
+            status, body = None, None
+        if status == 200:
+            text = body.decode("utf-8", errors="replace")
+            # robotparser only reads whole seconds; round fractional delays up rather than drop them
+            text = _FRACTIONAL_DELAY.sub(lambda m: m.group(1) + str(math.ceil(float(m.group(2)))), text)
+            parser.parse(text.splitlines())
+            return parser, self.robots_ttl
+        # No robots.txt (4xx) allows everything; an unreachable one is retried sooner
+        parser.allow_all = True
+        return parser, self.robots_ttl if status is not None and 400 <= status < 500 else ROBOTS_ERROR_TTL
+
+    def _apply_crawl_delay(self, host, parser):
+        delay = parser.crawl_delay(self.user_agent)
+        request_rate = parser.request_rate(self.user_agent)
+        if request_rate is not None and request_rate.requests:
+            delay = max(delay or 0, request_rate.seconds / request_rate.requests)
+        state = self._host(host)
+        if delay:
+            delay = min(float(delay), MAX_CRAWL_DELAY)
+            state.crawl_delay = delay
+            state.bucket.configure(min(self.rate, 1 / delay), 1)
+        elif state.crawl_delay is not None:
+            state.crawl_delay = None
+            state.bucket.configure(self.rate, self.burst)
+
+    def allowed(self, url):
+        """Whether robots.txt lets us fetch the URL."""
+        if not self.obey_robots:
+            return True
+        return self.robots(url).can_fetch(self.user_agent, url)
+
+    def ready_in(self, url):
+        """Seconds until the URL's host has a request token free."""
+        return self._host(domain_of(url)).bucket.ready_in()
+
+    @contextmanager
+    def slot(self, url):
+        """Hold one of the host's slots and wait for its rate limit.
+
+        Raises ``RobotsDisallowed`` for URLs excluded by robots.txt.
+        """
+        host = domain_of(url)
+        state = self._host(host)
+        if not self.allowed(url):
+            with self._lock:
+                state.disallowed += 1
+            raise RobotsDisallowed(f"Disallowed by robots.txt: {url}")
+        with metrics.stage("host_wait"):
+            state.slots.acquire()
+            wait = state.bucket.reserve()
+            if wait > 0:
+                time.sleep(wait)
+        with self._lock:
+            state.requests += 1
+            state.waited += wait
+        try:
+            yield
+        finally:
+            state.slots.release()
+
+    def stats(self):
+        """Return per-host request counts, time spent waiting and crawl-delays."""
+        with self._lock:
+            return {
+                host: {
+                    "requests": state.requests,
+                    "waited_s": round(state.waited, 3),
+                    "disallowed": state.disallowed,
+                    "crawl_delay": state.crawl_delay,
+                }
+                for host, state in self._hosts.items()
+            }
+
+
+def interleave_hosts(urls):
+    """Return ``(index, url)`` pairs reordered round-robin across hosts.
+
+    Hosts keep their own URL order, so a long run of URLs on one host no
+    longer sits in front of everything queued for the others.
+    """
+    queues = {}
+    for index, url in enumerate(urls):
+        queues.setdefault(domain_of(url), []).append((index, url))
+    ordered = []
+    position = 0
+    while queues:
+        for host in list(queues):
+            pending = queues[host]
+            ordered.append(pending[position])
+            if position + 1 == len(pending):
+                del queues[host]
+        position += 1
+    return ordered
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_politeness():
+    """Return the process-wide politeness scheduler, creating it on first use."""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = PolitenessScheduler(cache=get_response_cache())
+        return _default_scheduler
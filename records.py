@@ -0,0 +1,323 @@
+"""Compact record types for listings held in bulk.
+
+The extractors return each record as a dict, the JSON shape every consumer
+reads. A dict per record costs several hundred bytes, much of it the same
+keys over and over, which adds up when a batch or a long crawl keeps
+hundreds of thousands of them. ``RecordColumns`` stores a list per field
+instead. Fields whose values repeat across records (company, location,
+source page, domain) are dictionary-encoded: an ``array`` of codes into a
+table of interned distinct strings. The container converts to a DataFrame
+or Arrow table column by column, without building a dict per record. It
+writes back out in the records' JSON shape. Single rows come out as the
+``__slots__`` record classes below, which read like the dicts they replace.
+"""
+import sys
+from array import array
+from collections.abc import Mapping
+from urllib.parse import urlsplit
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+class Record(Mapping):
+    """A fixed-shape record with one slot per field.
+
+    It is a read-only mapping, so ``record["title"]``, ``record.get()``,
+    ``dict(record)`` and comparison with the equivalent dict all work. Fields
+    listed in ``optional`` are left out of the mapping while they are None,
+    as the extractors leave them out of their dicts.
+    """
+
+    __slots__ = ()
+    kind = ""
+    optional = ()
+
+    def __init__(self, *values, **named):
+        fields = self.__slots__
+        if len(values) > len(fields):
+            raise TypeError(f"{type(self).__name__} takes at most {len(fields)} values")
+        for field, value in zip(fields, values):
+            setattr(self, field, value)
+        for field in fields[len(values):]:
+            setattr(self, field, named.pop(field, None if field in self.optional else ""))
+        if named:
+            raise TypeError(f"{type(self).__name__} has no field {', '.join(named)}")
+
+    @classmethod
+    def from_dict(cls, record):
+        return cls(**record)
+
+    def __getitem__(self, field):
+        if field in self.__slots__:
+            value = getattr(self, field)
+            if value is not None or field not in self.optional:
+                return value
+        raise KeyError(field)
+
+    def __iter__(self):
+        for field in self.__slots__:
+            if field not in self.optional or getattr(self, field) is not None:
+                yield field
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def to_dict(self):
+        """The record in its JSON shape."""
+        return {field: self[field] for field in self}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{field}={self[field]!r}' for field in self)})"
+
+
+class JobRecord(Record):
+    __slots__ = ("title", "company", "location", "description", "link")
+    kind = "job"
+
+
+class ProductRecord(Record):
+    __slots__ = ("name", "price", "link", "image_url")
+    kind = "product"
+    optional = ("image_url",)
+
+
+class ArticleRecord(Record):
+    __slots__ = ("title", "summary", "date", "author", "link")
+    kind = "article"
+
+
+class LinkRecord(Record):
+    __slots__ = ("text", "url")
+    kind = "link"
+
+
+class ImageRecord(Record):
+    __slots__ = ("url", "alt")
+    kind = "image"
+
+
+RECORD_TYPES = {cls.kind: cls for cls in (JobRecord, ProductRecord, ArticleRecord, LinkRecord, ImageRecord)}
+
+# Record kind -> fields whose values repeat across records, stored dictionary-encoded
+REPEATED_FIELDS = {
+    "job": ("company", "location"),
+    "product": (),
+    "article": ("author",),
+    "link": (),
+    "image": (),
+}
+
+# Columns describing where a record came from; only present once a record was added with its page URL
+SOURCE_FIELDS = ("source_url", "domain")
+
+
+class _DictionaryColumn:
+    """Codes into a table of distinct interned strings; -1 stands for None."""
+
+    __slots__ = ("codes", "values", "_index")
+
+    def __init__(self):
+        self.codes = array("i")
+        self.values = []
+        self._index = {}
+
+    def append(self, value, times=1):
+        if value is None:
+            code = -1
+        else:
+            code = self._index.get(value)
+            if code is None:
+                code = self._index[value] = len(self.values)
+                self.values.append(sys.intern(value))
+        if times == 1:
+            self.codes.append(code)
+        else:
+            self.codes.extend(array("i", (code,)) * times)
+
+    def __getitem__(self, row):
+        code = self.codes[row]
+        return None if code < 0 else self.values[code]
+
+    def __iter__(self):
+        values = self.values
+        return (None if code < 0 else values[code] for code in self.codes)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def take(self, rows):
+        # The string table is append-only, so the subset can share it
+        subset = _DictionaryColumn.__new__(_DictionaryColumn)
+        subset.codes = array("i", (self.codes[row] for row in rows))
+        subset.values = self.values
+        subset._index = self._index
+        return subset
+
+
+class RecordColumns:
+    """Records of one kind stored column by column.
+
+    Append dicts (or records) with ``append``/``extend``; iterating yields
+    ``Record`` rows and ``to_dicts`` the JSON shape. ``extend`` takes the
+    page URL the records came from, kept with its domain in two extra
+    dictionary-encoded columns that ``to_pandas``/``to_arrow`` include.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.record_type = RECORD_TYPES[kind]
+        self.fields = self.record_type.__slots__
+        repeated = REPEATED_FIELDS[kind]
+        self._columns = {field: _DictionaryColumn() if field in repeated else [] for field in self.fields}
+        self._sources = None
+        self._length = 0
+
+    @classmethod
+    def from_records(cls, kind, records, source_url=None):
+        columns = cls(kind)
+        columns.extend(records, source_url)
+        return columns
+
+    def append(self, record, source_url=None):
+        self.extend((record,), source_url)
+
+    def extend(self, records, source_url=None):
+        """Add records (dicts of this kind's shape, or ``Record`` rows) from one page."""
+        start = self._length
+        columns = self._columns
+        optional = self.record_type.optional
+        for record in records:
+            unknown = [field for field in record if field not in columns]
+            if unknown:
+                raise ValueError(f"{self.kind} records have no field {', '.join(unknown)}")
+            for field, column in columns.items():
+                column.append(record.get(field, None if field in optional else ""))
+            self._length += 1
+        added = self._length - start
+        if self._sources is None and source_url is not None:
+            self._sources = {field: _DictionaryColumn() for field in SOURCE_FIELDS}
+            for column in self._sources.values():
+                column.append(None, start)
+        if self._sources is not None and added:
+            self._sources["source_url"].append(source_url, added)
+            self._sources["domain"].append((urlsplit(source_url).hostname or "") if source_url else None, added)
+
+    def __len__(self):
+        return self._length
+
+    def __bool__(self):
+        return self._length > 0
+
+    def row(self, index):
+        """Return row ``index`` as a ``Record``."""
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("record index out of range")
+        return self.record_type(*(self._columns[field][index] for field in self.fields))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(range(*index.indices(self._length)))
+        return self.row(index)
+
+    def take(self, rows):
+        """Return a new ``RecordColumns`` holding the given row indices, in that order."""
+        rows = list(rows)
+        subset = RecordColumns(self.kind)
+        subset._columns = {
+            field: column.take(rows) if isinstance(column, _DictionaryColumn) else [column[row] for row in rows]
+            for field, column in self._columns.items()
+        }
+        if self._sources is not None:
+            subset._sources = {field: column.take(rows) for field, column in self._sources.items()}
+        subset._length = len(rows)
+        return subset
+
+    def __iter__(self):
+        record_type = self.record_type
+        for values in zip(*(self._columns[field] for field in self.fields)):
+            yield record_type(*values)
+
+    def column(self, field):
+        """All values of one field (or source column) as a list."""
+        if field in SOURCE_FIELDS:
+            return list(self._sources[field]) if self._sources is not None else [None] * self._length
+        return list(self._columns[field])
+
+    def to_dicts(self):
+        """The records in their JSON shape: a list of dicts as the extractors return them."""
+        return [record.to_dict() for record in self]
+
+    def _all_columns(self, sources):
+        columns = dict(self._columns)
+        if sources and self._sources is not None:
+            columns.update(self._sources)
+        return columns
+
+    def to_pandas(self, sources=True):
+        """Return a DataFrame, one column per field; ``sources`` adds the source columns.
+
+        Dictionary-encoded fields become categoricals over the distinct
+        values; no dict per record is built on the way.
+        """
+        import numpy as np
+        import pandas as pd
+
+        data = {}
+        for field, column in self._all_columns(sources).items():
+            if isinstance(column, _DictionaryColumn):
+                data[field] = pd.Categorical.from_codes(np.frombuffer(column.codes, dtype=np.int32).copy(), column.values)
+            else:
+                data[field] = column
+        return pd.DataFrame(data, columns=list(data))
+
+    def to_arrow(self, sources=True):
+        """Return a pyarrow Table; dictionary-encoded fields become Arrow dictionary arrays."""
+        if not HAS_PYARROW:
+            raise ImportError("Arrow conversion requires pyarrow (pip install pyarrow)")
+        import numpy as np
+        import pyarrow as pa
+
+        arrays = {}
+        for field, column in self._all_columns(sources).items():
+            if isinstance(column, _DictionaryColumn):
+                codes = np.frombuffer(column.codes, dtype=np.int32)
+                indices = pa.array(codes, type=pa.int32(), mask=codes < 0)
+                arrays[field] = pa.DictionaryArray.from_arrays(indices, pa.array(column.values, type=pa.string()))
+            else:
+                arrays[field] = pa.array(column, type=pa.string())
+        return pa.table(arrays)
+
+    def __repr__(self):
+        return f"RecordColumns({self.kind!r}, {self._length} records)"
+
+
+# Result keys holding listings, with their record kind
+RESULT_KEYS = {"jobs": "job", "products": "product", "articles": "article", "links": "link", "images": "image"}
+
+
+def compact_result(data):
+    """Return a copy of a scrape result with its listings stored as ``RecordColumns``.
+
+    The copy exports, counts and displays like the original; ``json_default``
+    writes it back out in the original JSON shape.
+    """
+    compact = dict(data)
+    for key, kind in RESULT_KEYS.items():
+        if isinstance(data.get(key), list):
+            compact[key] = RecordColumns.from_records(kind, data[key], data.get("url"))
+    return compact
+
+
+def json_default(value):
+    """``default=`` for ``json.dump``: writes ``RecordColumns`` and ``Record`` in their JSON shape."""
+    if isinstance(value, RecordColumns):
+        return value.to_dicts()
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,252 @@
+"""Retries with backoff and per-host circuit breakers for page fetches.
+
+A fetch that failed for a reason that may pass (a timeout, a dropped
+connection, a rate-limit or server-error status) is retried after a
+jittered exponential backoff, honouring ``Retry-After``. Failures that will
+repeat, such as a bad URL or a page the browser cannot handle, are raised
+at once. Each host has a breaker that stops fetching from it for a while
+after repeated failures. ``fetcher`` runs both its HTTP and browser tiers
+through the process-wide ``get_resilience()``.
+"""
+import email.utils
+import random
+import re
+import threading
+import time
+
+import requests
+
+import metrics
+
+# Responses worth asking for again: rate limited, or the server or a proxy failed
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+# Attempts per request, counting the first one
+MAX_ATTEMPTS = 3
+# Backoff before retry n is uniform in [0, min(BACKOFF_MAX, BACKOFF_BASE * 2**n)]
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+# A longer Retry-After is not waited out; the request fails instead
+MAX_RETRY_AFTER = 120
+# Consecutive failures that open a host's breaker, and how long it stays open
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 30
+
+HTTP_RETRYABLE = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+# WebDriverException messages for a lost browser session or a failed connection, not a bad page
+BROWSER_SESSION_FAILURE = re.compile(
+    r"disconnected|unknown error: net::|chrome not reachable|invalid session id|session deleted", re.IGNORECASE
+)
+
+
+def browser_session_lost(error):
+    """Whether a Selenium error means the session or its connection failed, so a fresh driver may succeed."""
+    names = {cls.__name__ for cls in type(error).__mro__}
+    if "InvalidSessionIdException" in names:
+        return True
+    return "WebDriverException" in names and bool(BROWSER_SESSION_FAILURE.search(str(error)))
+
+
+# Selenium errors are matched by name so this module does not import selenium. Other
+# WebDriverExceptions (a bad selector, a stale element) fail the same way every time.
+BROWSER_RETRYABLE = ("TimeoutException", browser_session_lost)
+
+
+class RetryableStatus(Exception):
+    """A response whose status says the request may succeed if repeated."""
+
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"status {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class CircuitOpen(Exception):
+    """Raised instead of fetching from a host whose breaker is open."""
+
+
+def parse_retry_after(value):
+    """Return the seconds a ``Retry-After`` header asks for, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """Full-jitter exponential backoff before retry number ``attempt`` (from 0)."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def is_retryable(error, retry_on):
+    """Whether ``error`` matches ``retry_on``: exception classes, class names and/or predicates."""
+    if isinstance(error, RetryableStatus):
+        return True
+    if isinstance(error, CircuitOpen):
+        return False
+    names = {cls.__name__ for cls in type(error).__mro__}
+    for kind in retry_on:
+        if isinstance(kind, type):
+            if isinstance(error, kind):
+                return True
+        elif isinstance(kind, str):
+            if kind in names:
+                return True
+        elif kind(error):
+            return True
+    return False
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker for one host.
+
+    ``threshold`` consecutive failures open it; requests then fail at once
+    until ``reset_timeout`` has passed, after which a single trial request is
+    let through. Its success closes the breaker, its failure opens it again.
+    """
+
+    def __init__(self, threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self):
+        """Whether a request may go ahead now; claims the trial slot when half-open.
+
+        Returns the state the request goes ahead in, "closed" or "half-open",
+        or None when it may not.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at < self.reset_timeout or self._trial:
+                return None
+            self._trial = True
+            return "half-open"
+
+    def release(self):
+        """Give back the trial slot without a verdict; the breaker stays half-open."""
+        with self._lock:
+            self._trial = False
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def failure(self):
+        """Count a failure and return True if it opened the breaker."""
+        with self._lock:
+            self.failures += 1
+            reopen = self._trial
+            self._trial = False
+            if reopen or (self.opened_at is None and self.failures >= self.threshold):
+                self.opened_at = time.monotonic()
+                self.trips += 1
+                return True
+            return False
+
+
+class Resilience:
+    """Retries with jittered exponential backoff and per-host circuit breakers.
+
+    ``call(host, func, retry_on)`` runs ``func`` until it succeeds, raises an
+    error that is not retryable, or runs out of ``max_attempts``. A
+    ``RetryableStatus`` carrying ``Retry-After`` waits at least that long.
+    Every retryable failure counts against the host's breaker; while it is
+    open ``call`` raises ``CircuitOpen`` without running ``func``, so a dead
+    host does not tie up workers, browser sessions or politeness slots.
+
+    Retries, time spent backing off and breaker activity are reported to the
+    active ``metrics`` collector.
+    """
+
+    def __init__(self, max_attempts=MAX_ATTEMPTS, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX,
+                 max_retry_after=MAX_RETRY_AFTER, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, host):
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def call(self, host, func, retry_on=HTTP_RETRYABLE):
+        breaker = self.breaker(host)
+        for attempt in range(self.max_attempts):
+            admitted = breaker.allow()
+            if admitted is None:
+                metrics.add(breaker_rejections=1)
+                raise CircuitOpen(f"Circuit open for {host}: too many recent failures")
+            try:
+                result = func()
+            except Exception as e:
+                if not is_retryable(e, retry_on):
+                    # A bad URL or a robots.txt refusal says nothing about the host's
+                    # health: the failure count and state stay as they were
+                    if admitted == "half-open":
+                        breaker.release()
+                    raise
+                if breaker.failure():
+                    metrics.add(breaker_trips=1)
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                retry_after = parse_retry_after(getattr(e, "retry_after", None))
+                if retry_after is not None:
+                    if retry_after > self.max_retry_after:
+                        raise
+                    delay = max(delay, retry_after)
+                if attempt + 1 == self.max_attempts:
+                    raise
+                metrics.add(retries=1)
+                with metrics.stage("backoff"):
+                    time.sleep(delay)
+            else:
+                breaker.success()
+                return result
+
+    def stats(self):
+        """Return each host's breaker state, consecutive failures and trips."""
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {
+            host: {"state": breaker.state, "failures": breaker.failures, "trips": breaker.trips}
+            for host, breaker in breakers.items()
+        }
+
+
+_default_resilience = None
+_default_resilience_lock = threading.Lock()
+
+
+def get_resilience():
+    """Return the process-wide retry policy and breakers, creating them on first use."""
+    global _default_resilience
+    with _default_resilience_lock:
+        if _default_resilience is None:
+            _default_resilience = Resilience()
+        return _default_resilience
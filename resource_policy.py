@@ -0,0 +1,113 @@
+import os
+
+# Resource type -> URL patterns for the DevTools Network.setBlockedURLs command
+TYPE_PATTERNS = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "mp3", "ogg", "oga", "m4a", "wav", "mov", "m3u8"),
+    "stylesheet": ("css",),
+}
+# Analytics, ad and session-replay hosts; nothing the extractors read comes from them
+TRACKER_PATTERNS = (
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*googlesyndication.com*",
+    "*doubleclick.net*",
+    "*connect.facebook.net*",
+    "*hotjar.com*",
+    "*segment.io*",
+    "*segment.com/analytics*",
+    "*mixpanel.com*",
+    "*amplitude.com*",
+    "*clarity.ms*",
+    "*newrelic.com*",
+    "*nr-data.net*",
+    "*optimizely.com*",
+    "*scorecardresearch.com*",
+    "*quantserve.com*",
+    "*criteo.com*",
+    "*taboola.com*",
+    "*outbrain.com*",
+)
+
+# Blocked unless a page type needs them: the extractors read DOM text and
+# attributes only, and extract_images needs just the src values
+DEFAULT_BLOCKED = ("image", "font", "media", "tracker")
+# Content type -> resource types blocked while rendering pages of that type.
+# Listing pages keep their CSS because lazy loaders and infinite scroll act on
+# layout and visibility; text-only pages render fine without it.
+BLOCKED_BY_CONTENT_TYPE = {
+    "job_listing": DEFAULT_BLOCKED,
+    "product": DEFAULT_BLOCKED,
+    "image_gallery": DEFAULT_BLOCKED,
+    "article": DEFAULT_BLOCKED + ("stylesheet",),
+    "table_data": DEFAULT_BLOCKED + ("stylesheet",),
+    "directory": DEFAULT_BLOCKED + ("stylesheet",),
+    "general": DEFAULT_BLOCKED + ("stylesheet",),
+}
+
+# "auto" follows the content type; "on" always blocks CSS, "off" never does
+BLOCK_CSS = os.environ.get("SCRAPER_BLOCK_CSS", "auto").lower()
+# Images are also switched off in the browser profile, which catches image
+# URLs without a file extension; set to "0" to load them
+BLOCK_IMAGES = os.environ.get("SCRAPER_BLOCK_IMAGES", "1") != "0"
+
+# Chrome profile preferences that turn images off entirely
+NO_IMAGES_PREFS = {"profile.managed_default_content_settings.images": 2}
+
+
+def url_patterns(blocked):
+    """Expand resource types (and ``tracker``) into URL patterns to block."""
+    patterns = []
+    for kind in blocked:
+        if kind == "tracker":
+            patterns.extend(TRACKER_PATTERNS)
+            continue
+        for extension in TYPE_PATTERNS[kind]:
+            patterns.append(f"*.{extension}")
+            patterns.append(f"*.{extension}?*")
+    return patterns
+
+
+class ResourcePolicy:
+    """The resource types and URL patterns a headless browser should not load.
+
+    ``apply(driver)`` installs the block list through the DevTools protocol;
+    it is skipped when the driver already has the same policy, so switching
+    pooled browsers between page types costs one command at most.
+    """
+
+    def __init__(self, blocked=DEFAULT_BLOCKED, extra_patterns=()):
+        self.blocked = tuple(sorted(set(blocked)))
+        self.patterns = url_patterns(self.blocked) + list(extra_patterns)
+        self.key = (self.blocked, tuple(extra_patterns))
+
+    def __eq__(self, other):
+        return isinstance(other, ResourcePolicy) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"ResourcePolicy(blocked={self.blocked!r})"
+
+    def apply(self, driver):
+        """Install this policy on a Chromium WebDriver; other drivers are left alone."""
+        if getattr(driver, "resource_policy", None) == self or not hasattr(driver, "execute_cdp_cmd"):
+            return
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns})
+        driver.resource_policy = self
+
+
+def policy_for(content_type=None, block_css=None):
+    """Return the resource policy for pages of ``content_type`` (None if not known yet)."""
+    block_css = (block_css or BLOCK_CSS).lower()
+    blocked = set(BLOCKED_BY_CONTENT_TYPE.get(content_type, DEFAULT_BLOCKED))
+    if block_css == "on":
+        blocked.add("stylesheet")
+    elif block_css == "off":
+        blocked.discard("stylesheet")
+    if not BLOCK_IMAGES:
+        blocked.discard("image")
+    return ResourcePolicy(blocked)
@@ -0,0 +1,262 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from fetcher import domain_of
+
+DEFAULT_RESULTS_PATH = os.environ.get(
+    "SCRAPER_RESULTS_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "ai_web_scraper", "results.sqlite"),
+)
+# Rows per executemany call inside a write transaction
+BATCH_SIZE = 500
+
+# Record kind -> (table, typed columns, title column, fields identifying a record)
+KINDS = {
+    "job": (
+        "jobs",
+        [("title", "TEXT"), ("company", "TEXT"), ("location", "TEXT"), ("description", "TEXT"), ("link", "TEXT")],
+        "title",
+        ("title", "company", "location", "link"),
+    ),
+    "product": (
+        "products",
+        [("name", "TEXT"), ("price", "TEXT"), ("price_value", "REAL"), ("image_url", "TEXT"), ("link", "TEXT")],
+        "name",
+        ("name", "link", "image_url"),
+    ),
+    "article": (
+        "articles",
+        [("title", "TEXT"), ("summary", "TEXT"), ("date", "TEXT"), ("author", "TEXT"), ("link", "TEXT")],
+        "title",
+        ("title", "link"),
+    ),
+    "table_row": (
+        "table_rows",
+        [("table_index", "INTEGER"), ("row_json", "TEXT")],
+        "page_title",
+        ("source_url", "table_index", "row_json"),
+    ),
+    "link": (
+        "links",
+        [("text", "TEXT"), ("url", "TEXT")],
+        "text",
+        ("source_url", "url"),
+    ),
+}
+# Result key -> record kind
+RESULT_KEYS = {"jobs": "job", "products": "product", "articles": "article", "tables": "table_row", "links": "link"}
+
+# Field names other scrapers use for a typed column
+_ALIASES = {"apply_link": "link"}
+
+_COMMON_COLUMNS = ["record_hash", "domain", "source_url", "page_title", "extra", "first_seen", "last_seen"]
+_PRICE = re.compile(r"\d[\d.,]*")
+
+
+def price_value(price):
+    """Parse the number out of a price string like ``$1,299.00`` or ``12,50 €``."""
+    match = _PRICE.search(price or "")
+    if not match:
+        return None
+    number = match.group().rstrip(".,")
+    if "," in number and "." in number:
+        # Whichever separator comes last is the decimal point
+        number = number.replace(",", "") if number.rfind(".") > number.rfind(",") else number.replace(".", "").replace(",", ".")
+    elif "," in number:
+        whole, _, fraction = number.rpartition(",")
+        number = f"{whole.replace(',', '')}.{fraction}" if len(fraction) != 3 else number.replace(",", "")
+    try:
+        return float(number)
+    except ValueError:
+        return None
+
+
+def record_hash(kind, row):
+    """Stable hash of the fields that identify a record of this kind."""
+    key_fields = KINDS[kind][3]
+    identity = [" ".join(str(row.get(field) or "").split()).lower() for field in key_fields]
+    return hashlib.blake2b(json.dumps([kind] + identity).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _row(kind, record, source_url, page_title, scraped_at):
+    """Map a scraped record onto the typed columns of its table."""
+    columns = [name for name, _ in KINDS[kind][1]]
+    if kind == "table_row":
+        table_index, cells = record
+        row = {"table_index": table_index, "row_json": json.dumps(cells, ensure_ascii=False, sort_keys=True)}
+        extra = None
+    else:
+        record = {_ALIASES.get(key, key): value for key, value in record.items()}
+        row = {name: record.get(name) for name in columns}
+        if kind == "product":
+            row["price_value"] = price_value(record.get("price"))
+        leftover = {key: value for key, value in record.items() if key not in row}
+        extra = json.dumps(leftover, ensure_ascii=False) if leftover else None
+    row.update(
+        source_url=source_url,
+        domain=domain_of(source_url) if source_url else None,
+        page_title=page_title,
+        extra=extra,
+        first_seen=scraped_at,
+        last_seen=scraped_at,
+    )
+    row["record_hash"] = record_hash(kind, row)
+    return row
+
+
+class ResultsStore:
+    """Embedded SQLite store of scraped records, one typed table per record kind.
+
+    Writes are batched upserts inside one transaction, keyed on a stable hash
+    of each record's identifying fields: scraping the same job again updates
+    its row and ``last_seen`` instead of adding a copy. Every table is indexed
+    on domain, scrape time and title so the browse view can page through
+    large histories without loading them.
+    """
+
+    def __init__(self, path=DEFAULT_RESULTS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        for kind, (table, columns, title_column, _) in KINDS.items():
+            typed = ", ".join(f"{name} {sql_type}" for name, sql_type in columns)
+            self._db.execute(
+                f"""CREATE TABLE IF NOT EXISTS {table} (
+                    record_hash TEXT PRIMARY KEY,
+                    domain TEXT,
+                    source_url TEXT,
+                    page_title TEXT,
+                    {typed},
+                    extra TEXT,
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL
+                )"""
+            )
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_domain ON {table} (domain, last_seen)")
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_last_seen ON {table} (last_seen)")
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_title ON {table} ({title_column})")
+
+    def _upsert_sql(self, kind):
+        table, columns = KINDS[kind][:2]
+        names = _COMMON_COLUMNS + [name for name, _ in columns]
+        updates = ", ".join(f"{name} = excluded.{name}" for name in names if name not in ("record_hash", "first_seen"))
+        return (
+            f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join(':' + name for name in names)}) "
+            f"ON CONFLICT(record_hash) DO UPDATE SET {updates}"
+        )
+
+    def save_records(self, kind, records, source_url=None, page_title=None, scraped_at=None):
+        """Upsert records of one kind in a single transaction and return how many were written."""
+        return self._write([(kind, records, source_url, page_title)], scraped_at)[kind]
+
+    def save(self, result, scraped_at=None):
+        """Upsert every storable record of a scrape result; returns counts per kind."""
+        source_url = result.get("url")
+        page_title = result.get("page_title")
+        groups = []
+        for key, kind in RESULT_KEYS.items():
+            items = result.get(key)
+            if not items:
+                continue
+            if kind == "table_row":
+                items = [(index, row) for index, table in enumerate(items) for row in table["rows"]]
+            groups.append((kind, items, source_url, page_title))
+        return self._write(groups, scraped_at)
+
+    def _write(self, groups, scraped_at):
+        scraped_at = scraped_at or time.time()
+        counts = {}
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for kind, records, source_url, page_title in groups:
+                    sql = self._upsert_sql(kind)
+                    rows = [_row(kind, record, source_url, page_title, scraped_at) for record in records]
+                    for start in range(0, len(rows), BATCH_SIZE):
+                        self._db.executemany(sql, rows[start:start + BATCH_SIZE])
+                    counts[kind] = counts.get(kind, 0) + len(rows)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return counts
+
+    def _where(self, kind, domain=None, search=None, since=None, until=None):
+        title_column = KINDS[kind][2]
+        clauses, params = [], []
+        if domain:
+            clauses.append("domain = ?")
+            params.append(domain)
+        if search:
+            clauses.append(f"{title_column} LIKE ?")
+            params.append(f"%{search}%")
+        if since is not None:
+            clauses.append("last_seen >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("last_seen < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, kind, domain=None, search=None, since=None, until=None,
+              order_by="last_seen", descending=True, limit=50, offset=0):
+        """Return one page of records as dicts, filtered and sorted in SQL."""
+        table, columns = KINDS[kind][:2]
+        sortable = set(_COMMON_COLUMNS) | {name for name, _ in columns}
+        if order_by not in sortable:
+            raise ValueError(f"Cannot sort {table} by {order_by!r}")
+        where, params = self._where(kind, domain, search, since, until)
+        direction = "DESC" if descending else "ASC"
+        sql = f"SELECT * FROM {table}{where} ORDER BY {order_by} {direction} LIMIT ? OFFSET ?"
+        with self._lock:
+            rows = self._db.execute(sql, params + [limit, offset]).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, kind, domain=None, search=None, since=None, until=None):
+        """Return the number of records matching the same filters as ``query``."""
+        table = KINDS[kind][0]
+        where, params = self._where(kind, domain, search, since, until)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+
+    def domains(self, kind):
+        """Return the domains with stored records of a kind."""
+        table = KINDS[kind][0]
+        with self._lock:
+            rows = self._db.execute(f"SELECT DISTINCT domain FROM {table} WHERE domain IS NOT NULL ORDER BY domain")
+            return [row[0] for row in rows]
+
+    def stats(self):
+        """Return the number of stored records per kind."""
+        with self._lock:
+            return {
+                kind: self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for kind, (table, *_) in KINDS.items()
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_results_store():
+    """Return the process-wide results store, creating it on first use."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ResultsStore()
+        return _default_store
@@ -0,0 +1,698 @@
+"""Scraping core: content detection, extraction and ``smart_scrape``.
+
+Free of Streamlit and pandas, and selenium is only imported once a page
+actually needs the browser, so scripts and workers can use it cheaply.
+"""
+import atexit
+import os
+import re
+import threading
+import time
+from urllib.parse import urljoin
+
+import metrics
+from dom_index import build_dom_index, count_containers, find_fields, JOB_FIELDS, PRODUCT_FIELDS, ARTICLE_FIELDS
+from driver_pool import DriverPool
+from page_wait import wait_for_page_ready
+from fetcher import DomainTierMemory, TieredFetcher, USER_AGENT, domain_of
+from http_cache import get_response_cache
+from politeness import get_politeness
+from resilience import get_resilience
+from resource_policy import BLOCK_IMAGES, NO_IMAGES_PREFS, policy_for
+from parsers import SubtreeFilter, decode_html, make_soup
+from dedupe import DedupeIndex
+from change_tracker import body_fingerprint, content_fingerprint, data_fingerprint
+from structured_data import extract_structured_data, merge_listing, page_title, structured_listing
+from templates import learn_template
+
+def setup_selenium_driver():
+    """Set up and return a Selenium WebDriver with Chrome."""
+    # Imported here so parsing-only users never load selenium
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+    
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument(f"--user-agent={USER_AGENT}")
+    if BLOCK_IMAGES:
+        chrome_options.add_experimental_option("prefs", NO_IMAGES_PREFS)
+    service = Service(os.environ.get("CHROMEDRIVER_PATH", r'C:\Users\user\Desktop\Python\chromedriver.exe'))
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    return driver
+
+# Browsers kept warm for the life of the process
+DRIVER_POOL_SIZE = 4
+DRIVER_MAX_PAGES = 50
+
+_driver_pool = None
+_fetcher = None
+_lock = threading.Lock()
+
+def get_driver_pool():
+    """Return the process-wide WebDriver pool; browsers start on first lease."""
+    global _driver_pool
+    with _lock:
+        if _driver_pool is None:
+            _driver_pool = DriverPool(setup_selenium_driver, max_size=DRIVER_POOL_SIZE, max_pages=DRIVER_MAX_PAGES)
+            atexit.register(_driver_pool.close)
+        return _driver_pool
+
+# Hard limit for loading a page and waiting for it to settle
+PAGE_TIMEOUT = 20
+
+def get_html_content(url, driver, wait_selector=None, timeout=PAGE_TIMEOUT):
+    """Get HTML content of a webpage using Selenium."""
+    start = time.monotonic()
+    driver.set_page_load_timeout(timeout)
+    with metrics.stage("driver_get"):
+        driver.get(url)
+    # Wait until dynamic content has finished rendering
+    with metrics.stage("page_wait"):
+        wait_for_page_ready(driver, timeout=max(0, timeout - (time.monotonic() - start)), selector=wait_selector)
+    with metrics.stage("page_source"):
+        return driver.page_source
+
+# Content type last detected per domain, to pick what the browser may skip loading
+domain_content_types = DomainTierMemory()
+# Elements no extractor reads; cut from the markup before it is parsed
+UNUSED_TAGS = ("script", "style", "noscript", "iframe", "svg")
+
+def fetch_with_browser(url, wait_selector=None):
+    """Render a page in a pooled headless browser and return its HTML.
+
+    Images, fonts, media and trackers are not loaded, nor CSS on text-only
+    page types; see ``resource_policy``.
+    """
+    policy = policy_for(domain_content_types.get(domain_of(url)))
+    with get_driver_pool().lease() as driver:
+        with metrics.stage("resource_policy"):
+            policy.apply(driver)
+        return get_html_content(url, driver, wait_selector)
+
+def get_fetcher():
+    """Return the process-wide fetcher that tries plain HTTP before the browser."""
+    global _fetcher
+    with _lock:
+        if _fetcher is None:
+            _fetcher = TieredFetcher(
+                browser_fetch=fetch_with_browser, cache=get_response_cache(),
+                politeness=get_politeness(), resilience=get_resilience(),
+            )
+        return _fetcher
+
+def detect_content_type(soup, index=None):
+    """Detect the primary content type of the page."""
+    if index is None:
+        index = build_dom_index(soup)
+    
+    # Count different element types to determine the main content type
+    type_counts = {
+        "job_listing": len(index.bucket("job")),
+        "product": len(index.bucket("product")),
+        "article": len(index.bucket("article")),
+        "table_data": index.count("table"),
+        "image_gallery": index.count("img") > 10,
+    }
+    
+    # Check for tables with multiple rows
+    for table in index.tags("table"):
+        if len(index.rows(table)) > 3:
+            type_counts["table_data"] += 5  # Give more weight to data tables
+    
+    # Check for forms
+    if index.count("form") > 0:
+        type_counts["form"] = index.count("form") * 3
+    
+    # Count links to determine if it's a directory or navigation page
+    link_count = sum(1 for a in index.tags("a") if a.get("href") is not None)
+    if link_count > 30:
+        type_counts["directory"] = link_count
+    
+    # Return the type with the highest count
+    if not type_counts:
+        return "general"
+    
+    main_type = max(type_counts.items(), key=lambda x: x[1])
+    return main_type[0] if main_type[1] > 0 else "general"
+
+def clean_text(text):
+    """Clean text by removing extra whitespace and special characters."""
+    if not text:
+        return ""
+    # Replace multiple spaces with a single space
+    text = re.sub(r'\s+', ' ', text)
+    # Remove leading/trailing whitespace
+    return text.strip()
+
+def match_job_listings(index):
+    """Pair each candidate job container with its field elements."""
+    # Common job container classes
+    job_containers = index.bucket("job")
+    
+    # If no specific job containers found, look for generic listings
+    if not job_containers:
+        job_containers = index.bucket("job_fallback")
+    
+    matches = []
+    for container in job_containers:
+        # Try to find the job title, company, location
+        fields = find_fields(container, JOB_FIELDS)
+        matches.append((container, {
+            "title": fields["title"] or fields["any_heading"],
+            "company": fields["company"],
+            "location": fields["location"],
+            "description": fields["description"],
+            "link": fields["link"],
+        }))
+    return matches
+
+def job_record(elems, base_url):
+    """Build a job from its field elements, or None if it has neither title nor link."""
+    title_elem = elems["title"]
+    company_elem = elems["company"]
+    location_elem = elems["location"]
+    description_elem = elems["description"]
+    link_elem = elems["link"]
+    
+    title = clean_text(title_elem.get_text()) if title_elem else ""
+    company = clean_text(company_elem.get_text()) if company_elem else ""
+    location = clean_text(location_elem.get_text()) if location_elem else ""
+    description = clean_text(description_elem.get_text()) if description_elem else ""
+    
+    # If we found a title or link, consider it a valid job listing
+    if title or (link_elem and link_elem.get("href")):
+        link = urljoin(base_url, link_elem.get("href")) if link_elem else ""
+        return {
+            "title": title,
+            "company": company,
+            "location": location,
+            "description": description,
+            "link": link
+        }
+    return None
+
+def extract_job_listings(soup, base_url, index=None):
+    """Extract job listings from the page."""
+    if index is None:
+        index = build_dom_index(soup)
+    jobs = (job_record(elems, base_url) for _, elems in match_job_listings(index))
+    return [job for job in jobs if job]
+
+def match_products(index):
+    """Pair each candidate product container with its field elements."""
+    # Common product container classes
+    product_containers = index.bucket("product")
+    
+    # If no specific product containers found, look for generic listings
+    if not product_containers:
+        product_containers = index.bucket("product_fallback")
+    
+    matches = []
+    for container in product_containers:
+        # Try to find the product name, price, image
+        fields = find_fields(container, PRODUCT_FIELDS)
+        matches.append((container, {
+            "name": fields["name"] or fields["any_heading"],
+            "price": fields["price"],
+            "image": fields["image"],
+            "link": fields["link"],
+        }))
+    return matches
+
+def product_record(elems, base_url):
+    """Build a product from its field elements, or None if it has neither name nor image."""
+    name_elem = elems["name"]
+    price_elem = elems["price"]
+    image_elem = elems["image"]
+    link_elem = elems["link"]
+    
+    name = clean_text(name_elem.get_text()) if name_elem else ""
+    price = clean_text(price_elem.get_text()) if price_elem else ""
+    image = image_elem.get("src") if image_elem else ""
+    
+    # If we found a name or image, consider it a valid product
+    if name or image:
+        link = urljoin(base_url, link_elem.get("href")) if link_elem else ""
+        product = {
+            "name": name,
+            "price": price,
+            "link": link
+        }
+        # Add image URL only if it exists and is not a data URI
+        if image and not image.startswith("data:"):
+            product["image_url"] = urljoin(base_url, image)
+        return product
+    return None
+
+def extract_products(soup, base_url, index=None):
+    """Extract product information from the page."""
+    if index is None:
+        index = build_dom_index(soup)
+    products = (product_record(elems, base_url) for _, elems in match_products(index))
+    return [product for product in products if product]
+
+def match_articles(index):
+    """Pair each candidate article container with its field elements."""
+    # Common article container elements
+    article_containers = index.bucket("article_container")
+    
+    # If no specific article containers found, look for headings with text
+    if not article_containers:
+        article_containers = []
+        for heading in index.tags("h1", "h2", "h3"):
+            heading_text = heading.get_text(strip=True)
+            if heading_text and len(heading_text) > 15:
+                article_containers.append(heading.parent)
+    
+    matches = []
+    for container in article_containers:
+        # Try to find the article title, summary, date, author
+        fields = find_fields(container, ARTICLE_FIELDS)
+        title_elem = fields["title"] or fields["any_heading"]
+        matches.append((container, {
+            "title": title_elem,
+            "summary": fields["summary"] or fields["any_paragraph"],
+            "date": fields["date"],
+            "author": fields["author"],
+            # A link nested in the title is also a descendant of the container
+            "link": fields["link"] if title_elem else None,
+        }))
+    return matches
+
+def article_record(elems, base_url):
+    """Build an article from its field elements, or None if it has neither title nor summary."""
+    title_elem = elems["title"]
+    summary_elem = elems["summary"]
+    date_elem = elems["date"]
+    author_elem = elems["author"]
+    link_elem = elems["link"]
+    
+    title = clean_text(title_elem.get_text()) if title_elem else ""
+    summary = clean_text(summary_elem.get_text()) if summary_elem else ""
+    date = clean_text(date_elem.get_text()) if date_elem else ""
+    author = clean_text(author_elem.get_text()) if author_elem else ""
+    
+    # If we found a title or summary, consider it a valid article
+    if title or summary:
+        link = urljoin(base_url, link_elem.get("href")) if link_elem else ""
+        return {
+            "title": title,
+            "summary": summary,
+            "date": date,
+            "author": author,
+            "link": link
+        }
+    return None
+
+def extract_articles(soup, base_url, index=None):
+    """Extract articles or blog posts from the page."""
+    if index is None:
+        index = build_dom_index(soup)
+    articles = (article_record(elems, base_url) for _, elems in match_articles(index))
+    return [article for article in articles if article]
+
+# Listing content type -> (result key, record kind, heuristic matcher, record builder)
+LISTING_EXTRACTORS = {
+    "job_listing": ("jobs", "job", match_job_listings, job_record),
+    "product": ("products", "product", match_products, product_record),
+    "article": ("articles", "article", match_articles, article_record),
+}
+# Listing content type -> the DOM index buckets its matcher reads, fallback last
+LISTING_BUCKETS = {
+    "job_listing": ("job", "job_fallback"),
+    "product": ("product", "product_fallback"),
+    "article": ("article_container",),
+}
+# Share of the page's cards the structured items must account for to stand in for the DOM extractors
+STRUCTURED_COVERAGE = 0.9
+
+def covers_page(html_content, content_type, records):
+    """Whether structured records are about as many as the listing cards in the markup."""
+    cards = 0
+    for bucket in LISTING_BUCKETS[content_type]:
+        cards = count_containers(html_content, bucket)
+        if cards:
+            break
+    return len(records) >= cards * STRUCTURED_COVERAGE
+
+def extract_table_data(soup, index=None):
+    """Extract data from tables on the page."""
+    if index is None:
+        index = build_dom_index(soup)
+    tables_data = []
+    
+    for table in index.tags("table"):
+        headers = []
+        rows = []
+        table_rows = index.rows(table)
+        
+        # Extract headers
+        header_row = table_rows[0] if table_rows else None
+        if header_row:
+            headers = [clean_text(th.get_text()) for th in index.cells(header_row)]
+        
+        # Extract rows
+        for row in table_rows[1:] if headers else table_rows:
+            cells = [clean_text(cell.get_text()) for cell in index.cells(row)]
+            if cells:
+                if headers and len(headers) == len(cells):
+                    rows.append(dict(zip(headers, cells)))
+                else:
+                    rows.append({"cells": cells})
+        
+        if rows:
+            tables_data.append({
+                "headers": headers,
+                "rows": rows,
+                "row_count": len(rows)
+            })
+    
+    return tables_data
+
+def extract_links(soup, base_url, index=None):
+    """Extract important links from the page."""
+    if index is None:
+        index = build_dom_index(soup)
+    links = []
+    
+    for link in index.tags("a"):
+        href = link.get("href")
+        if href is None:
+            continue
+        text = clean_text(link.get_text())
+        
+        # Skip empty links, anchors, and javascript
+        if not href or href.startswith("#") or href.startswith("javascript:"):
+            continue
+            
+        # Make link absolute
+        full_url = urljoin(base_url, href)
+        
+        # Only include links with text
+        if text:
+            links.append({
+                "text": text,
+                "url": full_url
+            })
+    
+    return links
+
+def extract_images(soup, base_url, index=None):
+    """Extract important images from the page."""
+    if index is None:
+        index = build_dom_index(soup)
+    images = []
+    
+    for img in index.tags("img"):
+        src = img.get("src")
+        alt = img.get("alt", "")
+        
+        # Skip data URIs and empty sources
+        if not src or src.startswith("data:"):
+            continue
+            
+        # Make image URL absolute
+        full_url = urljoin(base_url, src)
+        
+        images.append({
+            "url": full_url,
+            "alt": alt
+        })
+    
+    return images
+
+def extract_headings(soup, index=None):
+    """Extract hierarchical headings from the page."""
+    if index is None:
+        index = build_dom_index(soup)
+    headings = []
+    
+    for level in range(1, 7):
+        for heading in index.tags(f"h{level}"):
+            text = clean_text(heading.get_text())
+            if text:
+                headings.append({
+                    "level": level,
+                    "text": text
+                })
+    
+    return headings
+
+def extract_main_content(soup, index=None):
+    """Extract what appears to be the main content from the page."""
+    if index is None:
+        index = build_dom_index(soup)
+    # Try to find main content containers
+    main_containers = index.bucket("main_content")
+    
+    if main_containers:
+        # Use the container with the most text content
+        main_container = max(main_containers, key=lambda x: len(x.get_text(strip=True)))
+        
+        # Extract paragraphs from the main container
+        paragraphs = [clean_text(p.get_text()) for p in main_container.find_all("p")]
+        return [p for p in paragraphs if p and len(p) > 20]  # Filter out very short paragraphs
+    
+    # Fallback: extract all paragraphs from the page
+    paragraphs = [clean_text(p.get_text()) for p in index.tags("p")]
+    return [p for p in paragraphs if p and len(p) > 20]  # Filter out very short paragraphs
+
+def remove_redundant_data(data_list, dedupe=None, kind="", url=None):
+    """Remove duplicate or nearly duplicate entries from a list of dictionaries.
+    
+    Entries repeating an earlier entry's title are dropped first. Reworded
+    reposts and the same item with another link are caught by the
+    MinHash/LSH index in ``dedupe`` for the kinds it matches near-duplicates
+    of (jobs and articles by default); other kinds only lose identical
+    records. Pass a persistent ``DedupeIndex`` to also drop records seen on
+    earlier pages or runs.
+    """
+    if dedupe is None:
+        dedupe = DedupeIndex()
+    return dedupe.filter(data_list, kind, url)
+
+def smart_scrape(url, fetcher=None, wait_selector=None, force_refresh=False, parser=None, metrics_level=None,
+                 dedupe=None, store=None, tracker=None, templates=None, pool=None):
+    """Intelligently scrape a website based on its content type.
+    
+    Unless ``metrics_level`` (or SCRAPER_METRICS) is "off", per-stage timings
+    and counters are added to the result under ``_metrics``. With a ``dedupe``
+    index, listing records seen before (on any page) are dropped. With a
+    ``ResultsStore`` the records are also upserted into it and the counts per
+    kind returned under ``stored``. With a ``ChangeTracker`` an unchanged page
+    is not parsed again, and ``changes`` reports what changed since the last
+    scrape of the URL. With a ``TemplateStore`` listings on known sites are
+    extracted with learned selectors (see ``scrape_html``). With a
+    ``pipeline.ParsePool`` the page is parsed and extracted in one of its
+    worker processes while this thread only fetches.
+    """
+    with metrics.collect(metrics_level) as collector:
+        result = _smart_scrape(url, fetcher, wait_selector, force_refresh, parser, dedupe, store, tracker, templates,
+                               pool)
+        if collector is not None:
+            result["_metrics"] = collector.as_dict()
+    return result
+
+def _smart_scrape(url, fetcher, wait_selector, force_refresh, parser, dedupe, store, tracker, templates, pool):
+    if fetcher is None:
+        fetcher = get_fetcher()
+    
+    try:
+        # Waiting for a selector only makes sense in a rendered page
+        with metrics.stage("fetch"):
+            page = fetcher.fetch(url, force_browser=bool(wait_selector), force_refresh=force_refresh, wait_selector=wait_selector)
+        html_content = page["html"]
+        if not html_content:
+            return {"error": "Failed to retrieve content from the URL"}
+        
+        scrape = scrape_html if pool is None else pool.scrape_html
+        result = scrape(html_content, url, parser, dedupe, tracker, templates)
+        if result.get("content_type"):
+            domain_content_types.set(domain_of(url), result["content_type"])
+        result["fetch_tier"] = page["tier"]
+        result["cache"] = page.get("cache")
+        # Records of an unchanged page were stored when it last changed
+        if store is not None and result.get("changes", {}).get("status") != "unchanged":
+            with metrics.stage("store"):
+                result["stored"] = store.save(result)
+        return result
+    
+    except Exception as e:
+        return {"error": str(e)}
+
+def scrape_html(html_content, url, parser=None, dedupe=None, tracker=None, templates=None):
+    """Detect the content type of fetched HTML and extract its data.
+
+    Schema.org JSON-LD and microdata are read from the raw markup first;
+    when they list the page's jobs, products or articles those become the
+    records and the page is never parsed. When they list clearly fewer
+    items than the markup has cards, the page is extracted as usual and
+    the structured records are merged in front of the DOM ones. With a ``TemplateStore``, listing
+    pages on a site section seen before are extracted with its learned
+    selectors, skipping indexing, detection and the heuristics; when that
+    yields too little the heuristics run and the template is learned again.
+    """
+    # Skip all parsing when the body is byte-for-byte what was seen last time
+    if tracker is not None:
+        with metrics.stage("fingerprint"):
+            previous = tracker.get(url)
+            body_hash = body_fingerprint(html_content)
+        if previous is not None and previous["body_hash"] == body_hash:
+            return tracker.unchanged(url, previous, "body")
+    else:
+        previous = body_hash = None
+    
+    # Work out the charset once, for the structured data and the parser alike
+    with metrics.stage("decode"):
+        html_content = decode_html(html_content)
+    
+    # Try to get structured data first
+    with metrics.stage("schema"):
+        schema_data = extract_structured_data(html_content)
+        listing = structured_listing(schema_data, url) if schema_data else None
+        partial = None
+        if listing is not None and not covers_page(html_content, *listing):
+            # Only some of the cards (featured ones, say): merged with the DOM's below
+            listing, partial = None, listing
+    if listing is not None:
+        return _structured_result(html_content, url, schema_data, listing, dedupe, tracker, previous, body_hash)
+    if partial is not None:
+        metrics.add(structured_partial=1)
+    
+    # Only tokens, timestamps or chrome changed: the extracted data is the same
+    if tracker is not None:
+        with metrics.stage("fingerprint"):
+            content_hash = content_fingerprint(html_content)
+        if previous is not None and previous["content_hash"] == content_hash:
+            return tracker.unchanged(url, previous, "content", body_hash)
+    
+    # With a learned template only its containers are built; every other
+    # page is parsed whole, as detection looks at all of it
+    template = templates.lookup(url) if templates is not None and partial is None else None
+    soup = _parse(html_content, parser, (template.container,) if template is not None else None)
+    
+    # A learned template for this site section replaces indexing and detection
+    records = None
+    if template is not None:
+        build = LISTING_EXTRACTORS[template.content_type][3]
+        with metrics.stage("template"):
+            records = [record for record in (build(elems, url) for _, elems in template.match(soup)) if record]
+        if templates.accept(url, template, len(records)):
+            content_type = template.content_type
+            metrics.add(template_hits=1)
+        else:
+            # The section's layout changed: build the whole page after all
+            records = None
+            metrics.add(subtree_misses=1)
+            soup = _parse(html_content, parser)
+    
+    if records is None:
+        # Index the document once for detection and extraction
+        index = _index(soup)
+        
+        # Detect content type, unless the structured data already told
+        if partial is not None:
+            content_type = partial[0]
+        else:
+            with metrics.stage("detect"):
+                content_type = detect_content_type(soup, index)
+    
+    # Extract data based on content type
+    result = {
+        "page_title": soup.title.get_text() if soup.title else "",
+        "content_type": content_type,
+        "url": url
+    }
+    
+    # Add schema data if available
+    if schema_data:
+        result["schema_data"] = schema_data
+    
+    # Extract specific data based on content type
+    if content_type in LISTING_EXTRACTORS:
+        result_key, kind, match, build = LISTING_EXTRACTORS[content_type]
+        matches = None
+        if records is None:
+            with metrics.stage("extract"):
+                matches = match(index)
+                records = [record for record in (build(elems, url) for _, elems in matches) if record]
+        if partial is not None:
+            records = merge_listing(partial[1], records)
+        with metrics.stage("dedupe"):
+            result[result_key] = remove_redundant_data(records, dedupe, kind, url)
+        if templates is not None and matches is not None and partial is None:
+            with metrics.stage("learn"):
+                learned = learn_template(content_type, soup, matches, lambda elems: build(elems, url),
+                                         lambda found: remove_redundant_data(found, kind=kind))
+            if learned is not None:
+                templates.save(url, learned)
+    else:
+        result.update(_extract_page(content_type, soup, url, index))
+    
+    if tracker is not None:
+        with metrics.stage("diff"):
+            result["changes"] = tracker.record(url, result, body_hash, content_hash, previous)
+    
+    return result
+
+def _parse(html_content, parser, subtrees=None):
+    """Parse a page without the elements no extractor reads; with ``subtrees``, build only those."""
+    parse_only = SubtreeFilter(subtrees + ("title",)) if subtrees else None
+    with metrics.stage("parse"):
+        soup = make_soup(html_content, parser, parse_only=parse_only, drop=UNUSED_TAGS)
+    # Whatever the markup stripper left in place, such as unclosed elements
+    with metrics.stage("decompose"):
+        for tag in soup(UNUSED_TAGS):
+            tag.decompose()
+    return soup
+
+def _index(soup):
+    with metrics.stage("dom_index"):
+        index = build_dom_index(soup)
+    metrics.add(dom_nodes=len(index.position))
+    return index
+
+def _extract_page(content_type, soup, url, index):
+    """Extract a non-listing page: tables, links, images or general content."""
+    with metrics.stage("extract"):
+        if content_type == "table_data":
+            return {"tables": extract_table_data(soup, index)}
+        if content_type == "directory":
+            return {"links": extract_links(soup, url, index)}
+        if content_type == "image_gallery":
+            return {"images": extract_images(soup, url, index)}
+        # General content extraction
+        return {
+            "headings": extract_headings(soup, index),
+            "main_content": extract_main_content(soup, index),
+            "links": extract_links(soup, url, index)[:20],  # Limit to top 20 links
+        }
+
+def _structured_result(html_content, url, schema_data, listing, dedupe, tracker, previous, body_hash):
+    """Build the result of a page whose schema.org data lists its records."""
+    content_type, records = listing
+    if tracker is not None:
+        with metrics.stage("fingerprint"):
+            content_hash = data_fingerprint(schema_data)
+        if previous is not None and previous["content_hash"] == content_hash:
+            return tracker.unchanged(url, previous, "content", body_hash)
+    metrics.add(structured_hits=1)
+    
+    result_key, kind = LISTING_EXTRACTORS[content_type][:2]
+    result = {
+        "page_title": page_title(html_content),
+        "content_type": content_type,
+        "url": url,
+        "schema_data": schema_data,
+    }
+    with metrics.stage("dedupe"):
+        result[result_key] = remove_redundant_data(records, dedupe, kind, url)
+    
+    if tracker is not None:
+        with metrics.stage("diff"):
+            result["changes"] = tracker.record(url, result, body_hash, content_hash, previous)
+    
+    return result
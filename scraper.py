@@ -1,18 +1,19 @@
-import requests
-from bs4 import BeautifulSoup
+from fetcher import TieredFetcher
+from http_cache import get_response_cache
+from politeness import get_politeness
+from resilience import get_resilience
+from parsers import make_soup
 
-def get_html_content(url):
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/88.0.4324.150 Safari/537.36'
-    }
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.content
+def get_html_content(url, force_refresh=False):
+    fetcher = TieredFetcher(cache=get_response_cache(), politeness=get_politeness(), resilience=get_resilience())
+    page = fetcher.fetch_http(url, force_refresh)
+    if page["status"] == 200:
+        return page["html"]
     else:
         return None  
 
-def parse_html(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
+def parse_html(html_content, parser=None):
+    soup = make_soup(html_content, parser)
     data = []
 
     for p_tag in soup.find_all('p'):
@@ -1,9 +1,22 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor
+import atexit
+import re
+import threading
 import time
+from driver_pool import DriverPool
+from page_wait import wait_for_page_ready
+from fetcher import TieredFetcher, USER_AGENT
+from http_cache import get_response_cache
+from politeness import get_politeness
+from resilience import get_resilience
+from resource_policy import BLOCK_IMAGES, NO_IMAGES_PREFS, policy_for
+from parsers import make_soup
+from dedupe import DedupeIndex
+import metrics
 
 
 def setup_selenium_driver():
@@ -11,25 +24,81 @@ def setup_selenium_driver():
     chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument(f"--user-agent={USER_AGENT}")
+    if BLOCK_IMAGES:
+        chrome_options.add_experimental_option("prefs", NO_IMAGES_PREFS)
     service = Service("C:\\Users\\user\\Desktop\\Python\\chromedriver.exe")  # Adjust path as needed
     driver = webdriver.Chrome(service=service, options=chrome_options)
     return driver
 
 
-def get_html_content_selenium(url, driver):
-    driver.get(url)
-    time.sleep(2)  # wait for content to load
-    return driver.page_source
+_default_pool = None
+_default_pool_lock = threading.Lock()
 
 
-def parse_html(html_content, base_url):
-    from urllib.parse import urljoin
-    soup = BeautifulSoup(html_content, 'html.parser')
+def get_driver_pool(max_size=3, max_pages=50):
+    """Return the process-wide WebDriver pool, creating it on first use."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = DriverPool(setup_selenium_driver, max_size=max_size, max_pages=max_pages)
+            atexit.register(_default_pool.close)
+        return _default_pool
 
-    # Clean soup by removing all non-content tags
-    for tag in soup(["script", "style", "svg", "noscript", "meta", "link", "footer", "header"]):
-        tag.decompose()
 
+def get_html_content_selenium(url, driver, wait_selector=None, timeout=20):
+    start = time.monotonic()
+    driver.set_page_load_timeout(timeout)
+    with metrics.stage("driver_get"):
+        driver.get(url)
+    # wait until the page is complete and the DOM has settled
+    with metrics.stage("page_wait"):
+        wait_for_page_ready(driver, timeout=max(0, timeout - (time.monotonic() - start)), selector=wait_selector)
+    with metrics.stage("page_source"):
+        return driver.page_source
+
+
+def get_fetcher(pool=None):
+    """Return a fetcher that tries plain HTTP before a pooled browser."""
+    policy = policy_for("job_listing")
+
+    def fetch_with_browser(url, wait_selector=None):
+        with (pool or get_driver_pool()).lease() as driver:
+            with metrics.stage("resource_policy"):
+                policy.apply(driver)
+            return get_html_content_selenium(url, driver, wait_selector)
+
+    return TieredFetcher(
+        browser_fetch=fetch_with_browser, cache=get_response_cache(),
+        politeness=get_politeness(), resilience=get_resilience(),
+    )
+
+
+# Non-content tags; cut from the markup before parsing where possible
+NON_CONTENT_TAGS = ("script", "style", "svg", "noscript", "meta", "link", "footer", "header")
+# The subset that cannot hold a rel="next" link, for pages still searched for one
+NO_LINK_TAGS = ("script", "style", "svg", "noscript", "meta")
+
+
+def parse_html(html_content, base_url, parser=None):
+    with metrics.stage("parse"):
+        soup = make_soup(html_content, parser, drop=NON_CONTENT_TAGS)
+    return parse_soup(soup, base_url)
+
+
+def parse_soup(soup, base_url):
+    # Clean soup by removing all non-content tags the parser still built
+    with metrics.stage("decompose"):
+        for tag in soup(NON_CONTENT_TAGS):
+            tag.decompose()
+    if metrics.current() is not None:
+        metrics.add(dom_nodes=len(soup.find_all(True)))
+
+    with metrics.stage("extract"):
+        return _extract_jobs(soup, base_url)
+
+
+def _extract_jobs(soup, base_url):
     data = []
     job_cards = []
 
@@ -66,32 +135,165 @@ def parse_html(html_content, base_url):
 
 
 
-def scrape_paginated_jobs(base_url, max_pages=5):
-    driver = setup_selenium_driver()
-    all_data = []
+_NEXT_TEXT = re.compile(r"^\s*(next|next page|older|more|›|»|>|→)\s*[›»>→]?\s*$", re.IGNORECASE)
 
-    for page_num in range(1, max_pages + 1):
-        if "?page=" in base_url:
-            url = base_url.split("?page=")[0] + f"?page={page_num}"
-        else:
-            url = f"{base_url}?page={page_num}"
 
+def find_next_page_url(soup, current_url):
+    """Find the URL of the next page from rel="next" or a "Next" style link."""
+    link = soup.find(["link", "a"], rel=lambda x: x and "next" in x, href=True)
+    if link is None:
+        for a in soup.find_all("a", href=True):
+            label = a.get("aria-label", "") or a.get("title", "")
+            classes = " ".join(a.get("class", [])).lower()
+            if _NEXT_TEXT.match(a.get_text()) or "next" in label.lower() or "next" in classes.split():
+                link = a
+                break
+    if link is None:
+        return None
+    href = link["href"].strip()
+    if not href or href.startswith(("#", "javascript:")):
+        return None
+    return urljoin(current_url, href)
+
+
+def page_url(base_url, page_num):
+    """Build the ?page= URL for a page number."""
+    if "?page=" in base_url:
+        return base_url.split("?page=")[0] + f"?page={page_num}"
+    return f"{base_url}?page={page_num}"
+
+
+def scrape_paginated_jobs(base_url, max_pages=5, pool=None, wait_selector=None, window=3, follow_next=False,
+                          dedupe=None, store=None):
+    """Scrape a paginated job board, fetching up to ``window`` pages ahead.
+
+    Pages are fetched in parallel but returned in order; the first page without
+    jobs ends the run and any pages fetched beyond it are discarded. With
+    ``follow_next`` the next page is discovered from the page's "Next" link
+    instead of rewriting ``?page=``.
+
+    Jobs repeated on later pages, reworded or not, are dropped with a
+    ``DedupeIndex``; pass a persistent one to also skip jobs from earlier runs.
+    A page with nothing new ends the run, as boards often repeat their last
+    page for out-of-range page numbers. With a ``ResultsStore`` each page's
+    new jobs are upserted into it as soon as the page is done.
+
+    Stage timings of every page, including those fetched in worker threads,
+    go to the collector of an enclosing ``metrics.collect()`` block.
+    """
+    fetcher = get_fetcher(pool)
+    if dedupe is None:
+        dedupe = DedupeIndex()
+    executor = ThreadPoolExecutor(max_workers=max(1, window), thread_name_prefix="paginate")
+
+    def fetch(url):
         print(f"Scraping: {url}")
-        html_content = get_html_content_selenium(url, driver)
-        jobs = parse_html(html_content, base_url)
+        with metrics.stage("fetch"):
+            page = fetcher.fetch(url, force_browser=bool(wait_selector), wait_selector=wait_selector)
+        return page["html"]
+
+    try:
+        if follow_next:
+            return _scrape_following_next(base_url, max_pages, executor, fetch, dedupe, store)
+        return _scrape_page_window(base_url, max_pages, window, executor, fetch, dedupe, store)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _scrape_page_window(base_url, max_pages, window, executor, fetch, dedupe, store):
+    all_data = []
+    pending = {}
 
+    def schedule(page_num):
+        if page_num <= max_pages and page_num not in pending:
+            pending[page_num] = executor.submit(metrics.bind(_fetch_and_parse), fetch, page_url(base_url, page_num), base_url)
+
+    for page_num in range(1, min(window, max_pages) + 1):
+        schedule(page_num)
+
+    for page_num in range(1, max_pages + 1):
+        jobs = pending.pop(page_num).result()
+        if jobs is None:
+            print(f"Failed to retrieve page {page_num}, stopping.")
+            break
         if not jobs:
             print("No more jobs found, stopping.")
             break
+        url = page_url(base_url, page_num)
+        jobs = dedupe.filter(jobs, "job", url)
+        if not jobs:
+            print("No new jobs found, stopping.")
+            break
+        _store_jobs(store, jobs, url)
+        all_data.extend(jobs)
+        schedule(page_num + window)
 
+    # Drop speculative pages past the last one with jobs
+    for future in pending.values():
+        future.cancel()
+    return all_data
+
+
+def _scrape_following_next(base_url, max_pages, executor, fetch, dedupe, store):
+    all_data = []
+    seen = {base_url}
+    url = base_url
+    future = executor.submit(metrics.bind(fetch), url)
+
+    for page_num in range(1, max_pages + 1):
+        html_content = future.result()
+        if not html_content:
+            print(f"Failed to retrieve {url}, stopping.")
+            break
+
+        with metrics.stage("parse"):
+            soup = make_soup(html_content, drop=NO_LINK_TAGS)
+        # Start fetching the next page while this one is parsed
+        next_url = find_next_page_url(soup, url)
+        future = None
+        if page_num < max_pages and next_url and next_url not in seen:
+            seen.add(next_url)
+            future = executor.submit(metrics.bind(fetch), next_url)
+
+        jobs = parse_soup(soup, base_url)
+        if not jobs:
+            print("No more jobs found, stopping.")
+            break
+        jobs = dedupe.filter(jobs, "job", url)
+        if not jobs:
+            print("No new jobs found, stopping.")
+            break
+        _store_jobs(store, jobs, url)
         all_data.extend(jobs)
 
-    driver.quit()
+        if future is None:
+            break
+        url = next_url
+
+    if future is not None:
+        future.cancel()
     return all_data
 
 
+def _store_jobs(store, jobs, url):
+    if store is not None:
+        with metrics.stage("store"):
+            store.save_records("job", jobs, url)
+
+
+def _fetch_and_parse(fetch, url, base_url):
+    """Fetch and parse one page, returning None if the fetch failed."""
+    html_content = fetch(url)
+    if not html_content:
+        return None
+    return parse_html(html_content, base_url)
+
+
 if __name__ == "__main__":
     url = 'https://example.com/jobs'  # Change to your target site
-    jobs = scrape_paginated_jobs(url, max_pages=3)
+    with metrics.collect() as collector:
+        jobs = scrape_paginated_jobs(url, max_pages=3)
     for job in jobs:
         print(job)
+    if collector is not None:
+        print(metrics.to_json(collector.as_dict()))
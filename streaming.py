@@ -0,0 +1,347 @@
+import codecs
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+from bs4.dammit import EncodingDetector
+
+from dom_index import BUCKETS, JOB_FIELDS, PRODUCT_FIELDS, ARTICLE_FIELDS
+from fetcher import get_http_session, HTTP_TIMEOUT
+
+CHUNK_SIZE = 64 * 1024
+
+# Elements that never have an end tag
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+}
+# Elements whose text is never part of the extracted data
+SKIPPED_ELEMENTS = {"script", "style", "noscript", "template", "svg"}
+
+# Listing kind -> (container bucket, field specs)
+LISTING_KINDS = {
+    "job": ("job", JOB_FIELDS),
+    "product": ("product", PRODUCT_FIELDS),
+    "article": ("article_container", ARTICLE_FIELDS),
+}
+
+
+def _clean(text):
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _stream_encoding(response, first_chunk):
+    """The charset of a streamed page: the Content-Type's, a byte-order mark, ``<meta charset>``, else UTF-8.
+
+    requests reports ISO-8859-1 for any text/html without a charset, so its
+    ``encoding`` is only trusted when the header names one.
+    """
+    candidates = []
+    if "charset" in response.headers.get("Content-Type", "").lower():
+        candidates.append(response.encoding)
+    candidates.append(EncodingDetector.strip_byte_order_mark(first_chunk)[1])
+    candidates.append(EncodingDetector.find_declared_encoding(first_chunk, is_html=True))
+    for encoding in candidates:
+        if encoding:
+            try:
+                return codecs.lookup(encoding).name
+            except LookupError:
+                continue
+    return "utf-8"
+
+
+def iter_url_chunks(url, chunk_size=CHUNK_SIZE, session=None):
+    """Download a page as decoded text chunks without holding the whole body."""
+    session = session or get_http_session()
+    with session.get(url, stream=True, timeout=HTTP_TIMEOUT) as response:
+        response.raise_for_status()
+        decoder = None
+        for chunk in response.iter_content(chunk_size):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(_stream_encoding(response, chunk))(errors="replace")
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True) if decoder is not None else ""
+        if tail:
+            yield tail
+
+
+def iter_file_chunks(path, chunk_size=CHUNK_SIZE, encoding="utf-8"):
+    """Read a local HTML file as text chunks."""
+    with open(path, encoding=encoding, errors="replace") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def chunked(records, size=1000):
+    """Group a record stream into lists of at most ``size`` for chunked writes."""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _StreamParser(HTMLParser):
+    """Base incremental parser that hands finished records to ``self.ready``."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.ready = []
+        self.skip_depth = 0
+
+    def feed_chunks(self, chunks):
+        """Feed text chunks and yield records as soon as they are complete."""
+        for chunk in chunks:
+            if isinstance(chunk, bytes):
+                chunk = chunk.decode("utf-8", errors="replace")
+            self.feed(chunk)
+            if self.ready:
+                yield from self.ready
+                self.ready = []
+        self.close()
+        yield from self.ready
+        self.ready = []
+
+
+class _TableParser(_StreamParser):
+    """Emit ``(table_index, row)`` pairs with the same row shape as extract_table_data."""
+
+    def __init__(self):
+        super().__init__()
+        self.tables = []
+        self.table_count = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_ELEMENTS:
+            self.skip_depth += 1
+            return
+        if tag == "table":
+            self.tables.append({"index": self.table_count, "headers": None, "row": None, "cell": None})
+            self.table_count += 1
+            return
+        if not self.tables:
+            return
+        table = self.tables[-1]
+        if tag == "tr":
+            self._end_row(table)
+            table["row"] = []
+        elif tag in ("td", "th"):
+            self._end_cell(table)
+            if table["row"] is None:
+                table["row"] = []
+            table["cell"] = []
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_ELEMENTS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if not self.tables:
+            return
+        table = self.tables[-1]
+        if tag in ("td", "th"):
+            self._end_cell(table)
+        elif tag == "tr":
+            self._end_row(table)
+        elif tag == "table":
+            self._end_row(table)
+            self.tables.pop()
+
+    def handle_data(self, data):
+        if self.tables and not self.skip_depth:
+            cell = self.tables[-1]["cell"]
+            if cell is not None:
+                cell.append(data)
+
+    def close(self):
+        super().close()
+        while self.tables:
+            self._end_row(self.tables.pop())
+
+    def _end_cell(self, table):
+        if table["cell"] is not None:
+            table["row"].append(_clean("".join(table["cell"])))
+            table["cell"] = None
+
+    def _end_row(self, table):
+        self._end_cell(table)
+        cells, table["row"] = table["row"], None
+        if cells is None:
+            return
+        # The first row of every table provides the headers
+        if table["headers"] is None:
+            table["headers"] = cells
+            if cells:
+                return
+        headers = table["headers"]
+        if cells:
+            if headers and len(headers) == len(cells):
+                self.ready.append((table["index"], dict(zip(headers, cells))))
+            else:
+                self.ready.append((table["index"], {"cells": cells}))
+
+
+class _ListingParser(_StreamParser):
+    """Emit listing records for one container bucket as each container closes."""
+
+    def __init__(self, kind, base_url):
+        super().__init__()
+        bucket, self.specs = LISTING_KINDS[kind]
+        self.container_names, self.container_terms = BUCKETS[bucket]
+        self.kind = kind
+        self.base_url = base_url
+        # One context per open container; nested containers each get their own
+        self.contexts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_ELEMENTS:
+            self.skip_depth += 1
+            return
+        attrs = dict(attrs)
+        class_key = (attrs.get("class") or "").lower()
+        void = tag in VOID_ELEMENTS
+
+        for context in self.contexts:
+            # Match pending fields in document order, like container.find
+            fields = context["fields"]
+            for field, (names, terms, required) in self.specs.items():
+                if field in fields or tag not in names:
+                    continue
+                if required is not None and attrs.get(required) is None:
+                    continue
+                if terms is not None and not any(term in class_key for term in terms):
+                    continue
+                entry = {"attrs": attrs, "text": [], "depth": len(context["stack"])}
+                fields[field] = entry
+                if not void:
+                    context["capturing"].append(entry)
+            if not void:
+                context["stack"].append(tag)
+
+        if not void and tag in self.container_names and any(term in class_key for term in self.container_terms):
+            self.contexts.append({"stack": [tag], "fields": {}, "capturing": []})
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_ELEMENTS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        finished = []
+        for context in self.contexts:
+            stack = context["stack"]
+            if tag not in stack:
+                continue
+            # Close everything up to the matching open tag, as browsers do
+            while stack.pop() != tag:
+                pass
+            depth = len(stack)
+            context["capturing"] = [entry for entry in context["capturing"] if entry["depth"] < depth]
+            if not stack:
+                finished.append(context)
+        for context in finished:
+            self.contexts.remove(context)
+            record = self._build_record(context["fields"])
+            if record is not None:
+                self.ready.append(record)
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        for context in self.contexts:
+            for entry in context["capturing"]:
+                entry["text"].append(data)
+
+    def close(self):
+        super().close()
+        # Containers left open at the end of the document still count
+        for context in reversed(self.contexts):
+            record = self._build_record(context["fields"])
+            if record is not None:
+                self.ready.append(record)
+        self.contexts = []
+
+    def _text(self, fields, *names):
+        for name in names:
+            entry = fields.get(name)
+            if entry is not None:
+                return _clean("".join(entry["text"]))
+        return ""
+
+    def _link(self, fields):
+        entry = fields.get("link")
+        return urljoin(self.base_url, entry["attrs"]["href"]) if entry else ""
+
+    def _build_record(self, fields):
+        """Build the same record shape as the matching extract_* function."""
+        text = lambda *names: self._text(fields, *names)
+        if self.kind == "job":
+            title = text("title", "any_heading")
+            link = fields.get("link")
+            if title or (link and link["attrs"].get("href")):
+                return {
+                    "title": title,
+                    "company": text("company"),
+                    "location": text("location"),
+                    "description": text("description"),
+                    "link": self._link(fields),
+                }
+        elif self.kind == "product":
+            name = text("name", "any_heading")
+            image = fields["image"]["attrs"].get("src") if "image" in fields else ""
+            if name or image:
+                product = {"name": name, "price": text("price"), "link": self._link(fields)}
+                if image and not image.startswith("data:"):
+                    product["image_url"] = urljoin(self.base_url, image)
+                return product
+        else:
+            title = text("title", "any_heading")
+            summary = text("summary", "any_paragraph")
+            if title or summary:
+                has_title = "title" in fields or "any_heading" in fields
+                return {
+                    "title": title,
+                    "summary": summary,
+                    "date": text("date"),
+                    "author": text("author"),
+                    "link": self._link(fields) if has_title else "",
+                }
+        return None
+
+
+def iter_table_rows(chunks):
+    """Yield ``(table_index, row)`` for every table row in a stream of HTML chunks.
+
+    Rows have the same shape as in ``extract_table_data``: a dict keyed by the
+    table's first-row headers, or ``{"cells": [...]}`` when the lengths differ.
+    Rows of a nested table belong to the nested table only. Memory use depends
+    on the chunk size and the largest single row, not on the document size.
+    """
+    return _TableParser().feed_chunks(chunks)
+
+
+def iter_listing_records(chunks, base_url, kind="job"):
+    """Yield job, product or article records from a stream of HTML chunks.
+
+    Containers are found with the same class keywords as the DOM extractors
+    and each one is emitted as soon as it closes, so only the open containers
+    are held in memory and nested containers come out before their parents.
+    The generic fallback containers of the DOM extractors are not used, since
+    they depend on whether the whole page had any match.
+    """
+    return _ListingParser(kind, base_url).feed_chunks(chunks)
+
+
+def stream_table_rows(url, chunk_size=CHUNK_SIZE):
+    """Stream every table row of a page straight from the network."""
+    return iter_table_rows(iter_url_chunks(url, chunk_size))
+
+
+def stream_listing_records(url, kind="job", chunk_size=CHUNK_SIZE):
+    """Stream job, product or article records of a page straight from the network."""
+    return iter_listing_records(iter_url_chunks(url, chunk_size), url, kind)
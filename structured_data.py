@@ -0,0 +1,385 @@
+"""Schema.org structured data read straight from the raw HTML.
+
+JSON-LD blocks are found with a regular expression and microdata with a
+small ``html.parser`` pass, so neither needs the BeautifulSoup tree. When
+the structured data describes the page's listing, ``structured_listing``
+maps it into the record shapes of the ``extract_*`` functions and the DOM
+extractors can be skipped.
+"""
+import html
+import json
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+from parsers import decode_html
+
+_LD_JSON = re.compile(
+    r"<script\b[^>]*\btype\s*=\s*[\"']?application/ld\+json\b[^>]*>(.*?)</script\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+_TITLE = re.compile(r"<title\b[^>]*>(.*?)</title\s*>", re.IGNORECASE | re.DOTALL)
+_TAGS = re.compile(r"<[^>]+>")
+_SPACES = re.compile(r"\s+")
+# Some sites wrap JSON-LD in an HTML comment or CDATA section
+_WRAPPER = re.compile(r"^\s*(?:<!--|/\*\s*<!\[CDATA\[\s*\*/|<!\[CDATA\[)|(?:-->|/\*\s*\]\]>\s*\*/|\]\]>)\s*$")
+
+# schema.org type -> content type of the records it describes
+TYPE_CONTENT = {
+    "JobPosting": "job_listing",
+    "Product": "product",
+    "ProductGroup": "product",
+    "IndividualProduct": "product",
+    "Offer": "product",
+    "AggregateOffer": "product",
+    "Article": "article",
+    "NewsArticle": "article",
+    "BlogPosting": "article",
+    "TechArticle": "article",
+    "ScholarlyArticle": "article",
+    "Report": "article",
+}
+
+# Attributes that hold a microdata property's value, by tag
+_VALUE_ATTRIBUTES = {
+    "meta": "content", "a": "href", "link": "href", "area": "href", "img": "src", "audio": "src",
+    "video": "src", "source": "src", "iframe": "src", "embed": "src", "object": "data",
+    "time": "datetime", "data": "value", "meter": "value",
+}
+_VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+def page_title(markup):
+    """The ``<title>`` text, as ``soup.title.get_text()`` would return it."""
+    match = _TITLE.search(decode_html(markup))
+    return html.unescape(match.group(1)) if match else ""
+
+
+def _text(value):
+    """Plain text of a JSON-LD value; descriptions often carry escaped HTML."""
+    if isinstance(value, list):
+        value = value[0] if value else ""
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("@value") or ""
+    if not isinstance(value, str):
+        return "" if value is None else str(value)
+    if "<" in value or "&" in value:
+        value = html.unescape(_TAGS.sub(" ", html.unescape(value)))
+    return _SPACES.sub(" ", value).strip()
+
+
+def _types(item):
+    types = item.get("@type") or ()
+    if isinstance(types, str):
+        types = (types,)
+    # Full IRIs ("https://schema.org/Product") count like bare names
+    return [str(name).rsplit("/", 1)[-1] for name in types]
+
+
+def _read_json_ld(block):
+    block = _WRAPPER.sub("", block.strip())
+    try:
+        return json.loads(block)
+    except ValueError:
+        # Raw control characters inside strings are a common publisher mistake
+        try:
+            return json.loads(block, strict=False)
+        except ValueError:
+            return None
+
+
+class _MicrodataParser(HTMLParser):
+    """Collect top-level microdata items as JSON-LD style dicts."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.items = []
+        # Open elements: (tag, item opened here or None, property capturing text or None)
+        self._open = []
+        self._items = []
+        self._captures = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        props = (attrs.get("itemprop") or "").split()
+        item = None
+        if "itemscope" in attrs:
+            item = {}
+            itemtype = attrs.get("itemtype")
+            if itemtype:
+                item["@type"] = [name.rsplit("/", 1)[-1] for name in itemtype.split()]
+                if len(item["@type"]) == 1:
+                    item["@type"] = item["@type"][0]
+            if props and self._items:
+                for prop in props:
+                    self._add(self._items[-1], prop, item)
+            elif not self._items:
+                self.items.append(item)
+            self._items.append(item)
+        capture = None
+        if props and item is None and self._items:
+            attribute = _VALUE_ATTRIBUTES.get(tag)
+            if attribute and attrs.get(attribute) is not None:
+                for prop in props:
+                    self._add(self._items[-1], prop, attrs[attribute])
+            elif tag not in _VOID:
+                capture = (self._items[-1], props, [])
+                self._captures.append(capture)
+        if tag in _VOID:
+            if item is not None:
+                self._items.pop()
+            return
+        self._open.append((tag, item, capture))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        # Close up to the matching element; unclosed children end with it
+        if not any(name == tag for name, _, _ in self._open):
+            return
+        while self._open:
+            name, item, capture = self._open.pop()
+            if item is not None:
+                self._items.pop()
+            if capture is not None:
+                self._captures.remove(capture)
+                owner, props, chunks = capture
+                for prop in props:
+                    self._add(owner, prop, _SPACES.sub(" ", "".join(chunks)).strip())
+            if name == tag:
+                break
+
+    def handle_data(self, data):
+        for _, _, chunks in self._captures:
+            chunks.append(data)
+
+    @staticmethod
+    def _add(item, prop, value):
+        if prop not in item:
+            item[prop] = value
+        elif isinstance(item[prop], list):
+            item[prop].append(value)
+        else:
+            item[prop] = [item[prop], value]
+
+
+def extract_structured_data(markup):
+    """Return the page's JSON-LD blocks and microdata items, or None if it has none."""
+    markup = decode_html(markup)
+    data = []
+    for block in _LD_JSON.findall(markup):
+        parsed = _read_json_ld(block)
+        if parsed:
+            data.append(parsed)
+    start = markup.find("itemscope")
+    if start != -1:
+        parser = _MicrodataParser()
+        # Nothing before the first item's tag can belong to an item
+        parser.feed(markup[max(0, markup.rfind("<", 0, start)):])
+        parser.close()
+        data.extend(item for item in parser.items if item)
+    return data or None
+
+
+def _walk(value, in_list=False):
+    """Yield ``(item, came from an ItemList)`` for every typed item, flattening @graph and lists."""
+    if isinstance(value, list):
+        for entry in value:
+            yield from _walk(entry, in_list)
+        return
+    if not isinstance(value, dict):
+        return
+    if "@graph" in value:
+        yield from _walk(value["@graph"], in_list)
+    types = _types(value)
+    if "ItemList" in types or "OfferCatalog" in types:
+        for element in _as_list(value.get("itemListElement")):
+            if isinstance(element, dict) and "ListItem" in _types(element) and isinstance(element.get("item"), dict):
+                element = element["item"]
+            yield from _walk(element, True)
+        return
+    if types:
+        yield value, in_list
+    # A WebPage or CollectionPage wraps the page's actual content
+    if "mainEntity" in value:
+        yield from _walk(value["mainEntity"], in_list)
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _url(value, base_url):
+    value = _text(value.get("@id") if isinstance(value, dict) else value)
+    return urljoin(base_url, value) if value else ""
+
+
+def _names(value):
+    return ", ".join(name for name in (_text(entry) for entry in _as_list(value)) if name)
+
+
+def _location(value):
+    places = []
+    for place in _as_list(value):
+        if not isinstance(place, dict):
+            places.append(_text(place))
+            continue
+        address = place.get("address")
+        if isinstance(address, dict):
+            parts = [_text(address.get(key)) for key in ("addressLocality", "addressRegion", "addressCountry")]
+            places.append(", ".join(part for part in parts if part))
+        else:
+            places.append(_text(address) or _text(place.get("name")))
+    return "; ".join(place for place in places if place)
+
+
+def job_from_schema(item, base_url):
+    """Map a JobPosting to the shape of ``job_record``."""
+    title = _text(item.get("title") or item.get("name"))
+    link = _url(item.get("url") or item.get("sameAs"), base_url)
+    if not title and not link:
+        return None
+    location = _location(item.get("jobLocation"))
+    if not location and _text(item.get("jobLocationType")).upper() == "TELECOMMUTE":
+        location = "Remote"
+    return {
+        "title": title,
+        "company": _names(item.get("hiringOrganization")),
+        "location": location,
+        "description": _text(item.get("description")),
+        "link": link,
+    }
+
+
+def _price(offers):
+    for offer in _as_list(offers):
+        if not isinstance(offer, dict):
+            continue
+        price = offer.get("price", offer.get("lowPrice"))
+        if price is None and isinstance(offer.get("priceSpecification"), dict):
+            price = offer["priceSpecification"].get("price")
+        if price is not None:
+            currency = _text(offer.get("priceCurrency"))
+            return f"{_text(price)} {currency}".strip()
+    return ""
+
+
+def product_from_schema(item, base_url):
+    """Map a Product, or an Offer with its itemOffered, to the shape of ``product_record``."""
+    types = _types(item)
+    offers = item.get("offers")
+    if ("Offer" in types or "AggregateOffer" in types) and isinstance(item.get("itemOffered"), dict):
+        offers, item = item, item["itemOffered"]
+    elif "Offer" in types or "AggregateOffer" in types:
+        offers = item
+    name = _text(item.get("name"))
+    image = item.get("image")
+    if isinstance(image, list):
+        image = image[0] if image else None
+    if isinstance(image, dict):
+        image = image.get("url") or image.get("contentUrl")
+    image = _text(image)
+    if not name and not image:
+        return None
+    product = {
+        "name": name,
+        "price": _price(offers),
+        "link": _url(item.get("url") or (offers.get("url") if isinstance(offers, dict) else None), base_url),
+    }
+    if image and not image.startswith("data:"):
+        product["image_url"] = urljoin(base_url, image)
+    return product
+
+
+def article_from_schema(item, base_url):
+    """Map an Article (or NewsArticle, BlogPosting...) to the shape of ``article_record``."""
+    title = _text(item.get("headline") or item.get("name"))
+    summary = _text(item.get("description") or item.get("abstract"))
+    if not title and not summary:
+        return None
+    return {
+        "title": title,
+        "summary": summary,
+        "date": _text(item.get("datePublished") or item.get("dateCreated")),
+        "author": _names(item.get("author")),
+        "link": _url(item.get("url") or item.get("mainEntityOfPage"), base_url),
+    }
+
+
+def _same_page(link, url):
+    return link.split("#")[0].rstrip("/") == url.split("#")[0].rstrip("/")
+
+
+RECORD_MAPPERS = {
+    "job_listing": job_from_schema,
+    "product": product_from_schema,
+    "article": article_from_schema,
+}
+
+
+def structured_listing(data, base_url):
+    """Return ``(content_type, records)`` when the structured data covers the page, else None.
+
+    It covers the page when every listing item in it is of one kind and
+    they came from an ``ItemList``, there are several of them, or the single
+    one describes the page itself. A lone Product promoted on a category
+    page fails the last test, so the DOM extractors still see that page.
+    Whether the items are all of the page's cards is up to the caller (see
+    ``merge_listing``).
+    """
+    found = {}
+    listed = False
+    for item, in_list in _walk(data):
+        content_type = next((TYPE_CONTENT[name] for name in _types(item) if name in TYPE_CONTENT), None)
+        if content_type is not None:
+            found.setdefault(content_type, []).append(item)
+            listed = listed or in_list
+    if len(found) != 1:
+        return None
+    (content_type, items), = found.items()
+    mapper = RECORD_MAPPERS[content_type]
+    records = [record for record in (mapper(item, base_url) for item in items) if record]
+    if not records:
+        return None
+    if len(records) == 1 and not listed and records[0]["link"] and not _same_page(records[0]["link"], base_url):
+        return None
+    return content_type, records
+
+
+def _link_key(record):
+    return (record.get("link") or "").split("#")[0].rstrip("/")
+
+
+def _name_key(record):
+    return (record.get("title") or record.get("name") or "").strip().lower()
+
+
+def merge_listing(structured, extracted):
+    """Return the structured records followed by the extracted ones they do not cover.
+
+    For pages whose structured data lists only some of the cards. An
+    extracted record is covered by a structured one with the same link, or
+    with the same title (or name) when one of the two has no link.
+    """
+    links = set()
+    names = {}
+    for record in structured:
+        link = _link_key(record)
+        if link:
+            links.add(link)
+        names.setdefault(_name_key(record), set()).add(link)
+    merged = list(structured)
+    for record in extracted:
+        link = _link_key(record)
+        if link and link in links:
+            continue
+        same_name = names.get(_name_key(record)) if _name_key(record) else None
+        if same_name is not None and (not link or "" in same_name):
+            continue
+        merged.append(record)
+    return merged
@@ -0,0 +1,289 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from bs4.element import Tag
+
+DEFAULT_TEMPLATES_PATH = os.environ.get(
+    "SCRAPER_TEMPLATES_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "ai_web_scraper", "templates.sqlite"),
+)
+# Share of the heuristic matches a template must reproduce to be used
+MIN_CONFIDENCE = 0.9
+# A page yielding less than this share of the usual record count is re-checked
+MIN_YIELD = 0.5
+# Every this many template uses the heuristics run too, to catch silent drift
+AUDIT_EVERY = 25
+# Weight of the newest page in the running record count
+YIELD_SMOOTHING = 0.2
+
+_IDENTIFIER = re.compile(r"^-?[_a-zA-Z][_a-zA-Z0-9-]*$")
+# Path segments that vary between pages of one kind: ids, page numbers, hashes
+_VARIABLE_SEGMENT = re.compile(r"\d|^[0-9a-f]{16,}$", re.IGNORECASE)
+
+
+def template_key(url):
+    """Key pages of one kind on one site: host plus path with variable segments masked.
+
+    ``/jobs?page=2`` and ``/jobs`` share a key; ``/jobs/123`` and ``/jobs/456``
+    share another, so listing and detail pages learn separate templates.
+    """
+    parts = urlsplit(url)
+    segments = ["*" if _VARIABLE_SEGMENT.search(segment) else segment for segment in parts.path.split("/") if segment]
+    return f"{(parts.hostname or '').lower()}/{'/'.join(segments)}"
+
+
+def css_selector(tag):
+    """``tag.class1.class2`` for an element; classes that are not plain identifiers are left out."""
+    classes = tag.get("class") or []
+    if isinstance(classes, str):
+        classes = classes.split()
+    return tag.name + "".join(f".{name}" for name in classes if _IDENTIFIER.match(name))
+
+
+def _compile(selector):
+    name, *classes = selector.split(".")
+    return name, frozenset(classes)
+
+
+def _has_classes(tag, classes):
+    if not classes:
+        return True
+    present = tag.get("class") or ()
+    if isinstance(present, str):
+        present = present.split()
+    return classes.issubset(present)
+
+
+class Template:
+    """Concrete selectors for a listing: the container and each field inside it.
+
+    Selectors are ``tag.class1.class2`` strings as written by ``css_selector``;
+    they are matched directly rather than through a CSS engine, which would
+    cost more than the heuristics the template replaces.
+    """
+
+    def __init__(self, content_type, container, fields, confidence=1.0, expected=0.0, uses=0):
+        self.content_type = content_type
+        self.container = container
+        self.fields = fields
+        self.confidence = confidence
+        self.expected = expected
+        self.uses = uses
+        self._container = _compile(container)
+        # Tag name -> [(field, required classes)], so most tags are skipped with one lookup
+        self._fields_by_name = {}
+        for field, selector in fields.items():
+            if selector:
+                name, classes = _compile(selector)
+                self._fields_by_name.setdefault(name, []).append((field, classes))
+
+    def match(self, soup):
+        """Return ``(container, field elements)`` pairs, like the heuristic matchers."""
+        name, classes = self._container
+        return [
+            (container, self._match_fields(container))
+            for container in soup.find_all(name)
+            if _has_classes(container, classes)
+        ]
+
+    def _match_fields(self, container):
+        # First descendant matching each field, in one pass like find_fields
+        found = dict.fromkeys(self.fields)
+        by_name = self._fields_by_name
+        remaining = sum(len(candidates) for candidates in by_name.values())
+        for tag in container.descendants:
+            candidates = by_name.get(tag.name)
+            if not candidates:
+                continue
+            for field, classes in candidates:
+                if found[field] is None and _has_classes(tag, classes):
+                    found[field] = tag
+                    remaining -= 1
+            if not remaining:
+                break
+        return found
+
+    def to_json(self):
+        return json.dumps({"container": self.container, "fields": self.fields})
+
+
+def learn_template(content_type, soup, matches, build, dedupe=None):
+    """Derive a template from the heuristic matches of one page.
+
+    ``matches`` are the ``(container, field elements)`` pairs the heuristics
+    found and ``build`` turns field elements into a record (or None). Only
+    outermost containers count: the heuristics also pick up parts of a card
+    (its header, say) whose records repeat the card's. The container selector
+    is the most common one among them, and each field takes its most common
+    selector within the chosen containers.
+
+    The template is then run on the same page. Its confidence is the share of
+    outermost containers it selects, times the share of those for which it
+    builds the same record as the heuristics did. A template whose records,
+    after ``dedupe`` (a function over a list of records), differ from the
+    heuristics' gets no confidence at all: using it would change the page's
+    result, and every audit would show up as a change.
+    """
+    valid = {id(container): (container, elems) for container, elems in matches if build(elems)}
+    if not valid:
+        return None
+    outermost = [
+        (container, elems) for container, elems in valid.values()
+        if not any(id(parent) in valid for parent in container.parents)
+    ]
+    container_selector, _ = Counter(css_selector(container) for container, _ in outermost).most_common(1)[0]
+    chosen = {id(container): elems for container, elems in outermost if css_selector(container) == container_selector}
+    fields = {}
+    for field in next(iter(chosen.values())):
+        selectors = Counter(css_selector(elems[field]) for elems in chosen.values() if isinstance(elems[field], Tag))
+        fields[field] = selectors.most_common(1)[0][0] if selectors else None
+
+    template = Template(content_type, container_selector, fields)
+    found = template.match(soup)
+    agreeing = sum(
+        1 for container, elems in found
+        if id(container) in chosen and build(elems) == build(chosen[id(container)])
+    )
+    template.confidence = agreeing / len(outermost)
+    records = [record for record in (build(elems) for _, elems in found) if record]
+    template.expected = float(len(records))
+    if dedupe is not None:
+        expected = [record for record in (build(elems) for _, elems in matches) if record]
+        if dedupe(records) != dedupe(expected):
+            template.confidence = 0.0
+    return template
+
+
+class TemplateStore:
+    """Learned extraction templates per site section, with confidence scores.
+
+    Templates are keyed by ``template_key`` and kept in SQLite, with an
+    in-memory copy in front that is reloaded when another process changes
+    the file, so lookups on a hot path cost a dict access and a version check.
+    ``lookup`` only returns templates whose confidence reached
+    ``MIN_CONFIDENCE``; ``accept`` checks a template's yield on a page and
+    says when the heuristics should run again instead.
+    """
+
+    def __init__(self, path=DEFAULT_TEMPLATES_PATH, min_confidence=MIN_CONFIDENCE):
+        self.path = path
+        self.min_confidence = min_confidence
+        self.counters = {"hits": 0, "misses": 0, "learned": 0, "rejected": 0, "relearned": 0}
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS templates (
+                key TEXT PRIMARY KEY,
+                content_type TEXT NOT NULL,
+                template TEXT NOT NULL,
+                confidence REAL NOT NULL,
+                expected REAL NOT NULL,
+                uses INTEGER NOT NULL,
+                learned_at REAL NOT NULL
+            )"""
+        )
+        self._templates = {}
+        self._version = None
+        self._reload()
+
+    def _reload(self):
+        # data_version changes whenever another connection (a parse worker, say) commits
+        version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._version:
+            return
+        self._version = version
+        templates = {}
+        for key, content_type, data, confidence, expected, uses, _ in self._db.execute("SELECT * FROM templates"):
+            data = json.loads(data)
+            templates[key] = Template(content_type, data["container"], data["fields"], confidence, expected, uses)
+        self._templates = templates
+
+    def lookup(self, url):
+        """Return the usable template for a URL's site section, or None.
+
+        Templates saved through another connection to the same file since the
+        last lookup are loaded first.
+        """
+        with self._lock:
+            self._reload()
+            template = self._templates.get(template_key(url))
+            if template is None or template.confidence < self.min_confidence:
+                self.counters["misses"] += 1
+                return None
+            if template.uses and template.uses % AUDIT_EVERY == 0:
+                # Let the heuristics run and re-learn now and then
+                template.uses += 1
+                self.counters["misses"] += 1
+                return None
+            return template
+
+    def accept(self, url, template, count):
+        """Record a template's yield on a page; False means fall back to the heuristics."""
+        with self._lock:
+            if count < max(1.0, template.expected * MIN_YIELD):
+                self.counters["rejected"] += 1
+                return False
+            template.uses += 1
+            template.expected += YIELD_SMOOTHING * (count - template.expected)
+            self.counters["hits"] += 1
+            self._db.execute(
+                "UPDATE templates SET uses = ?, expected = ? WHERE key = ?",
+                (template.uses, template.expected, template_key(url)),
+            )
+            return True
+
+    def save(self, url, template):
+        """Store a freshly learned template, replacing the section's previous one."""
+        key = template_key(url)
+        with self._lock:
+            previous = self._templates.get(key)
+            if previous is not None:
+                template.uses = previous.uses
+                self.counters["relearned"] += 1
+            self._templates[key] = template
+            self.counters["learned"] += 1
+            self._db.execute(
+                "INSERT OR REPLACE INTO templates VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, template.content_type, template.to_json(), template.confidence,
+                 template.expected, template.uses, time.time()),
+            )
+
+    def forget(self, url):
+        """Drop the template of a URL's site section."""
+        key = template_key(url)
+        with self._lock:
+            self._templates.pop(key, None)
+            self._db.execute("DELETE FROM templates WHERE key = ?", (key,))
+
+    def stats(self):
+        """Return the counters together with the number of stored and usable templates."""
+        with self._lock:
+            usable = sum(template.confidence >= self.min_confidence for template in self._templates.values())
+            return dict(self.counters, templates=len(self._templates), usable=usable)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_template_store():
+    """Return the process-wide template store, creating it on first use."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = TemplateStore()
+        return _default_store
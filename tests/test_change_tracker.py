@@ -0,0 +1,41 @@
+from change_tracker import ChangeTracker, content_fingerprint
+from scrape_core import scrape_html
+
+URL = "https://jobs.example.com/search"
+
+CARD = (
+    '<div class="job-card"><h3 class="job-title"><a href="/jobs/{n}">Engineer {n}</a></h3>'
+    '<span class="company">Company {n}</span><span class="location">Berlin</span></div>'
+)
+
+
+def page(main_cards, after_main=(), token="a1"):
+    cards = "".join(CARD.format(n=n) for n in main_cards)
+    extra = "".join(CARD.format(n=n) for n in after_main)
+    return (
+        f'<html><head><title>Jobs</title><script>var token = "{token}";</script></head>'
+        f"<body><main>{cards}</main>{extra}<!-- rendered at {token} --></body></html>"
+    )
+
+
+def test_script_and_comment_changes_leave_the_fingerprint_alone():
+    assert content_fingerprint(page(range(3), token="a1")) == content_fingerprint(page(range(3), token="b2"))
+
+
+def test_card_added_outside_main_is_a_change():
+    tracker = ChangeTracker(":memory:")
+    first = scrape_html(page(range(3)), URL, tracker=tracker)
+    assert len(first["jobs"]) == 3
+
+    second = scrape_html(page(range(3), after_main=[3], token="b2"), URL, tracker=tracker)
+    assert second["changes"]["status"] == "changed"
+    assert [job["title"] for job in second["jobs"]] == ["Engineer 0", "Engineer 1", "Engineer 2", "Engineer 3"]
+
+
+def test_unchanged_content_reuses_the_previous_result():
+    tracker = ChangeTracker(":memory:")
+    scrape_html(page(range(3)), URL, tracker=tracker)
+    again = scrape_html(page(range(3), token="b2"), URL, tracker=tracker)
+    assert again["changes"]["status"] == "unchanged"
+    assert again["changes"]["level"] == "content"
+    assert len(again["jobs"]) == 3
@@ -0,0 +1,52 @@
+from dedupe import DedupeIndex
+from scrape_core import remove_redundant_data, scrape_html
+
+URL = "https://jobs.example.com/search"
+
+CARD = (
+    '<div class="job-card"><div class="job-header"><h3 class="job-title"><a href="/jobs/{n}">{title}</a></h3></div>'
+    '<span class="company">{company}</span><span class="location">Berlin</span>'
+    '<p class="description">Build and run the data platform used by every team.</p></div>'
+)
+
+
+def job(title, company="Acme", link="https://jobs.example.com/jobs/1", **fields):
+    return dict({"title": title, "company": company, "location": "Berlin",
+                 "description": "Build and run the data platform.", "link": link}, **fields)
+
+
+def test_partial_copy_of_a_card_is_dropped():
+    full = job("Senior Data Engineer")
+    partial = job("Senior Data Engineer", company="", location="", description="")
+    assert remove_redundant_data([full, partial], kind="job") == [full]
+
+
+def test_repeated_title_is_dropped_case_insensitively():
+    first = job("Data Engineer")
+    again = job("DATA ENGINEER", company="Other", link="https://jobs.example.com/jobs/2")
+    assert remove_redundant_data([first, again], kind="job") == [first]
+
+
+def test_nested_header_does_not_add_a_partial_record():
+    cards = "".join(CARD.format(n=n, title=f"Engineer {n}", company=f"Company {n}") for n in range(3))
+    result = scrape_html(f"<html><body><main>{cards}</main></body></html>", URL)
+    assert [record["title"] for record in result["jobs"]] == ["Engineer 0", "Engineer 1", "Engineer 2"]
+    assert all(record["company"] for record in result["jobs"])
+
+
+def test_product_variants_are_kept():
+    variants = [
+        {"name": "Classic Tee - Red, Size M", "price": "$20", "link": "https://shop.example.com/p/1"},
+        {"name": "Classic Tee - Red, Size L", "price": "$20", "link": "https://shop.example.com/p/2"},
+    ]
+    assert remove_redundant_data(variants + variants[:1], kind="product") == variants
+
+
+def test_reworded_repost_is_a_near_duplicate():
+    index = DedupeIndex()
+    original = job("Senior Python Engineer", description="Build data pipelines in Python and SQL for our analytics team")
+    repost = job("Senior Python Engineer!", link="https://jobs.example.com/jobs/2",
+                 description="Build data pipelines in Python and SQL for our analytics team.")
+    assert index.filter([original], "job") == [original]
+    assert index.filter([repost], "job") == []
+    assert index.stats()["near"] == 1
@@ -0,0 +1,20 @@
+import pipeline
+from pipeline import get_parse_pool
+
+
+def test_pools_of_another_size_leave_the_shared_pool_running():
+    two = get_parse_pool(2)
+    one = get_parse_pool(1)
+    try:
+        assert get_parse_pool(2) is two
+        # Still accepts work after a pool of another size was requested
+        future = two.submit("<html><body><p>Still running</p></body></html>", "https://example.com/")
+        result, _ = future.result(timeout=60)
+        assert result["url"] == "https://example.com/"
+        assert one is not two
+    finally:
+        pipeline._close_pools()
+
+
+def test_zero_workers_means_no_pool():
+    assert get_parse_pool(0) is None
@@ -0,0 +1,54 @@
+import time
+
+import pytest
+
+from resilience import CircuitOpen, Resilience, RetryableStatus
+
+HOST = "jobs.example.com"
+
+
+def fail():
+    raise RetryableStatus(503)
+
+
+def refuse():
+    raise ValueError("Disallowed by robots.txt")
+
+
+def open_breaker(resilience):
+    for _ in range(resilience.failure_threshold):
+        with pytest.raises(RetryableStatus):
+            resilience.call(HOST, fail)
+    assert resilience.breaker(HOST).state == "open"
+
+
+def test_non_retryable_error_leaves_a_half_open_breaker_half_open():
+    resilience = Resilience(max_attempts=1, failure_threshold=2, reset_timeout=0.05)
+    open_breaker(resilience)
+    time.sleep(0.06)
+    assert resilience.breaker(HOST).state == "half-open"
+
+    with pytest.raises(ValueError):
+        resilience.call(HOST, refuse)
+    breaker = resilience.breaker(HOST)
+    assert breaker.state == "half-open"
+    assert breaker.failures == 2
+    # The trial slot was given back: the next request is let through as the trial
+    assert resilience.call(HOST, lambda: "ok") == "ok"
+    assert breaker.state == "closed"
+
+
+def test_non_retryable_error_keeps_the_failure_count():
+    resilience = Resilience(max_attempts=1, failure_threshold=3)
+    with pytest.raises(RetryableStatus):
+        resilience.call(HOST, fail)
+    with pytest.raises(ValueError):
+        resilience.call(HOST, refuse)
+    assert resilience.breaker(HOST).failures == 1
+
+
+def test_open_breaker_rejects_without_calling():
+    resilience = Resilience(max_attempts=1, failure_threshold=1, reset_timeout=60)
+    open_breaker(resilience)
+    with pytest.raises(CircuitOpen):
+        resilience.call(HOST, lambda: pytest.fail("called through an open breaker"))
@@ -0,0 +1,57 @@
+import json
+
+from scrape_core import scrape_html
+from structured_data import merge_listing
+
+URL = "https://jobs.example.com/search"
+
+CARD = (
+    '<div class="job-card"><h3 class="job-title"><a href="/jobs/{n}">Engineer {n}</a></h3>'
+    '<span class="company">Company {n}</span><span class="location">Berlin</span></div>'
+)
+
+
+def item_list(numbers):
+    return json.dumps({
+        "@context": "https://schema.org",
+        "@type": "ItemList",
+        "itemListElement": [
+            {"@type": "ListItem", "position": i + 1, "item": {
+                "@type": "JobPosting", "title": f"Engineer {n}", "url": f"/jobs/{n}",
+                "hiringOrganization": {"@type": "Organization", "name": f"Company {n}"},
+                "jobLocation": {"@type": "Place", "address": {"@type": "PostalAddress", "addressLocality": "Remote"}},
+            }}
+            for i, n in enumerate(numbers)
+        ],
+    })
+
+
+def page(listed, cards):
+    return (
+        f'<html><head><title>Jobs</title><script type="application/ld+json">{item_list(listed)}</script></head>'
+        f'<body><main>{"".join(CARD.format(n=n) for n in cards)}</main></body></html>'
+    )
+
+
+def test_partial_item_list_keeps_the_other_cards():
+    result = scrape_html(page(listed=[0, 1, 2], cards=range(12)), URL)
+    jobs = result["jobs"]
+    assert [job["title"] for job in jobs] == [f"Engineer {n}" for n in range(12)]
+    # The listed items come from the structured data, the rest from the DOM
+    assert [job["location"] for job in jobs[:3]] == ["Remote"] * 3
+    assert all(job["location"] == "Berlin" for job in jobs[3:])
+
+
+def test_complete_item_list_replaces_the_dom_extractors():
+    result = scrape_html(page(listed=range(12), cards=range(12)), URL)
+    assert len(result["jobs"]) == 12
+    assert all(job["location"] == "Remote" for job in result["jobs"])
+
+
+def test_merge_listing_matches_by_link_then_by_name():
+    structured = [{"title": "Engineer 0", "link": "https://jobs.example.com/jobs/0"},
+                  {"title": "Designer", "link": ""}]
+    extracted = [{"title": "engineer 0 (remote)", "link": "https://jobs.example.com/jobs/0#apply"},
+                 {"title": "designer", "link": "https://jobs.example.com/jobs/5"},
+                 {"title": "Analyst", "link": "https://jobs.example.com/jobs/6"}]
+    assert merge_listing(structured, extracted) == structured + extracted[2:]
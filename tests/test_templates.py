@@ -0,0 +1,65 @@
+import random
+
+from scrape_core import scrape_html
+from templates import AUDIT_EVERY, TemplateStore
+
+URL = "https://jobs.example.com/search"
+WORDS = "senior junior data cloud platform backend frontend remote engineer analyst".split()
+
+
+def job_page(seed, items=40, featured=0):
+    rng = random.Random(seed)
+    cards = "".join(
+        f'<div class="{"job-item" if i < featured else "job-card"}"><div class="job-header">'
+        f'<h3 class="job-title"><a href="/jobs/{seed}-{i}">{" ".join(rng.choices(WORDS, k=3))} {seed}-{i}</a></h3>'
+        f'</div><span class="company">Company {i % 7}</span><span class="location">{rng.choice(WORDS)}</span>'
+        f'<p class="description">{" ".join(rng.choices(WORDS, k=20))}</p></div>'
+        for i in range(items)
+    )
+    return f"<html><head><title>Jobs</title></head><body><main>{cards}</main></body></html>"
+
+
+def test_template_path_matches_the_heuristics():
+    store = TemplateStore(":memory:")
+    scrape_html(job_page(1), f"{URL}?page=1", templates=store)
+    assert store.stats()["usable"] == 1
+
+    for page in range(2, 6):
+        url = f"{URL}?page={page}"
+        with_template = scrape_html(job_page(page), url, templates=store)
+        heuristics = scrape_html(job_page(page), url)
+        assert with_template["jobs"] == heuristics["jobs"]
+    assert store.stats()["hits"] == 4
+
+
+def test_audits_do_not_change_the_result():
+    store = TemplateStore(":memory:")
+    html = job_page(7)
+    results = [scrape_html(html, URL, templates=store)["jobs"] for _ in range(AUDIT_EVERY + 3)]
+    assert store.stats()["relearned"] >= 1
+    assert all(jobs == results[0] for jobs in results)
+
+
+def test_template_missing_some_cards_is_not_used():
+    # The featured card has another selector; a template for the others would drop it
+    store = TemplateStore(":memory:")
+    first = scrape_html(job_page(1, featured=1), f"{URL}?page=1", templates=store)
+    assert store.stats()["usable"] == 0
+
+    second = scrape_html(job_page(2, featured=1), f"{URL}?page=2", templates=store)
+    assert len(first["jobs"]) == len(second["jobs"]) == 40
+
+
+def test_templates_saved_by_another_connection_are_seen(tmp_path):
+    path = str(tmp_path / "templates.sqlite")
+    worker = TemplateStore(path)
+    assert worker.lookup(URL) is None
+
+    TemplateStore(path).save(URL, _learned(URL))
+    assert worker.lookup(URL) is not None
+
+
+def _learned(url):
+    store = TemplateStore(":memory:")
+    scrape_html(job_page(1), url, templates=store)
+    return store.lookup(url)